@@ -0,0 +1,150 @@
+"""
+Agendador de etapas do pipeline ONIA
+Executa um grafo de dependências entre etapas em um pool de threads, rodando
+em paralelo as etapas independentes (ex.: carregar e normalizar o teste
+enquanto o modelo treina)
+
+Cada etapa declara quantas threads usa; o agendador só inicia uma etapa
+quando todas as suas dependências terminaram e há threads livres no
+orçamento total, que é compartilhado com o nthread do XGBoost. Os instantes
+de início e fim de cada etapa são registrados para exibir a linha do tempo
+e o caminho crítico da execução.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+class Etapa:
+    """Nó do grafo: função chamada com os resultados das dependências, na ordem declarada."""
+
+    def __init__(self, nome, funcao, dependencias=(), threads=1):
+        self.nome = nome
+        self.funcao = funcao
+        self.dependencias = tuple(dependencias)
+        self.threads = threads
+
+def _ordenar(etapas):
+    """Valida o grafo (nomes únicos, dependências existentes, sem ciclos)."""
+    por_nome = {}
+    for etapa in etapas:
+        if etapa.nome in por_nome:
+            raise ValueError(f"Etapa duplicada: {etapa.nome}")
+        por_nome[etapa.nome] = etapa
+    for etapa in etapas:
+        faltando = [d for d in etapa.dependencias if d not in por_nome]
+        if faltando:
+            raise ValueError(f"Etapa {etapa.nome} depende de etapas inexistentes: {faltando}")
+
+    visitadas, em_visita = set(), set()
+    def visitar(nome):
+        if nome in em_visita:
+            raise ValueError(f"Ciclo no grafo de etapas envolvendo {nome}")
+        if nome not in visitadas:
+            em_visita.add(nome)
+            for dependencia in por_nome[nome].dependencias:
+                visitar(dependencia)
+            em_visita.discard(nome)
+            visitadas.add(nome)
+    for nome in por_nome:
+        visitar(nome)
+    return por_nome
+
+def caminho_critico(linha_do_tempo, etapas):
+    """
+    Calcula o caminho crítico a partir da linha do tempo.
+
+    Parte da etapa que terminou por último e volta pela dependência que
+    terminou mais tarde, até uma etapa sem dependências.
+
+    Returns:
+        list: Nomes das etapas do caminho crítico, na ordem de execução
+    """
+    fim = {e['etapa']: e['fim_s'] for e in linha_do_tempo}
+    if not fim:
+        return []
+    atual = max(fim, key=fim.get)
+    caminho = [atual]
+    while etapas[atual].dependencias:
+        atual = max(etapas[atual].dependencias, key=fim.get)
+        caminho.append(atual)
+    return caminho[::-1]
+
+def executar_grafo(etapas, orcamento_threads):
+    """
+    Executa as etapas respeitando dependências e o orçamento de threads.
+
+    Args:
+        etapas (list): Lista de Etapa
+        orcamento_threads (int): Total de threads disponíveis; uma etapa que
+            declara mais threads que o orçamento só roda sozinha
+
+    Returns:
+        tuple: ({etapa: resultado}, execução). A execução tem linha_do_tempo,
+            caminho_critico e duracao_total_s; cada item da linha do tempo tem
+            etapa, inicio_s, fim_s (relativos ao início do grafo), duracao_s,
+            threads e thread
+    """
+    logger = logging.getLogger(__name__)
+
+    por_nome = _ordenar(etapas)
+    resultados = {}
+    linha_do_tempo = []
+    pendentes = list(etapas)
+    em_execucao = {}
+    livres = orcamento_threads
+    trava = threading.Lock()
+    inicio_grafo = time.perf_counter()
+
+    def executar(etapa):
+        inicio = time.perf_counter()
+        try:
+            return etapa.funcao(*(resultados[d] for d in etapa.dependencias))
+        finally:
+            fim = time.perf_counter()
+            with trava:
+                linha_do_tempo.append({
+                    'etapa': etapa.nome,
+                    'inicio_s': inicio - inicio_grafo,
+                    'fim_s': fim - inicio_grafo,
+                    'duracao_s': fim - inicio,
+                    'threads': etapa.threads,
+                    'thread': threading.current_thread().name,
+                })
+
+    with ThreadPoolExecutor(max_workers=max(1, len(etapas)), thread_name_prefix='etapa') as executor:
+        try:
+            while pendentes or em_execucao:
+                for etapa in list(pendentes):
+                    if not all(d in resultados for d in etapa.dependencias):
+                        continue
+                    if etapa.threads > livres and em_execucao:
+                        continue
+                    pendentes.remove(etapa)
+                    livres -= etapa.threads
+                    logger.info(f"[agendador] iniciando {etapa.nome} ({etapa.threads} thread(s), "
+                                f"{livres} livre(s))")
+                    em_execucao[executor.submit(executar, etapa)] = etapa
+
+                if not em_execucao:
+                    raise RuntimeError(f"Etapas sem dependências satisfeitas: {[e.nome for e in pendentes]}")
+
+                concluidos, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+                for futuro in concluidos:
+                    etapa = em_execucao.pop(futuro)
+                    livres += etapa.threads
+                    resultados[etapa.nome] = futuro.result()
+        except BaseException:
+            for futuro in em_execucao:
+                futuro.cancel()
+            raise
+
+    linha_do_tempo.sort(key=lambda e: e['inicio_s'])
+    critico = caminho_critico(linha_do_tempo, por_nome)
+    total = time.perf_counter() - inicio_grafo
+    soma = sum(e['duracao_s'] for e in linha_do_tempo)
+    logger.info(f"[agendador] {len(etapas)} etapas em {total:.2f}s (soma das etapas {soma:.2f}s); "
+                f"caminho crítico: {' -> '.join(critico)}")
+    return resultados, {'linha_do_tempo': linha_do_tempo, 'caminho_critico': critico,
+                        'duracao_total_s': total}
@@ -0,0 +1,250 @@
+"""
+Pacote de artefatos do modelo ONIA
+Salva e carrega o modelo treinado sem depender do código de treinamento
+
+O artefato é um diretório com:
+- modelo.ubj: booster XGBoost no formato binário nativo (UBJSON)
+- metadados.json: média, escala e número de amostras do StandardScaler, ordem
+  das colunas, classes e a linhagem (quais arquivos de dados cada faixa de
+  rodadas de boosting viu; ver treino_incremental)
+
+Como as árvores só comparam cada feature com um limiar, a normalização pode
+ser incorporada ao modelo: os limiares aprendidos em unidades normalizadas
+são convertidos de volta para unidades brutas (limiar * escala + média) e a
+previsão dispensa o StandardScaler.
+"""
+
+import json
+import logging
+from pathlib import Path
+
+import numpy as np
+import xgboost as xgb
+
+from preditor_compilado import PreditorCompilado
+
+ARQUIVO_MODELO = 'modelo.ubj'
+ARQUIVO_METADADOS = 'metadados.json'
+VERSAO_ARTEFATO = 1
+
+def incorporar_scaler(booster, media, escala):
+    """
+    Reescreve os limiares de divisão do booster para unidades brutas.
+
+    Uma divisão "x_norm < t" com x_norm = (x - média) / escala equivale a
+    "x < t * escala + média", já que a escala do StandardScaler é positiva.
+
+    Args:
+        booster (Booster): Booster treinado com features normalizadas
+        media (array): scaler.mean_
+        escala (array): scaler.scale_
+
+    Returns:
+        Booster: Novo booster que recebe features brutas
+    """
+    modelo_json = json.loads(booster.save_raw(raw_format='json'))
+
+    for arvore in modelo_json['learner']['gradient_booster']['model']['trees']:
+        filhos_esquerda = arvore['left_children']
+        indices = arvore['split_indices']
+        condicoes = arvore['split_conditions']
+        for no, filho in enumerate(filhos_esquerda):
+            if filho == -1:
+                # Folha: split_conditions guarda o valor da folha
+                continue
+            f = indices[no]
+            condicoes[no] = float(np.float32(condicoes[no] * escala[f] + media[f]))
+
+    novo = xgb.Booster()
+    novo.load_model(bytearray(json.dumps(modelo_json).encode()))
+    return novo
+
+def amostras_scaler(n_samples_seen):
+    """
+    n_samples_seen_ de um StandardScaler em formato JSON: int quando igual
+    para todas as features (sem NaN), senão a lista por feature.
+    """
+    valores = np.atleast_1d(np.asarray(n_samples_seen, dtype=np.int64))
+    if (valores == valores[0]).all():
+        return int(valores[0])
+    return valores.tolist()
+
+def salvar_artefato(modelo, scaler, colunas, diretorio, incorporar_normalizacao=False, shards=None):
+    """
+    Salva o modelo treinado e os metadados necessários para a previsão.
+
+    Args:
+        modelo (XGBClassifier): Modelo treinado
+        scaler (StandardScaler): Scaler ajustado no treino (None se sem normalização)
+        colunas (list): Ordem das colunas de features usada no treino
+        diretorio (str): Diretório de destino do artefato
+        incorporar_normalizacao (bool): Converter os limiares para unidades brutas
+            e salvar o artefato sem scaler (ver incorporar_scaler)
+        shards (list): Arquivos de dados do treino, registrados na linhagem
+            (ver descrever_shard)
+
+    Returns:
+        Path: Caminho do diretório do artefato
+    """
+    logger = logging.getLogger(__name__)
+
+    booster = modelo.get_booster()
+    melhor_iteracao = booster.attr('best_iteration')
+    if melhor_iteracao is not None:
+        # Salvar apenas as árvores até a melhor iteração do early stopping
+        booster = booster[:int(melhor_iteracao) + 1]
+
+    media = scaler.mean_ if scaler is not None else None
+    escala = scaler.scale_ if scaler is not None else None
+    variancia = scaler.var_ if scaler is not None else None
+    n_amostras = amostras_scaler(scaler.n_samples_seen_) if scaler is not None else None
+    if incorporar_normalizacao and scaler is not None:
+        logger.info("Incorporando a normalização aos limiares das árvores...")
+        booster = incorporar_scaler(booster, media, escala)
+        media, escala, variancia, n_amostras = None, None, None, None
+
+    linhagem = [{'rodadas': [0, booster.num_boosted_rounds()], 'shards': shards}]
+    return salvar_booster(booster, modelo.classes_, colunas, diretorio, media, escala,
+                          n_amostras, linhagem, variancia)
+
+def descrever_shard(caminho, linhas):
+    """Entrada de um arquivo de dados na linhagem do artefato."""
+    from cache_dados import hash_arquivo
+    return {'arquivo': str(caminho), 'sha256': hash_arquivo(caminho), 'linhas': int(linhas)}
+
+def salvar_booster(booster, classes, colunas, diretorio, media=None, escala=None,
+                   n_amostras=None, linhagem=None, variancia=None):
+    """
+    Salva um booster já treinado e seus metadados como artefato.
+
+    Args:
+        booster (Booster): Booster treinado
+        classes (array): Rótulos das classes, na ordem das saídas do booster
+        colunas (list): Ordem das colunas de features usada no treino
+        diretorio (str): Diretório de destino do artefato
+        media (array): Média da normalização (None se sem normalização)
+        escala (array): Escala da normalização (None se sem normalização)
+        n_amostras (int ou list): Amostras vistas pelo scaler, para atualizá-lo de
+            forma incremental (ver amostras_scaler; None se desconhecido)
+        linhagem (list): [{'rodadas': [início, fim], 'shards': [...]}, ...]
+        variancia (array): var_ do scaler; difere de escala ** 2 nas features
+            constantes (escala 1, variância 0)
+
+    Returns:
+        Path: Caminho do diretório do artefato
+    """
+    logger = logging.getLogger(__name__)
+
+    destino = Path(diretorio)
+    destino.mkdir(parents=True, exist_ok=True)
+
+    booster.save_model(str(destino / ARQUIVO_MODELO))
+
+    metadados = {
+        'versao': VERSAO_ARTEFATO,
+        'colunas': [str(c) for c in colunas],
+        'classes': [int(c) for c in classes],
+        'scaler_mean': np.asarray(media).tolist() if media is not None else None,
+        'scaler_scale': np.asarray(escala).tolist() if escala is not None else None,
+        'scaler_var': np.asarray(variancia).tolist() if variancia is not None else None,
+        'scaler_n': n_amostras,
+        'linhagem': linhagem,
+    }
+    with open(destino / ARQUIVO_METADADOS, 'w', encoding='utf-8') as f:
+        json.dump(metadados, f, indent=2)
+
+    logger.info(f"Artefato do modelo salvo em: {destino}")
+    return destino
+
+def carregar_artefato(diretorio, compilado=False):
+    """
+    Carrega um artefato salvo por salvar_artefato.
+
+    Args:
+        diretorio (str): Diretório do artefato
+        compilado (bool): Compilar o booster para o preditor vetorizado
+            (ver preditor_compilado), usado por prever_proba no lugar do booster
+
+    Returns:
+        dict: booster, colunas, classes, scaler_mean, scaler_scale, scaler_var,
+            scaler_n (int ou array por feature), linhagem e preditor
+    """
+    origem = Path(diretorio)
+
+    with open(origem / ARQUIVO_METADADOS, encoding='utf-8') as f:
+        metadados = json.load(f)
+
+    if metadados.get('versao') != VERSAO_ARTEFATO:
+        raise ValueError(f"Versão de artefato não suportada: {metadados.get('versao')}")
+
+    booster = xgb.Booster()
+    booster.load_model(str(origem / ARQUIVO_MODELO))
+
+    artefato = dict(metadados)
+    artefato.setdefault('scaler_n', None)
+    artefato.setdefault('scaler_var', None)
+    artefato.setdefault('linhagem', None)
+    artefato['booster'] = booster
+    artefato['classes'] = np.asarray(metadados['classes'])
+    if metadados['scaler_mean'] is not None:
+        artefato['scaler_mean'] = np.asarray(metadados['scaler_mean'], dtype=np.float64)
+        artefato['scaler_scale'] = np.asarray(metadados['scaler_scale'], dtype=np.float64)
+    if artefato['scaler_var'] is not None:
+        artefato['scaler_var'] = np.asarray(artefato['scaler_var'], dtype=np.float64)
+    if isinstance(artefato['scaler_n'], list):
+        artefato['scaler_n'] = np.asarray(artefato['scaler_n'], dtype=np.int64)
+    artefato['preditor'] = PreditorCompilado.de_booster(booster, artefato['classes']) if compilado else None
+    return artefato
+
+def transformar(artefato, X):
+    """
+    Aplica a normalização salva no artefato (equivalente a StandardScaler.transform).
+
+    Args:
+        artefato (dict): Artefato carregado
+        X (DataFrame ou ndarray): Features com as colunas do artefato; um
+            ndarray deve estar na ordem de artefato['colunas']
+
+    Returns:
+        ndarray: Matriz pronta para o booster
+    """
+    if hasattr(X, 'columns'):
+        X = X[artefato['colunas']]
+    X = np.asarray(X, dtype=np.float64)
+    if artefato['scaler_mean'] is not None:
+        X = (X - artefato['scaler_mean']) / artefato['scaler_scale']
+    return X
+
+def prever_proba(artefato, X):
+    """
+    Calcula as probabilidades por classe para features brutas.
+
+    Args:
+        artefato (dict): Artefato carregado
+        X (DataFrame ou ndarray): Features com as colunas do artefato
+
+    Returns:
+        ndarray: Probabilidades com shape (linhas, classes)
+    """
+    if artefato.get('preditor') is not None:
+        return artefato['preditor'].predict_proba(transformar(artefato, X))
+
+    matriz = xgb.DMatrix(transformar(artefato, X))
+    proba = artefato['booster'].predict(matriz)
+    if proba.ndim == 1:
+        # Objetivo binário retorna apenas a probabilidade da classe positiva
+        proba = np.column_stack([1 - proba, proba])
+    return proba
+
+def prever(artefato, X):
+    """
+    Prevê as classes para features brutas.
+
+    Args:
+        artefato (dict): Artefato carregado
+        X (DataFrame ou ndarray): Features com as colunas do artefato
+
+    Returns:
+        ndarray: Classes previstas
+    """
+    return artefato['classes'][np.argmax(prever_proba(artefato, X), axis=1)]
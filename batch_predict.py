@@ -0,0 +1,279 @@
+"""
+Previsão em lote de vários arquivos para modelos ONIA
+Distribui os CSVs de um padrão glob entre processos; cada processo carrega o
+artefato uma única vez e prevê os arquivos que recebe
+
+Saída:
+- por arquivo (--output-dir): um CSV id,target para cada arquivo de entrada;
+- mesclada (--merge): cada processo grava as previsões do arquivo ordenadas
+  por id em arrays .npy temporários, e o processo principal as intercala
+  em blocos em um único CSV ordenado por id.
+
+Com --prediction-cache, cada processo consulta uma cópia do cache de
+previsões carregada no início; as entradas novas e os acertos de cada
+arquivo voltam ao processo principal, que os incorpora e grava o cache uma
+única vez no final.
+"""
+
+import argparse
+import glob
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import artefato as art
+import config
+from predict import prever_arquivo
+from validacao_cruzada import dividir_threads
+
+# Artefato do processo worker, carregado por _inicializar_worker
+_dados_worker = {}
+
+def _inicializar_worker(diretorio_modelo, compilado, n_threads, diretorio_cache=None,
+                        max_linhas_cache=None):
+    """Carrega o artefato (e o cache de previsões) uma única vez por processo worker."""
+    artefato = art.carregar_artefato(diretorio_modelo, compilado=compilado)
+    artefato['booster'].set_param({'nthread': n_threads})
+    _dados_worker['artefato'] = artefato
+    _dados_worker['cache'] = None
+    if diretorio_cache is not None:
+        import cache_previsoes as cp
+        _dados_worker['cache'] = cp.CachePrevisoes(diretorio_cache, cp.impressao_artefato(artefato),
+                                                   max_linhas_cache)
+
+def _prever_arquivo_ordenado(arquivo, diretorio_partes, chunk_size):
+    """Prevê um arquivo e grava ids e classes ordenados por id em .npy. Executado no worker."""
+    artefato = _dados_worker['artefato']
+    cache = _dados_worker['cache']
+    ids, previsoes = [], []
+    for bloco in pd.read_csv(arquivo, chunksize=chunk_size, usecols=['id'] + artefato['colunas']):
+        ids.append(bloco['id'].to_numpy(dtype=np.int64))
+        if cache is not None:
+            previsoes.append(cache.prever_artefato(artefato, bloco))
+        else:
+            previsoes.append(art.prever(artefato, bloco))
+    ids = np.concatenate(ids) if ids else np.zeros(0, dtype=np.int64)
+    previsoes = np.concatenate(previsoes) if previsoes else np.zeros(0, dtype=np.int64)
+
+    ordem = np.argsort(ids, kind='stable')
+    parte = Path(diretorio_partes) / Path(arquivo).stem
+    np.save(f"{parte}_id.npy", ids[ordem])
+    np.save(f"{parte}_target.npy", previsoes[ordem])
+    return str(parte), len(ids)
+
+def _executar_arquivo(arquivo, saida, diretorio_partes, chunk_size):
+    """Prevê um arquivo de entrada. Executado no worker."""
+    inicio = time.perf_counter()
+    cache = _dados_worker['cache']
+    if diretorio_partes is not None:
+        parte, linhas = _prever_arquivo_ordenado(arquivo, diretorio_partes, chunk_size)
+    else:
+        parte, linhas = None, prever_arquivo(_dados_worker['artefato'], arquivo, saida, chunk_size, cache)
+    novas = cache.extrair_novas() if cache is not None else None
+    return arquivo, parte, linhas, time.perf_counter() - inicio, novas
+
+def mesclar_ordenado(partes, arquivo_saida, bloco=1_000_000):
+    """
+    Intercala partes já ordenadas por id em um único CSV ordenado.
+
+    A cada passo são lidas até `bloco` linhas de cada parte; todas as linhas
+    com id até o menor "último id lido" entre as partes podem ser gravadas,
+    pois nenhuma linha ainda não lida é menor que ele.
+
+    Args:
+        partes (list): Prefixos das partes (<prefixo>_id.npy e <prefixo>_target.npy)
+        arquivo_saida (str): CSV de saída
+        bloco (int): Linhas lidas por parte a cada passo
+
+    Returns:
+        int: Total de linhas gravadas
+    """
+    ids = [np.load(f"{p}_id.npy", mmap_mode='r') for p in partes]
+    alvos = [np.load(f"{p}_target.npy", mmap_mode='r') for p in partes]
+    cursores = [0] * len(partes)
+    total = 0
+    primeiro_bloco = True
+
+    with open(arquivo_saida, 'w', newline='') as f:
+        while True:
+            ativas = [i for i in range(len(partes)) if cursores[i] < len(ids[i])]
+            if not ativas:
+                break
+            janelas = {i: slice(cursores[i], min(cursores[i] + bloco, len(ids[i]))) for i in ativas}
+            limite = min(ids[i][janelas[i].stop - 1] for i in ativas)
+
+            bloco_ids, bloco_alvos = [], []
+            for i in ativas:
+                janela = ids[i][janelas[i]]
+                n = int(np.searchsorted(janela, limite, side='right'))
+                bloco_ids.append(janela[:n])
+                bloco_alvos.append(alvos[i][janelas[i]][:n])
+                cursores[i] += n
+
+            bloco_ids = np.concatenate(bloco_ids)
+            bloco_alvos = np.concatenate(bloco_alvos)
+            ordem = np.argsort(bloco_ids, kind='stable')
+            pd.DataFrame({'id': bloco_ids[ordem], 'target': bloco_alvos[ordem]}).to_csv(
+                f, header=primeiro_bloco, index=False)
+            primeiro_bloco = False
+            total += len(bloco_ids)
+
+    return total
+
+def _progresso(concluidos, total_arquivos, linhas, inicio):
+    """Escreve a barra de progresso em stderr."""
+    largura = 30
+    preenchido = largura * concluidos // total_arquivos
+    tempo = time.perf_counter() - inicio
+    vazao = linhas / tempo if tempo > 0 else 0.0
+    sys.stderr.write(f"\r[{'#' * preenchido}{'.' * (largura - preenchido)}] "
+                     f"{concluidos}/{total_arquivos} arquivos, {linhas} linhas, {vazao:,.0f} linhas/s")
+    if concluidos == total_arquivos:
+        sys.stderr.write("\n")
+    sys.stderr.flush()
+
+def prever_lote(diretorio_modelo, arquivos, diretorio_saida=None, arquivo_mesclado=None,
+                n_workers=None, chunk_size=100_000, compilado=False, diretorio_cache=None,
+                max_linhas_cache=None):
+    """
+    Prevê vários arquivos em paralelo.
+
+    Args:
+        diretorio_modelo (str): Diretório do artefato
+        arquivos (list): CSVs de entrada com 'id' e as features do artefato
+        diretorio_saida (str): Diretório das saídas por arquivo (<nome>.csv)
+        arquivo_mesclado (str): CSV único ordenado por id (em vez de diretorio_saida)
+        n_workers (int): Processos (default: min(arquivos, cores))
+        chunk_size (int): Linhas por bloco na leitura de cada arquivo
+        compilado (bool): Usar o preditor compilado (ver preditor_compilado)
+        diretorio_cache (str): Diretório do cache de previsões por linha (None = desativado)
+        max_linhas_cache (int): Limite de entradas do cache (default: config.PREDICTION_CACHE_MAX_ROWS)
+
+    Returns:
+        dict: arquivos, linhas, tempo_s, linhas_por_s e cache_previsoes
+    """
+    logger = logging.getLogger(__name__)
+
+    if (diretorio_saida is None) == (arquivo_mesclado is None):
+        raise ValueError("Informe exatamente um entre diretorio_saida e arquivo_mesclado")
+    nomes = [Path(a).stem for a in arquivos]
+    if len(set(nomes)) != len(nomes):
+        raise ValueError("Arquivos de entrada com nomes repetidos; as saídas se sobrescreveriam")
+
+    n_workers = max(1, min(n_workers or os.cpu_count() or 1, len(arquivos)))
+    n_threads = dividir_threads(-1, n_workers)
+    logger.info(f"Previsão em lote: {len(arquivos)} arquivos, {n_workers} processos x {n_threads} threads")
+
+    cache = None
+    if diretorio_cache is not None:
+        import cache_previsoes as cp
+        max_linhas_cache = max_linhas_cache or config.PREDICTION_CACHE_MAX_ROWS
+        cache = cp.CachePrevisoes(diretorio_cache, cp.impressao_artefato(art.carregar_artefato(diretorio_modelo)),
+                                  max_linhas_cache)
+
+    diretorio_partes = None
+    if arquivo_mesclado is not None:
+        diretorio_partes = tempfile.mkdtemp(prefix='onia_lote_', dir=Path(arquivo_mesclado).parent)
+    else:
+        Path(diretorio_saida).mkdir(parents=True, exist_ok=True)
+
+    inicio = time.perf_counter()
+    linhas = 0
+    partes = []
+    try:
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=get_context('spawn'),
+                                 initializer=_inicializar_worker,
+                                 initargs=(str(diretorio_modelo), compilado, n_threads,
+                                           diretorio_cache, max_linhas_cache)) as executor:
+            futuros = [
+                executor.submit(_executar_arquivo, str(arquivo),
+                                None if diretorio_saida is None else str(Path(diretorio_saida) / f"{nome}.csv"),
+                                diretorio_partes, chunk_size)
+                for arquivo, nome in zip(arquivos, nomes)
+            ]
+            for concluidos, futuro in enumerate(as_completed(futuros), 1):
+                arquivo, parte, linhas_arquivo, tempo, novas = futuro.result()
+                linhas += linhas_arquivo
+                if novas is not None:
+                    cache.incorporar(novas)
+                if parte is not None:
+                    partes.append(parte)
+                logger.debug(f"{arquivo}: {linhas_arquivo} linhas em {tempo:.2f}s")
+                _progresso(concluidos, len(arquivos), linhas, inicio)
+
+        if arquivo_mesclado is not None:
+            logger.info(f"Intercalando {len(partes)} partes ordenadas por id em {arquivo_mesclado}...")
+            mesclar_ordenado(sorted(partes), arquivo_mesclado)
+    finally:
+        if diretorio_partes is not None:
+            shutil.rmtree(diretorio_partes, ignore_errors=True)
+
+    resumo_cache = None
+    if cache is not None:
+        cache.salvar()
+        resumo_cache = cache.registrar_resumo()
+
+    tempo = time.perf_counter() - inicio
+    resumo = {'arquivos': len(arquivos), 'linhas': linhas, 'tempo_s': tempo,
+              'linhas_por_s': linhas / tempo if tempo > 0 else 0.0, 'cache_previsoes': resumo_cache}
+    logger.info(f"Previsão em lote concluída: {linhas} linhas de {len(arquivos)} arquivos "
+                f"em {tempo:.1f}s ({resumo['linhas_por_s']:,.0f} linhas/s)")
+    return resumo
+
+def main():
+    parser = argparse.ArgumentParser(description='Previsão em lote de vários arquivos com modelo ONIA salvo')
+    parser.add_argument('--model-dir', default=config.MODEL_DIR,
+                       help=f'Diretório do artefato do modelo (default: {config.MODEL_DIR})')
+    parser.add_argument('--input', required=True,
+                       help="Padrão glob dos CSVs de entrada (ex.: 'diarios/*.csv')")
+    saida = parser.add_mutually_exclusive_group(required=True)
+    saida.add_argument('--output-dir',
+                       help='Diretório para um CSV de previsões por arquivo de entrada')
+    saida.add_argument('--merge', metavar='ARQUIVO',
+                       help='Um único CSV com todas as previsões, ordenado por id')
+    parser.add_argument('--workers', type=int, default=config.BATCH_WORKERS,
+                       help='Processos paralelos (default: min(arquivos, cores))')
+    parser.add_argument('--chunk-size', type=int, default=config.CHUNK_SIZE,
+                       help=f'Linhas por bloco (default: {config.CHUNK_SIZE})')
+    parser.add_argument('--backend', choices=['xgboost', 'compilado'], default=config.INFERENCE_BACKEND,
+                       help=f'Backend de inferência; "compilado" só acelera lotes de até 4 linhas '
+                            f'(default: {config.INFERENCE_BACKEND})')
+    parser.add_argument('--prediction-cache', metavar='DIR', default=config.PREDICTION_CACHE_DIR,
+                       help='Diretório do cache persistente de previsões por linha (default: desativado)')
+    parser.add_argument('--prediction-cache-max-rows', type=int, default=config.PREDICTION_CACHE_MAX_ROWS,
+                       help=f'Limite de entradas do cache de previsões (default: {config.PREDICTION_CACHE_MAX_ROWS})')
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format=config.LOG_FORMAT)
+
+    if not Path(args.model_dir).exists():
+        print(f"Erro: Artefato {args.model_dir} não encontrado")
+        sys.exit(1)
+
+    arquivos = sorted(glob.glob(args.input))
+    if not arquivos:
+        print(f"Erro: Nenhum arquivo corresponde a {args.input}")
+        sys.exit(1)
+
+    try:
+        prever_lote(args.model_dir, arquivos, args.output_dir, args.merge, args.workers,
+                    args.chunk_size, compilado=args.backend == 'compilado',
+                    diretorio_cache=args.prediction_cache, max_linhas_cache=args.prediction_cache_max_rows)
+        print("\n✅ Previsão em lote concluída com sucesso!")
+
+    except Exception as e:
+        print(f"\n❌ Erro durante previsão em lote: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
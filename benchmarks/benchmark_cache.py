@@ -0,0 +1,58 @@
+"""
+Benchmark do cache binário de dados ONIA
+Compara o tempo de leitura direta do CSV (pd.read_csv) com a leitura pelo cache
+"""
+
+import argparse
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import cache_dados
+
+def medir(funcao, repeticoes):
+    """Executa a função várias vezes e retorna os tempos em segundos."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do cache binário de CSV')
+    parser.add_argument('--data-dir', default='templates',
+                       help='Diretório contendo os dados (default: templates)')
+    parser.add_argument('--repeticoes', type=int, default=5,
+                       help='Número de repetições por medição (default: 5)')
+    args = parser.parse_args()
+
+    diretorio_cache = Path(tempfile.mkdtemp(prefix='onia_cache_'))
+    try:
+        print(f"{'arquivo':<12} {'csv (ms)':>10} {'criação (ms)':>13} {'cache (ms)':>11} {'ganho':>8}")
+        for nome in ('treino.csv', 'teste.csv'):
+            caminho = Path(args.data_dir) / nome
+
+            tempos_csv = medir(lambda: pd.read_csv(caminho), args.repeticoes)
+
+            inicio = time.perf_counter()
+            cache_dados.ler_csv(caminho, diretorio_cache)
+            tempo_criacao = time.perf_counter() - inicio
+
+            tempos_cache = medir(lambda: cache_dados.ler_csv(caminho, diretorio_cache), args.repeticoes)
+
+            csv_ms = statistics.median(tempos_csv) * 1000
+            cache_ms = statistics.median(tempos_cache) * 1000
+            print(f"{nome:<12} {csv_ms:>10.2f} {tempo_criacao * 1000:>13.2f} "
+                  f"{cache_ms:>11.2f} {csv_ms / cache_ms:>7.1f}x")
+    finally:
+        shutil.rmtree(diretorio_cache, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
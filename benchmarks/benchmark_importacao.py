@@ -0,0 +1,87 @@
+"""
+Benchmark do tempo de inicialização das ferramentas de linha de comando ONIA
+Executa cada comando com python -X importtime, soma o tempo de importação,
+mede o tempo total do processo e confere o orçamento de inicialização
+
+O script termina com código 1 se algum comando passar do orçamento
+(--budget-ms), para uso em CI. A ausência de bibliotecas pesadas nesses
+comandos é verificada por tests/test_importacao.py.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+COMANDOS = {
+    'train --help': ['train.py', '--help'],
+    'train dados inexistentes': ['train.py', '--data-dir', 'diretorio_inexistente'],
+    'checagem --help': ['checagem.py', '--help'],
+    'checagem arquivo inexistente': ['checagem.py', 'arquivo_inexistente.csv'],
+}
+
+def analisar_importtime(saida):
+    """
+    Interpreta a saída de -X importtime.
+
+    Returns:
+        tuple: (tempo total de importação em ms, {módulo: cumulativo em ms})
+    """
+    linhas = []
+    for linha in saida.splitlines():
+        if not linha.startswith('import time:') or 'imported package' in linha:
+            continue
+        _, cumulativo, nome = linha.split('|')
+        recuo = len(nome) - len(nome.lstrip())
+        linhas.append((recuo, nome.strip(), int(cumulativo) / 1000))
+
+    if not linhas:
+        return 0.0, {}
+    topo = min(recuo for recuo, _, _ in linhas)
+    raiz = {nome: ms for recuo, nome, ms in linhas if recuo == topo}
+    return sum(raiz.values()), raiz
+
+def medir(argumentos, repeticoes):
+    """Executa o comando várias vezes; retorna (mediana do tempo total em ms, última análise)."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        processo = subprocess.run([sys.executable, '-X', 'importtime', *argumentos],
+                                  cwd=RAIZ, capture_output=True, text=True)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos), analisar_importtime(processo.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do tempo de inicialização das CLIs ONIA')
+    parser.add_argument('--repeticoes', type=int, default=5,
+                       help='Execuções por comando (default: 5)')
+    parser.add_argument('--budget-ms', type=float, default=250.0,
+                       help='Orçamento do tempo total de cada comando em ms (default: 250)')
+    parser.add_argument('--top', type=int, default=5,
+                       help='Importações mais lentas mostradas por comando (default: 5)')
+    args = parser.parse_args()
+
+    falhas = []
+    print(f"{'comando':<30} {'total (ms)':>11} {'importação (ms)':>16}")
+    for nome, argumentos in COMANDOS.items():
+        total_ms, (importacao_ms, raiz) = medir(argumentos, args.repeticoes)
+        print(f"{nome:<30} {total_ms:>11.1f} {importacao_ms:>16.1f}")
+        for modulo, ms in sorted(raiz.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"    {modulo:<26} {ms:>8.1f}ms")
+
+        if total_ms > args.budget_ms:
+            falhas.append(f"{nome}: {total_ms:.1f}ms acima do orçamento de {args.budget_ms:.0f}ms")
+
+    if falhas:
+        print("\nOrçamento de inicialização excedido:")
+        for falha in falhas:
+            print(f"  {falha}")
+        sys.exit(1)
+    print(f"\nTodos os comandos dentro do orçamento de {args.budget_ms:.0f}ms")
+
+if __name__ == "__main__":
+    main()
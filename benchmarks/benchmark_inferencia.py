@@ -0,0 +1,85 @@
+"""
+Benchmark do preditor compilado contra XGBClassifier.predict
+Mede a latência por lote nos tamanhos 1, 64, 4.500 e 1.000.000 linhas e
+confere se as classes previstas pelos dois caminhos são idênticas. A coluna
+"caminho" indica se o lote foi percorrido em NumPy ou repassado ao booster
+(acima de max_linhas linhas).
+
+O modelo é treinado em templates/treino.csv com os parâmetros de config.py
+(ou com --n-estimators/--max-depth menores para uma medição rápida). Os
+lotes são amostrados com reposição das linhas de templates/teste.csv.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+from xgboost import XGBClassifier
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import config
+import preditor_compilado as pc
+
+def medir(funcao, X, repeticoes):
+    """Executa a previsão várias vezes e retorna (mediana em segundos, última saída)."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        saida = funcao(X)
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos), saida
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do preditor compilado contra XGBoost predict')
+    parser.add_argument('--data-dir', default='templates',
+                       help='Diretório contendo os dados (default: templates)')
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=[1, 64, 4500, 1_000_000],
+                       help='Tamanhos de lote (default: 1 64 4500 1000000)')
+    parser.add_argument('--n-estimators', type=int, default=config.XGBOOST_PARAMS['n_estimators'],
+                       help=f"Árvores do modelo (default: {config.XGBOOST_PARAMS['n_estimators']})")
+    parser.add_argument('--max-depth', type=int, default=config.XGBOOST_PARAMS['max_depth'],
+                       help=f"Profundidade do modelo (default: {config.XGBOOST_PARAMS['max_depth']})")
+    parser.add_argument('--repeticoes', type=int, default=20,
+                       help='Repetições por lote pequeno; lotes acima de 100 mil linhas usam 3 (default: 20)')
+    args = parser.parse_args()
+
+    treino = pd.read_csv(Path(args.data_dir) / 'treino.csv')
+    teste = pd.read_csv(Path(args.data_dir) / 'teste.csv')
+    colunas = [c for c in treino.columns if c not in ('id', 'target')]
+
+    scaler = StandardScaler().fit(treino[colunas])
+    parametros = dict(config.XGBOOST_PARAMS, n_estimators=args.n_estimators,
+                      max_depth=args.max_depth, early_stopping_rounds=None)
+    modelo = XGBClassifier(**parametros).fit(scaler.transform(treino[colunas]), treino['target'])
+
+    inicio = time.perf_counter()
+    preditor = pc.compilar_modelo(modelo)
+    print(f"Compilação: {(time.perf_counter() - inicio) * 1000:.1f}ms "
+          f"({len(preditor.raizes)} árvores, {len(preditor.esquerda)} nós)")
+
+    X_teste = scaler.transform(teste[colunas])
+    rng = np.random.default_rng(52)
+
+    print(f"{'lote':>10} {'xgboost (ms)':>13} {'compilado (ms)':>15} {'ganho':>8} {'classes':>9} {'caminho':>10}")
+    for tamanho in args.tamanhos:
+        X = X_teste[rng.integers(0, len(X_teste), tamanho)]
+        repeticoes = args.repeticoes if tamanho <= 100_000 else 3
+
+        tempo_xgb, classes_xgb = medir(modelo.predict, X, repeticoes)
+        tempo_compilado, classes_compilado = medir(preditor.predict, X, repeticoes)
+
+        iguais = np.array_equal(classes_xgb, classes_compilado)
+        print(f"{tamanho:>10} {tempo_xgb * 1000:>13.3f} {tempo_compilado * 1000:>15.3f} "
+              f"{tempo_xgb / tempo_compilado:>7.1f}x {'iguais' if iguais else 'DIFEREM':>9} "
+              f"{'numpy' if tamanho <= preditor.max_linhas else 'booster':>10}")
+        if not iguais:
+            print(f"  {int((classes_xgb != classes_compilado).sum())} classes diferentes")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
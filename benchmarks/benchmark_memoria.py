@@ -0,0 +1,49 @@
+"""
+Benchmark de memória: treino em memória vs out-of-core
+Executa train.py nos dois modos, cada um em um processo separado, e compara
+o pico de RSS registrado no relatório de execução (<saída>.run.json)
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+def executar(modo, argumentos, diretorio):
+    """Executa train.py em um modo e retorna o relatório de execução."""
+    saida = Path(diretorio) / f"resultado_{modo}.csv"
+    comando = [sys.executable, str(RAIZ / 'train.py'), '--output', str(saida),
+               '--no-save-model', *argumentos]
+    if modo == 'out_of_core':
+        comando.append('--out-of-core')
+    subprocess.run(comando, cwd=RAIZ, check=True, stdout=subprocess.DEVNULL)
+    with open(saida.with_suffix('.run.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+def main():
+    parser = argparse.ArgumentParser(description='Pico de memória: em memória vs out-of-core')
+    parser.add_argument('--data-dir', default='templates',
+                       help='Diretório contendo os dados (default: templates)')
+    parser.add_argument('--chunk-size', type=int, default=100_000,
+                       help='Linhas por bloco no modo out-of-core (default: 100000)')
+    parser.add_argument('--n-estimators', type=int, default=100)
+    args = parser.parse_args()
+
+    argumentos = ['--data-dir', str(Path(args.data_dir).resolve()), '--chunk-size', str(args.chunk_size),
+                  '--n-estimators', str(args.n_estimators)]
+
+    with tempfile.TemporaryDirectory(prefix='onia_memoria_') as diretorio:
+        print(f"{'modo':<12} {'pico RSS (MB)':>14} {'tempo (s)':>10} {'F1':>8}")
+        for modo in ('em_memoria', 'out_of_core'):
+            relatorio = executar(modo, argumentos, diretorio)
+            pico = max(e['pico_rss_mb'] for e in relatorio['etapas'])
+            f1 = relatorio['f1_validacao']
+            print(f"{modo:<12} {pico:>14.1f} {relatorio['duracao_total_s']:>10.2f} "
+                  f"{f1 if f1 is not None else float('nan'):>8.4f}")
+
+if __name__ == "__main__":
+    main()
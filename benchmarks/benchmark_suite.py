@@ -0,0 +1,168 @@
+"""
+Suíte de benchmarks do pipeline ONIA
+Gera dados sintéticos em vários tamanhos e mede o tempo de cada função do
+pipeline, gravando um arquivo de baseline em JSON
+
+Funções medidas:
+    modelo_xgb_classifier_v2.carregar_dados
+    modelo_xgb_classifier_v2.preparar_dados
+    modelo_xgb_classifier_v2.treinar_modelo_xgb
+    modelo_xgb_classifier_v2.gerar_previsoes
+    checagem.verificar_resultado
+
+Com --compare, os tempos são comparados com um baseline anterior e o script
+termina com código 1 se alguma função ficar mais lenta que o limite.
+"""
+
+import argparse
+import json
+import logging
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import gerar_dados
+
+TAMANHOS = {'10k': 10_000, '1M': 1_000_000, '10M': 10_000_000}
+
+def cronometrar(funcao, repeticoes):
+    """Executa a função e retorna (mediana do tempo em s, último resultado)."""
+    tempos = []
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos), resultado
+
+def medir_tamanho(diretorio, xgboost_params, repeticoes):
+    """Mede cada função do pipeline sobre os dados de um diretório."""
+    import checagem
+    import modelo_xgb_classifier_v2 as modelo
+
+    tempos = {}
+    arquivo_saida = str(Path(diretorio) / 'resultado.csv')
+
+    tempos['carregar_dados'], (treino, teste) = cronometrar(
+        lambda: modelo.carregar_dados(diretorio, usar_cache=False), repeticoes)
+
+    tempos['preparar_dados'], preparado = cronometrar(
+        lambda: modelo.preparar_dados(treino, teste), repeticoes)
+    X_train, X_val, y_train, y_val, X_teste, ids_teste, _ = preparado
+
+    tempos['treinar_modelo_xgb'], modelo_treinado = cronometrar(
+        lambda: modelo.treinar_modelo_xgb(X_train, y_train, xgboost_params), repeticoes)
+
+    tempos['gerar_previsoes'], _ = cronometrar(
+        lambda: modelo.gerar_previsoes(modelo_treinado, X_teste, ids_teste, arquivo_saida), repeticoes)
+
+    tempos['verificar_resultado'], _ = cronometrar(
+        lambda: checagem.verificar_resultado(arquivo_saida, str(Path(diretorio) / 'teste.csv')), repeticoes)
+
+    return tempos
+
+def comparar(atual, baseline, limite):
+    """
+    Compara os tempos atuais com o baseline.
+
+    Returns:
+        list: Regressões (tamanho, função, tempo do baseline, tempo atual, variação)
+    """
+    regressoes = []
+    for tamanho, tempos in atual['resultados'].items():
+        anteriores = baseline.get('resultados', {}).get(tamanho, {})
+        for funcao, tempo in tempos.items():
+            anterior = anteriores.get(funcao)
+            if not anterior:
+                continue
+            variacao = tempo / anterior - 1
+            marcador = 'REGRESSÃO' if variacao > limite else ''
+            print(f"{tamanho:<5} {funcao:<22} {anterior:>10.3f}s {tempo:>10.3f}s {variacao:>+8.1%} {marcador}")
+            if variacao > limite:
+                regressoes.append((tamanho, funcao, anterior, tempo, variacao))
+    return regressoes
+
+def main():
+    parser = argparse.ArgumentParser(description='Suíte de benchmarks do pipeline ONIA')
+    parser.add_argument('--tamanhos', nargs='+', default=['10k'], choices=sorted(TAMANHOS),
+                       help='Tamanhos do treino sintético (default: 10k)')
+    parser.add_argument('--repeticoes', type=int, default=3,
+                       help='Repetições por medição; a mediana é registrada (default: 3)')
+    parser.add_argument('--n-estimators', type=int, default=100,
+                       help='Árvores do modelo medido (default: 100)')
+    parser.add_argument('--max-depth', type=int, default=8,
+                       help='Profundidade do modelo medido (default: 8)')
+    parser.add_argument('--dados-dir', default=None,
+                       help='Diretório para guardar os dados gerados entre execuções '
+                            '(default: diretório temporário)')
+    parser.add_argument('--output', default='benchmarks/baseline.json',
+                       help='Arquivo de resultados (default: benchmarks/baseline.json)')
+    parser.add_argument('--compare', default=None,
+                       help='Baseline anterior para comparação')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                       help='Aumento relativo de tempo considerado regressão (default: 0.2)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    # Ler o baseline antes de medir: --output pode apontar para o mesmo arquivo
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    xgboost_params = {
+        'n_estimators': args.n_estimators,
+        'max_depth': args.max_depth,
+        'learning_rate': 0.1,
+        'random_state': 52,
+        'n_jobs': -1,
+        'tree_method': 'hist',
+        'eval_metric': 'mlogloss',
+    }
+
+    with tempfile.TemporaryDirectory(prefix='onia_bench_') as temporario:
+        base = Path(args.dados_dir) if args.dados_dir else Path(temporario)
+        resultados = {}
+        for tamanho in args.tamanhos:
+            diretorio = base / tamanho
+            if not (diretorio / 'treino.csv').exists():
+                print(f"Gerando dados sintéticos ({tamanho})...")
+                gerar_dados.gerar_conjunto(diretorio, TAMANHOS[tamanho])
+
+            print(f"Medindo {tamanho}...")
+            resultados[tamanho] = medir_tamanho(diretorio, xgboost_params, args.repeticoes)
+            for funcao, tempo in resultados[tamanho].items():
+                print(f"  {funcao:<22} {tempo:>10.3f}s")
+
+    atual = {
+        'data': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'xgboost_params': xgboost_params,
+        'repeticoes': args.repeticoes,
+        'resultados': resultados,
+    }
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(atual, f, indent=2)
+    print(f"\nResultados salvos em {args.output}")
+
+    if baseline is not None:
+        print(f"\nComparação com {args.compare} (limite {args.threshold:.0%}):")
+        regressoes = comparar(atual, baseline, args.threshold)
+        if regressoes:
+            print(f"\n❌ {len(regressoes)} regressões acima de {args.threshold:.0%}")
+            sys.exit(1)
+        print("\n✅ Nenhuma regressão encontrada")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark dos parâmetros de treinamento do XGBoost
+Mede tempo de treino e pico de memória (RSS) para combinações de
+tree_method, max_bin, nthread e grow_policy no formato de templates/treino.csv
+
+Cada combinação roda em um processo separado, para que o pico de RSS
+medido seja apenas daquela combinação.
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing as mp
+import resource
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+def pico_rss_mb():
+    """Retorna o pico de RSS do processo atual em MB."""
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é em KB no Linux e em bytes no macOS
+    if sys.platform == 'darwin':
+        return pico / (1024 * 1024)
+    return pico / 1024
+
+def executar_combinacao(caminho_treino, repeticoes, parametros, fila):
+    """Treina o modelo com os parâmetros dados e envia as medições pela fila."""
+    import numpy as np
+    import pandas as pd
+    from xgboost import XGBClassifier
+
+    treino = pd.read_csv(caminho_treino)
+    X = treino.drop(columns=['id', 'target']).to_numpy()
+    y = treino['target'].to_numpy()
+    if repeticoes > 1:
+        X = np.tile(X, (repeticoes, 1))
+        y = np.tile(y, repeticoes)
+
+    rss_antes = pico_rss_mb()
+    inicio = time.perf_counter()
+    XGBClassifier(**parametros).fit(X, y)
+    tempo = time.perf_counter() - inicio
+
+    fila.put({'linhas': len(X), 'tempo_s': tempo,
+              'pico_rss_mb': pico_rss_mb(), 'rss_base_mb': rss_antes})
+
+def combinacoes(args):
+    """Gera os dicionários de parâmetros a medir."""
+    for tree_method, max_bin, nthread, grow_policy in itertools.product(
+            args.tree_methods, args.max_bins, args.nthreads, args.grow_policies):
+        if tree_method == 'exact' and (grow_policy == 'lossguide' or max_bin != args.max_bins[0]):
+            # exact não usa histogramas nem suporta lossguide
+            continue
+        parametros = {
+            'n_estimators': args.n_estimators,
+            'max_depth': args.max_depth,
+            'learning_rate': 0.1,
+            'random_state': 52,
+            'n_jobs': nthread,
+            'tree_method': tree_method,
+            'max_bin': max_bin,
+            'grow_policy': grow_policy,
+        }
+        if grow_policy == 'lossguide':
+            parametros['max_leaves'] = args.max_leaves
+        yield parametros
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de parâmetros de treino do XGBoost')
+    parser.add_argument('--data-dir', default='templates',
+                       help='Diretório contendo os dados (default: templates)')
+    parser.add_argument('--repeticoes', type=int, default=1,
+                       help='Replica as linhas do treino N vezes para simular mais dados (default: 1)')
+    parser.add_argument('--n-estimators', type=int, default=500)
+    parser.add_argument('--max-depth', type=int, default=20)
+    parser.add_argument('--max-leaves', type=int, default=256,
+                       help='max_leaves usado nas combinações lossguide (default: 256)')
+    parser.add_argument('--tree-methods', nargs='+', default=['hist', 'approx', 'exact'])
+    parser.add_argument('--max-bins', nargs='+', type=int, default=[256, 64])
+    parser.add_argument('--nthreads', nargs='+', type=int, default=[1, 4, -1])
+    parser.add_argument('--grow-policies', nargs='+', default=['depthwise', 'lossguide'])
+    parser.add_argument('--json', default=None,
+                       help='Arquivo para salvar os resultados em JSON')
+    args = parser.parse_args()
+
+    caminho_treino = Path(args.data_dir) / 'treino.csv'
+    contexto = mp.get_context('spawn')
+    resultados = []
+
+    print(f"{'tree_method':<11} {'max_bin':>7} {'nthread':>7} {'grow_policy':<11} "
+          f"{'tempo (s)':>10} {'pico RSS (MB)':>14}")
+    for parametros in combinacoes(args):
+        fila = contexto.Queue()
+        processo = contexto.Process(target=executar_combinacao,
+                                    args=(caminho_treino, args.repeticoes, parametros, fila))
+        processo.start()
+        processo.join()
+        if processo.exitcode != 0:
+            print(f"Falha na combinação {parametros} (código {processo.exitcode})")
+            continue
+        medicao = fila.get()
+
+        resultados.append({'parametros': parametros, **medicao})
+        print(f"{parametros['tree_method']:<11} {parametros['max_bin']:>7} {parametros['n_jobs']:>7} "
+              f"{parametros['grow_policy']:<11} {medicao['tempo_s']:>10.2f} {medicao['pico_rss_mb']:>14.1f}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, indent=2)
+        print(f"\nResultados salvos em {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Gerador de dados sintéticos no formato ONIA
+Cria treino.csv e teste.csv com as colunas id, col_0..col_12 e target (5 classes)
+
+Cada classe tem médias próprias por feature, próximas das magnitudes de
+templates/treino.csv, e as proporções das classes seguem a distribuição
+observada nos resultados (~55/14/12/5/13%).
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+N_FEATURES = 13
+PROPORCOES_CLASSES = np.array([0.55, 0.14, 0.12, 0.06, 0.13])
+MEDIAS_BASE = np.array([33.0, 3.6, 2.2, 13.5, 25.0, 8.5, 4.5, 5.5, 3.8, 2.8, 15.0, 14.0, 3.3])
+# Deslocamento relativo das médias por classe (fixo, independe da semente dos dados)
+DESLOCAMENTOS = np.random.default_rng(0).normal(0, 0.15, size=(len(PROPORCOES_CLASSES), N_FEATURES))
+
+def _gerar_bloco(rng, ids, com_target):
+    """Gera um bloco de linhas sintéticas para os ids dados."""
+    n = len(ids)
+    target = rng.choice(len(PROPORCOES_CLASSES), size=n, p=PROPORCOES_CLASSES)
+    medias = MEDIAS_BASE * (1 + DESLOCAMENTOS[target])
+    X = rng.normal(medias, MEDIAS_BASE * 0.2)
+
+    bloco = pd.DataFrame(X, columns=[f'col_{i}' for i in range(N_FEATURES)])
+    bloco.insert(0, 'id', ids)
+    if com_target:
+        bloco['target'] = target
+    return bloco
+
+def gerar_csv(caminho, n_linhas, com_target=True, random_state=52, chunk_size=1_000_000, id_inicial=0):
+    """
+    Gera um CSV sintético em blocos (memória limitada por chunk_size).
+
+    Args:
+        caminho (str): Arquivo de destino
+        n_linhas (int): Número de linhas
+        com_target (bool): Incluir a coluna 'target' (treino) ou não (teste)
+        random_state (int): Semente
+        chunk_size (int): Linhas geradas por bloco
+        id_inicial (int): Primeiro id
+
+    Returns:
+        Path: Caminho do arquivo gerado
+    """
+    caminho = Path(caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(random_state)
+
+    for inicio in range(0, n_linhas, chunk_size):
+        fim = min(inicio + chunk_size, n_linhas)
+        ids = np.arange(id_inicial + inicio, id_inicial + fim)
+        bloco = _gerar_bloco(rng, ids, com_target)
+        bloco.to_csv(caminho, mode='w' if inicio == 0 else 'a', header=inicio == 0, index=False)
+    return caminho
+
+def gerar_conjunto(diretorio, n_treino, n_teste=None, random_state=52):
+    """
+    Gera treino.csv e teste.csv em um diretório, no formato de templates/.
+
+    Os ids do teste não se repetem no treino.
+    """
+    if n_teste is None:
+        n_teste = max(1, int(n_treino * 0.43))
+    diretorio = Path(diretorio)
+    gerar_csv(diretorio / 'treino.csv', n_treino, True, random_state)
+    gerar_csv(diretorio / 'teste.csv', n_teste, False, random_state + 1, id_inicial=n_treino)
+    return diretorio
+
+def main():
+    parser = argparse.ArgumentParser(description='Gerador de dados sintéticos ONIA')
+    parser.add_argument('diretorio', help='Diretório de destino (treino.csv e teste.csv)')
+    parser.add_argument('--linhas', type=int, default=10_000,
+                       help='Linhas de treino (default: 10000)')
+    parser.add_argument('--linhas-teste', type=int, default=None,
+                       help='Linhas de teste (default: 43%% do treino, como em templates/)')
+    parser.add_argument('--random-state', type=int, default=52)
+    args = parser.parse_args()
+
+    gerar_conjunto(args.diretorio, args.linhas, args.linhas_teste, args.random_state)
+    print(f"Dados gerados em {args.diretorio}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Cache binário dos arquivos CSV do ONIA
+Converte cada CSV na primeira leitura para arrays .npy mapeáveis em memória
+
+Estrutura do cache para <arquivo>.csv (uma entrada por dtype das features):
+    <diretorio_cache>/<arquivo>_<dtype>/features.npy  - matriz (linhas, features)
+    <diretorio_cache>/<arquivo>_<dtype>/id.npy        - coluna 'id'
+    <diretorio_cache>/<arquivo>_<dtype>/target.npy    - coluna 'target' (se existir)
+    <diretorio_cache>/<arquivo>_<dtype>/meta.json     - colunas, dtypes e assinatura da origem
+
+O cache é invalidado quando o mtime/tamanho do CSV mudam e o hash SHA-256
+do conteúdo também não confere mais.
+"""
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DIRETORIO_CACHE = '.cache'
+VERSAO_CACHE = 1
+
+def hash_arquivo(caminho, tamanho_bloco=1 << 20):
+    """Calcula o SHA-256 do arquivo lendo-o em blocos."""
+    h = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+def _diretorio_entrada(caminho, diretorio_cache, dtype):
+    """Retorna o diretório de cache de um CSV para o dtype das features."""
+    caminho = Path(caminho)
+    if diretorio_cache is None:
+        diretorio_cache = caminho.parent / DIRETORIO_CACHE
+    return Path(diretorio_cache) / f"{caminho.stem}_{np.dtype(dtype).name}"
+
+def _cache_valido(caminho, entrada):
+    """
+    Verifica se o cache de um CSV ainda corresponde ao arquivo de origem.
+
+    Compara primeiro mtime e tamanho (barato); só calcula o hash quando eles
+    mudaram, atualizando o meta.json se o conteúdo for o mesmo.
+    """
+    arquivo_meta = entrada / 'meta.json'
+    if not arquivo_meta.exists():
+        return None
+
+    with open(arquivo_meta, encoding='utf-8') as f:
+        meta = json.load(f)
+
+    if meta.get('versao') != VERSAO_CACHE:
+        return None
+
+    stat = Path(caminho).stat()
+    if meta['mtime_ns'] == stat.st_mtime_ns and meta['tamanho'] == stat.st_size:
+        return meta
+
+    if meta['sha256'] != hash_arquivo(caminho):
+        return None
+
+    meta['mtime_ns'] = stat.st_mtime_ns
+    meta['tamanho'] = stat.st_size
+    with open(arquivo_meta, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+def _construir_cache(caminho, entrada, dtype):
+    """Lê o CSV e grava os arrays binários. Retorna (DataFrame, meta) ou (DataFrame, None)."""
+    logger = logging.getLogger(__name__)
+
+    stat = Path(caminho).stat()
+    df = pd.read_csv(caminho)
+
+    colunas_features = [c for c in df.columns if c not in ('id', 'target')]
+    if 'id' not in df.columns or not all(pd.api.types.is_numeric_dtype(df[c]) for c in colunas_features):
+        logger.warning(f"CSV {caminho} não é compatível com o cache binário; usando leitura direta")
+        return df, None
+
+    entrada.mkdir(parents=True, exist_ok=True)
+    (entrada / 'meta.json').unlink(missing_ok=True)
+    np.save(entrada / 'features.npy', np.ascontiguousarray(df[colunas_features].to_numpy(dtype=dtype)))
+    np.save(entrada / 'id.npy', df['id'].to_numpy())
+    if 'target' in df.columns:
+        np.save(entrada / 'target.npy', df['target'].to_numpy())
+
+    meta = {
+        'versao': VERSAO_CACHE,
+        'origem': str(caminho),
+        'mtime_ns': stat.st_mtime_ns,
+        'tamanho': stat.st_size,
+        'sha256': hash_arquivo(caminho),
+        'colunas': list(df.columns),
+        'colunas_features': colunas_features,
+        'dtype': np.dtype(dtype).name,
+    }
+    # meta.json é gravado por último: um cache sem ele nunca é considerado válido
+    with open(entrada / 'meta.json', 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+    logger.info(f"Cache binário criado: {entrada}")
+    return df, meta
+
+def _montar_dataframe(entrada, meta):
+    """Monta o DataFrame a partir dos arrays mapeados em memória (sem cópia das features)."""
+    features = np.load(entrada / 'features.npy', mmap_mode='r')
+    df = pd.DataFrame(features, columns=meta['colunas_features'], copy=False)
+    df.insert(0, 'id', np.load(entrada / 'id.npy', mmap_mode='r'))
+    if 'target' in meta['colunas']:
+        df['target'] = np.load(entrada / 'target.npy', mmap_mode='r')
+    if list(df.columns) != meta['colunas']:
+        df = df[meta['colunas']]
+    return df
+
+def ler_csv(caminho, diretorio_cache=None, dtype=np.float64):
+    """
+    Lê um CSV do ONIA usando o cache binário quando disponível.
+
+    Args:
+        caminho (str): Caminho do CSV
+        diretorio_cache (str): Diretório do cache (default: <pasta do CSV>/.cache)
+        dtype: Tipo das features no cache (np.float64 preserva os valores do CSV)
+
+    Returns:
+        DataFrame: Dados com as mesmas colunas do CSV
+    """
+    logger = logging.getLogger(__name__)
+
+    entrada = _diretorio_entrada(caminho, diretorio_cache, dtype)
+    meta = _cache_valido(caminho, entrada)
+
+    if meta is not None and meta['dtype'] == np.dtype(dtype).name:
+        logger.info(f"Usando cache binário: {entrada}")
+        return _montar_dataframe(entrada, meta)
+
+    df, meta = _construir_cache(caminho, entrada, dtype)
+    if meta is None:
+        return df
+    # Devolver o que acabou de ser gravado: a primeira leitura tem os mesmos
+    # dtypes (features em float32, se pedido) que as leituras seguintes
+    del df
+    return _montar_dataframe(entrada, meta)
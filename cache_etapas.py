@@ -0,0 +1,119 @@
+"""
+Cache das etapas do pipeline ONIA
+Guarda em disco as saídas das etapas (dados preparados, modelo treinado),
+endereçadas pelo hash das entradas, dos parâmetros relevantes e das versões
+do Python e das bibliotecas (os valores guardados são objetos em pickle e
+modelos treinados, que mudam com elas)
+
+Cada entrada é um arquivo <chave>.pkl. O mtime do arquivo é atualizado a
+cada leitura; quando o tamanho total passa do limite, as entradas usadas há
+mais tempo são removidas (LRU).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import platform
+import tempfile
+from functools import lru_cache
+from importlib import metadata
+from pathlib import Path
+
+BIBLIOTECAS = ('xgboost', 'scikit-learn', 'numpy', 'pandas')
+
+@lru_cache(maxsize=None)
+def versoes_bibliotecas():
+    """Versões do Python e das bibliotecas que produzem os valores guardados."""
+    versoes = {'python': platform.python_version()}
+    for nome in BIBLIOTECAS:
+        try:
+            versoes[nome] = metadata.version(nome)
+        except metadata.PackageNotFoundError:
+            versoes[nome] = None
+    return versoes
+
+def assinatura_arquivo(caminho):
+    """Tamanho e mtime de um arquivo: identificação barata, sem ler o conteúdo."""
+    estado = Path(caminho).stat()
+    return {'tamanho': estado.st_size, 'mtime_ns': estado.st_mtime_ns}
+
+def calcular_chave(etapa, *partes):
+    """
+    Calcula a chave de uma etapa a partir de suas entradas.
+
+    As versões de versoes_bibliotecas() entram em toda chave.
+
+    Args:
+        etapa (str): Nome da etapa
+        *partes: Valores serializáveis em JSON (hashes, parâmetros...)
+
+    Returns:
+        str: Hash SHA-256 hexadecimal
+    """
+    conteudo = json.dumps([etapa, versoes_bibliotecas(), *partes], sort_keys=True, default=str)
+    return hashlib.sha256(conteudo.encode()).hexdigest()
+
+class CacheEtapas:
+    """Cache em disco com limite de tamanho e remoção LRU."""
+
+    def __init__(self, diretorio, limite_mb=1024):
+        self.diretorio = Path(diretorio)
+        self.limite_bytes = int(limite_mb * 1024 * 1024)
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+
+    def _caminho(self, chave):
+        return self.diretorio / f"{chave}.pkl"
+
+    def obter(self, chave):
+        """Retorna o valor guardado ou None se a chave não estiver no cache."""
+        logger = logging.getLogger(__name__)
+
+        caminho = self._caminho(chave)
+        try:
+            with open(caminho, 'rb') as f:
+                valor = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Entrada de cache corrompida {caminho.name}: {e}; descartando")
+            caminho.unlink(missing_ok=True)
+            return None
+
+        os.utime(caminho)
+        return valor
+
+    def guardar(self, chave, valor):
+        """Grava o valor de forma atômica e aplica o limite de tamanho."""
+        fd, temporario = tempfile.mkstemp(dir=self.diretorio, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(valor, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporario, self._caminho(chave))
+        except BaseException:
+            Path(temporario).unlink(missing_ok=True)
+            raise
+        self.remover_excedente(manter=chave)
+
+    def remover_excedente(self, manter=None):
+        """Remove as entradas menos usadas recentemente até caber no limite."""
+        logger = logging.getLogger(__name__)
+
+        entradas = []
+        for caminho in self.diretorio.glob('*.pkl'):
+            try:
+                stat = caminho.stat()
+            except FileNotFoundError:
+                continue
+            entradas.append((stat.st_mtime, stat.st_size, caminho))
+
+        total = sum(tamanho for _, tamanho, _ in entradas)
+        for _, tamanho, caminho in sorted(entradas):
+            if total <= self.limite_bytes:
+                break
+            if caminho.stem == manter:
+                continue
+            caminho.unlink(missing_ok=True)
+            total -= tamanho
+            logger.info(f"Cache de etapas: removida entrada {caminho.stem[:12]} ({tamanho / 1024 / 1024:.1f}MB)")
@@ -0,0 +1,299 @@
+"""
+Cache persistente de previsões por linha para o ONIA
+Evita reprever linhas já vistas: a chave de cada linha é um hash de 128 bits
+da impressão digital do modelo (booster, normalização e colunas) e do vetor
+de features bruto, de modo que um acerto dispensa normalização e árvores
+
+As chaves ficam em arrays NumPy ordenados (busca vetorizada com
+searchsorted), com a classe prevista e o instante do último uso de cada
+entrada. Ao salvar, as entradas usadas há mais tempo são descartadas até o
+limite de linhas (LRU). Como a impressão do modelo faz parte da chave,
+entradas de um modelo antigo nunca são reaproveitadas por um novo e acabam
+saindo do cache pelo LRU.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+import artefato as art
+
+ARQUIVO_CACHE = 'previsoes.npz'
+VERSAO_CACHE = 1
+
+def impressao_modelo(booster, colunas, classes, media=None, escala=None):
+    """SHA-256 do booster e dos metadados que afetam a previsão."""
+    h = hashlib.sha256(bytes(booster.save_raw(raw_format='ubj')))
+    metadados = {'colunas': list(colunas), 'classes': classes, 'media': media, 'escala': escala}
+    h.update(json.dumps(metadados, sort_keys=True, default=lambda v: np.asarray(v).tolist()).encode())
+    return h.hexdigest()
+
+def impressao_artefato(artefato):
+    """Impressão digital de um artefato carregado (calculada uma vez)."""
+    if 'impressao' not in artefato:
+        artefato['impressao'] = impressao_modelo(artefato['booster'], artefato['colunas'], artefato['classes'],
+                                                 artefato['scaler_mean'], artefato['scaler_scale'])
+    return artefato['impressao']
+
+def _misturar(h):
+    """Finalizador do splitmix64 (aritmética com overflow intencional)."""
+    with np.errstate(over='ignore'):
+        h = (h ^ (h >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        h = (h ^ (h >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return h ^ (h >> np.uint64(31))
+
+def chaves_linhas(impressao, X):
+    """
+    Calcula as chaves de 128 bits (dois uint64) de cada linha.
+
+    Args:
+        impressao (str): Impressão digital do modelo (hex, ver impressao_modelo)
+        X (ndarray): Features brutas (linhas x colunas do modelo)
+
+    Returns:
+        tuple: (h1, h2) arrays uint64
+    """
+    X = np.ascontiguousarray(X, dtype=np.float64) + 0.0  # -0.0 e 0.0 viram a mesma chave
+    X[np.isnan(X)] = np.nan  # NaN canônico
+    bits = X.view(np.uint64)
+    chaves = []
+    for semente in (impressao[:16], impressao[16:32]):
+        h = np.full(len(X), np.uint64(int(semente, 16)))
+        for coluna in range(bits.shape[1]):
+            h = _misturar(h ^ bits[:, coluna])
+        chaves.append(_misturar(h ^ np.uint64(bits.shape[1])))
+    return chaves[0], chaves[1]
+
+class CachePrevisoes:
+    """
+    Cache de classes previstas por linha, persistido em <diretorio>/previsoes.npz.
+
+    Cada instância consulta as entradas de um modelo (impressao); o arquivo
+    pode conter entradas de vários modelos, que disputam o mesmo limite.
+    """
+
+    def __init__(self, diretorio, impressao, max_linhas=10_000_000):
+        logger = logging.getLogger(__name__)
+
+        self.caminho = Path(diretorio) / ARQUIVO_CACHE
+        self.impressao = impressao
+        self.max_linhas = max_linhas
+        self.h1 = np.zeros(0, dtype=np.uint64)
+        self.h2 = np.zeros(0, dtype=np.uint64)
+        self.classes = np.zeros(0, dtype=np.int64)
+        self.uso = np.zeros(0, dtype=np.int64)
+        self.relogio = 0
+        self.pendentes = []  # Entradas inseridas ainda não intercaladas nos arrays ordenados
+        self.n_pendentes = 0
+        self.novas = []
+        self.usadas = []
+        self.modificado = False
+        self.custo_linha_s = 0.0  # Custo médio de previsão por linha (persistido)
+        self.acertos = 0
+        self.falhas = 0
+        self.tempo_previsao_s = 0.0
+        self.tempo_economizado_s = 0.0
+
+        if self.caminho.exists():
+            try:
+                with np.load(self.caminho) as dados:
+                    if int(dados['versao']) == VERSAO_CACHE:
+                        lidos = (dados['h1'], dados['h2'], dados['classes'], dados['uso'],
+                                 int(dados['relogio']), float(dados['custo_linha_s']))
+                        (self.h1, self.h2, self.classes, self.uso,
+                         self.relogio, self.custo_linha_s) = lidos
+            except Exception as e:
+                logger.warning(f"Cache de previsões corrompido {self.caminho}: {e}; ignorando")
+            logger.info(f"Cache de previsões: {len(self.h1)} entradas carregadas de {self.caminho}")
+
+    def buscar(self, h1, h2):
+        """Retorna (máscara de acertos, classes dos acertos) e marca as entradas como usadas."""
+        self.relogio += 1
+        if len(self.h1) == 0:
+            return np.zeros(len(h1), dtype=bool), np.zeros(0, dtype=np.int64)
+        posicoes = np.minimum(np.searchsorted(self.h1, h1), len(self.h1) - 1)
+        acertos = (self.h1[posicoes] == h1) & (self.h2[posicoes] == h2)
+        self.uso[posicoes[acertos]] = self.relogio
+        if acertos.any():
+            self.usadas.append(h1[acertos])
+            self.modificado = True
+        return acertos, self.classes[posicoes[acertos]]
+
+    def adicionar(self, h1, h2, classes, registrar=True):
+        """
+        Insere entradas. Elas ficam pendentes e são intercaladas em lote (uma
+        ordenação a cada ~25% de crescimento), então só passam a ser
+        encontradas por buscar depois da intercalação.
+        """
+        if len(h1) == 0:
+            return
+        classes = np.asarray(classes, dtype=np.int64)
+        if registrar:
+            self.novas.append((h1, h2, classes))
+        self.pendentes.append((h1, h2, classes, np.full(len(h1), self.relogio, dtype=np.int64)))
+        self.n_pendentes += len(h1)
+        self.modificado = True
+        if self.n_pendentes > max(len(self.h1) // 4, 1 << 20):
+            self._intercalar()
+
+    def _intercalar(self):
+        """Intercala as entradas pendentes; uma chave repetida fica com a classe mais recente."""
+        if not self.pendentes:
+            return
+        h1, h2, classes, usos = (np.concatenate((atual, *partes)) for atual, partes in zip(
+            (self.h1, self.h2, self.classes, self.uso), zip(*self.pendentes)))
+        self.pendentes, self.n_pendentes = [], 0
+
+        # np.unique devolve a primeira ocorrência; invertendo, fica a mais recente
+        _, indices = np.unique(h1[::-1], return_index=True)
+        indices = len(h1) - 1 - indices
+        self.h1, self.h2 = h1[indices], h2[indices]
+        self.classes, self.uso = classes[indices], usos[indices]
+        if len(self.h1) > 2 * self.max_linhas:
+            self._remover_excedente()
+
+    def _remover_excedente(self):
+        """Mantém as max_linhas entradas usadas mais recentemente (LRU)."""
+        if len(self.h1) <= self.max_linhas:
+            return 0
+        removidas = len(self.h1) - self.max_linhas
+        manter = np.sort(np.argpartition(self.uso, removidas)[removidas:])
+        self.h1, self.h2 = self.h1[manter], self.h2[manter]
+        self.classes, self.uso = self.classes[manter], self.uso[manter]
+        return removidas
+
+    def prever(self, X, prever_falhas):
+        """
+        Prevê as classes usando o cache; só as linhas ausentes vão ao modelo, em uma chamada.
+
+        Args:
+            X (ndarray): Features brutas (antes da normalização), na ordem das colunas do modelo
+            prever_falhas (callable): Recebe a máscara das linhas ausentes e
+                retorna as classes previstas para elas
+
+        Returns:
+            ndarray: Classes previstas
+        """
+        h1, h2 = chaves_linhas(self.impressao, X)
+        acertos, classes_cache = self.buscar(h1, h2)
+
+        previsoes = np.empty(len(h1), dtype=np.int64)
+        previsoes[acertos] = classes_cache
+        falhas = ~acertos
+        if falhas.any():
+            inicio = time.perf_counter()
+            previsoes[falhas] = prever_falhas(falhas)
+            self.tempo_previsao_s += time.perf_counter() - inicio
+            self.adicionar(h1[falhas], h2[falhas], previsoes[falhas])
+
+        self.acertos += int(acertos.sum())
+        self.falhas += int(falhas.sum())
+        if self.falhas:
+            self.custo_linha_s = self.tempo_previsao_s / self.falhas
+        # Tempo economizado estimado pelo custo médio por linha das falhas
+        # (desta execução ou, se todas foram acertos, das anteriores)
+        self.tempo_economizado_s += int(acertos.sum()) * self.custo_linha_s
+        return previsoes
+
+    def prever_artefato(self, artefato, X):
+        """Atalho de prever para um artefato carregado (DataFrame ou ndarray bruto)."""
+        if hasattr(X, 'columns'):
+            X = X[artefato['colunas']]
+        X = np.asarray(X, dtype=np.float64)
+        return self.prever(X, lambda falhas: art.prever(artefato, X[falhas]))
+
+    def extrair_novas(self):
+        """
+        Retorna e esquece o que mudou desde a última extração, para ser
+        incorporado ao cache de outro processo (ver incorporar).
+
+        Returns:
+            dict: h1, h2 e classes das entradas novas, usadas (h1 dos acertos)
+                e estatisticas
+        """
+        vazio = np.zeros(0, dtype=np.uint64)
+        novas = {
+            'h1': np.concatenate([n[0] for n in self.novas]) if self.novas else vazio,
+            'h2': np.concatenate([n[1] for n in self.novas]) if self.novas else vazio,
+            'classes': (np.concatenate([n[2] for n in self.novas]) if self.novas
+                        else np.zeros(0, dtype=np.int64)),
+            'usadas': np.concatenate(self.usadas) if self.usadas else vazio,
+            'estatisticas': self.resumo(),
+        }
+        self.novas, self.usadas = [], []
+        self.acertos = self.falhas = 0
+        self.tempo_previsao_s = self.tempo_economizado_s = 0.0
+        return novas
+
+    def incorporar(self, novas):
+        """
+        Incorpora as entradas, os usos e as estatísticas extraídos de outro processo.
+
+        O custo por linha passa a ser a média ponderada pelas falhas de todos
+        os processos incorporados, e os acertos recebidos são valorizados por
+        ele (o worker pode não ter tido falhas para estimar o próprio custo).
+        """
+        self.relogio += 1
+        if len(novas['usadas']) and len(self.h1):
+            posicoes = np.minimum(np.searchsorted(self.h1, novas['usadas']), len(self.h1) - 1)
+            self.uso[posicoes[self.h1[posicoes] == novas['usadas']]] = self.relogio
+            self.modificado = True
+        self.adicionar(novas['h1'], novas['h2'], novas['classes'], registrar=False)
+        estatisticas = novas['estatisticas']
+        self.acertos += estatisticas['acertos']
+        self.falhas += estatisticas['falhas']
+        self.tempo_previsao_s += estatisticas['tempo_previsao_s']
+        if estatisticas['falhas'] and self.falhas:
+            self.custo_linha_s = self.tempo_previsao_s / self.falhas
+            self.modificado = True
+        self.tempo_economizado_s += estatisticas['acertos'] * self.custo_linha_s
+
+    def resumo(self):
+        """Estatísticas de acertos e tempo economizado desde a criação (ou a última extração)."""
+        total = self.acertos + self.falhas
+        return {
+            'acertos': self.acertos,
+            'falhas': self.falhas,
+            'taxa_acerto': self.acertos / total if total else 0.0,
+            'tempo_previsao_s': self.tempo_previsao_s,
+            'tempo_economizado_s': self.tempo_economizado_s,
+            'entradas': len(self.h1) + self.n_pendentes,
+        }
+
+    def registrar_resumo(self):
+        """Registra no log a taxa de acertos e o tempo economizado."""
+        r = self.resumo()
+        logging.getLogger(__name__).info(
+            f"Cache de previsões: {r['acertos']} acertos, {r['falhas']} falhas "
+            f"({r['taxa_acerto'] * 100:.1f}% de acerto), ~{r['tempo_economizado_s']:.2f}s economizados, "
+            f"{r['entradas']} entradas")
+        return r
+
+    def salvar(self):
+        """Aplica o limite de linhas (LRU) e grava o cache de forma atômica."""
+        logger = logging.getLogger(__name__)
+
+        if not self.modificado:
+            return
+        self._intercalar()
+        removidas = self._remover_excedente()
+        if removidas:
+            logger.info(f"Cache de previsões: {removidas} entradas removidas (LRU)")
+
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        fd, temporario = tempfile.mkstemp(dir=self.caminho.parent, suffix='.npz.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, versao=VERSAO_CACHE, relogio=self.relogio, custo_linha_s=self.custo_linha_s,
+                         h1=self.h1, h2=self.h2, classes=self.classes, uso=self.uso)
+            os.replace(temporario, self.caminho)
+        except BaseException:
+            Path(temporario).unlink(missing_ok=True)
+            raise
+        self.modificado = False
@@ -1,9 +1,18 @@
 """
 Script de verificação de resultados ONIA
 Verifica se o arquivo de resultados tem a estrutura correta
+
+Os arquivos de resultado e de teste são lidos em blocos, em uma única
+passada cada, com memória limitada: o conjunto de ids é mantido em arrays
+ordenados de ids distintos (8 bytes por id), fundidos bloco a bloco, e não
+em um bitmap do tamanho do maior id nem em uma lista de todas as linhas.
+
+numpy e pandas só são importados ao ler os dados: --help, arquivo
+inexistente e cabeçalho errado respondem sem carregá-los.
 """
 
-import pandas as pd
+import argparse
+import csv
 import os
 import sys
 import logging
@@ -12,13 +21,95 @@ import logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def verificar_resultado(arquivo='resultado.csv'):
+COLUNAS_ESPERADAS = ['id', 'target']
+CLASSES_PERMITIDAS = (0, 1, 2, 3, 4)
+CHUNK_SIZE = 1_000_000
+
+class ConjuntoIds:
+    """
+    Conjunto de ids inteiros (int64), com detecção de duplicatas.
+
+    Os ids ficam em blocos de arrays ordenados e sem repetição; um bloco
+    novo é fundido aos anteriores enquanto for ao menos do tamanho deles,
+    então há no máximo log2(n) blocos e a memória cresce com o número de
+    ids distintos, não com o maior id.
+    """
+
+    def __init__(self):
+        self.blocos = []
+        self.total = 0
+        self.duplicados = 0
+        self.exemplos_duplicados = []
+
+    def _contem(self, valores):
+        """Máscara dos valores (ordenados) já presentes em algum bloco."""
+        import numpy as np
+        presentes = np.zeros(len(valores), dtype=bool)
+        for bloco in self.blocos:
+            posicoes = np.minimum(np.searchsorted(bloco, valores), len(bloco) - 1)
+            presentes |= bloco[posicoes] == valores
+        return presentes
+
+    def adicionar(self, ids):
+        import numpy as np
+        if len(ids) == 0:
+            return
+
+        # Duplicatas dentro do bloco e em relação aos blocos anteriores
+        unicos, contagens = np.unique(ids, return_counts=True)
+        ja_vistos = self._contem(unicos)
+        repetidos = unicos[(contagens > 1) | ja_vistos]
+        if len(repetidos):
+            self.duplicados += int(len(ids) - len(unicos)) + int(ja_vistos.sum())
+            self.exemplos_duplicados.extend(repetidos[:5 - len(self.exemplos_duplicados)].tolist())
+
+        # Os blocos são disjuntos: a união é só concatenar e ordenar
+        novo = unicos[~ja_vistos]
+        while self.blocos and len(self.blocos[-1]) <= len(novo):
+            novo = np.sort(np.concatenate((self.blocos.pop(), novo)))
+        self.blocos.append(novo)
+        self.total += len(ids)
+
+    def valores(self):
+        """Todos os ids distintos, ordenados (funde os blocos em um só)."""
+        import numpy as np
+        if len(self.blocos) > 1:
+            self.blocos = [np.sort(np.concatenate(self.blocos))]
+        return self.blocos[0] if self.blocos else np.zeros(0, dtype=np.int64)
+
+    def comparar(self, outro):
+        """Retorna (ids só em self, ids só em outro) como arrays ordenados."""
+        import numpy as np
+        a, b = self.valores(), outro.valores()
+        return np.setdiff1d(a, b, assume_unique=True), np.setdiff1d(b, a, assume_unique=True)
+
+def _ler_ids(bloco, arquivo):
+    """Extrai a coluna 'id' de um bloco como int64, validando nulos e tipo."""
+    import numpy as np
+    import pandas as pd
+
+    ids = bloco['id']
+    if ids.isnull().any():
+        raise ValueError(f"{arquivo}: coluna 'id' contém valores nulos")
+    if not pd.api.types.is_integer_dtype(ids):
+        raise ValueError(f"{arquivo}: coluna 'id' deveria ser inteira, mas é {ids.dtype}")
+    return ids.to_numpy(dtype=np.int64)
+
+def verificar_resultado(arquivo='resultado.csv', arquivo_teste=os.path.join('templates', 'teste.csv'),
+                        chunk_size=CHUNK_SIZE, classes_permitidas=CLASSES_PERMITIDAS):
     """
     Verifica se o arquivo de resultados está correto.
-    
+
+    Confere o esquema (colunas 'id' e 'target'), os tipos inteiros, a ausência
+    de nulos, se todas as classes são permitidas e se o conjunto de ids é
+    exatamente o do arquivo de teste, sem duplicatas.
+
     Args:
         arquivo (str): Caminho para o arquivo de resultados
-    
+        arquivo_teste (str): Arquivo de teste com os ids esperados (None para não comparar)
+        chunk_size (int): Linhas lidas por bloco
+        classes_permitidas (tuple): Classes válidas para 'target'
+
     Returns:
         bool: True se válido, False caso contrário
     """
@@ -26,57 +117,123 @@ def verificar_resultado(arquivo='resultado.csv'):
         if not os.path.exists(arquivo):
             logger.error(f"Arquivo {arquivo} não encontrado")
             return False
-        
-        # Carregar o arquivo
+
         logger.info(f"Verificando arquivo: {arquivo}")
-        df = pd.read_csv(arquivo)
-        
-        # Verificar número de linhas
-        num_linhas = len(df)
+
+        # Verificar colunas pelo cabeçalho, antes de ler os dados
+        with open(arquivo, newline='', encoding='utf-8') as f:
+            colunas = next(csv.reader(f), [])
+        if colunas != COLUNAS_ESPERADAS:
+            logger.error(f"Colunas esperadas: {COLUNAS_ESPERADAS}, encontradas: {colunas}")
+            return False
+
+        logger.info(f"Colunas corretas: {colunas}")
+
+        import numpy as np
+        import pandas as pd
+
+        valido = True
+        ids_resultado = ConjuntoIds()
+        distribuicao = np.zeros(max(classes_permitidas) + 1, dtype=np.int64)
+        permitidas = np.zeros(max(classes_permitidas) + 1, dtype=bool)
+        permitidas[list(classes_permitidas)] = True
+        classes_invalidas = set()
+        primeiras_linhas = None
+
+        # Passada única sobre o resultado
+        for bloco in pd.read_csv(arquivo, chunksize=chunk_size):
+            if primeiras_linhas is None:
+                primeiras_linhas = bloco.head()
+
+            ids_resultado.adicionar(_ler_ids(bloco, arquivo))
+
+            target = bloco['target']
+            if target.isnull().any():
+                logger.error(f"Encontrados {int(target.isnull().sum())} valores nulos em 'target'")
+                return False
+            if not pd.api.types.is_integer_dtype(target):
+                logger.error(f"Target deveria ser inteiro, mas é: {target.dtype}")
+                return False
+
+            target = target.to_numpy(dtype=np.int64)
+            dentro = (target >= 0) & (target < len(permitidas))
+            validas = dentro.copy()
+            validas[dentro] = permitidas[target[dentro]]
+            if not validas.all():
+                classes_invalidas.update(np.unique(target[~validas]).tolist())
+            distribuicao += np.bincount(target[validas], minlength=len(distribuicao))
+
+        num_linhas = ids_resultado.total
         logger.info(f"Número de linhas: {num_linhas}")
-        
-        # Verificar colunas
-        colunas_esperadas = ['id', 'target']
-        if not all(col in df.columns for col in colunas_esperadas):
-            logger.error(f"Colunas esperadas: {colunas_esperadas}, encontradas: {list(df.columns)}")
+        logger.info("Nenhum valor nulo encontrado")
+
+        if num_linhas == 0:
+            logger.error("Arquivo de resultados sem linhas")
             return False
-        
-        logger.info(f"Colunas corretas: {list(df.columns)}")
-        
-        # Verificar se há valores nulos
-        valores_nulos = df.isnull().sum().sum()
-        if valores_nulos > 0:
-            logger.warning(f"Encontrados {valores_nulos} valores nulos")
-        else:
-            logger.info("Nenhum valor nulo encontrado")
-        
-        # Verificar tipos de dados
-        logger.info(f"Tipo da coluna 'id': {df['id'].dtype}")
-        logger.info(f"Tipo da coluna 'target': {df['target'].dtype}")
-        
+
+        if classes_invalidas:
+            logger.error(f"Classes não permitidas em 'target': {sorted(classes_invalidas)} "
+                         f"(permitidas: {list(classes_permitidas)})")
+            valido = False
+
+        if ids_resultado.duplicados:
+            logger.error(f"Encontrados {ids_resultado.duplicados} ids duplicados "
+                         f"(exemplos: {ids_resultado.exemplos_duplicados})")
+            valido = False
+
+        # Comparar com os ids do teste
+        if arquivo_teste:
+            if not os.path.exists(arquivo_teste):
+                logger.error(f"Arquivo de teste {arquivo_teste} não encontrado")
+                return False
+
+            ids_teste = ConjuntoIds()
+            for bloco in pd.read_csv(arquivo_teste, usecols=['id'], chunksize=chunk_size):
+                ids_teste.adicionar(_ler_ids(bloco, arquivo_teste))
+
+            faltando, extras = ids_teste.comparar(ids_resultado)
+            if len(faltando) or len(extras):
+                logger.error(f"Ids diferentes de {arquivo_teste}: {len(faltando)} faltando "
+                             f"(ex.: {faltando[:5].tolist()}), {len(extras)} extras "
+                             f"(ex.: {extras[:5].tolist()})")
+                valido = False
+            else:
+                logger.info(f"Ids conferem com {arquivo_teste} ({ids_teste.total} ids)")
+
         # Mostrar estatísticas das classes
-        distribuicao = df['target'].value_counts().sort_index()
         logger.info("Distribuição das classes:")
-        for classe, count in distribuicao.items():
-            logger.info(f"  Classe {classe}: {count} ({count/len(df)*100:.1f}%)")
-        
-        # Verificar se todas as classes são números inteiros
-        if not df['target'].dtype in ['int64', 'int32']:
-            logger.warning(f"Target deveria ser inteiro, mas é: {df['target'].dtype}")
-        
+        for classe in classes_permitidas:
+            count = int(distribuicao[classe])
+            logger.info(f"  Classe {classe}: {count} ({count/num_linhas*100:.1f}%)")
+
         # Mostrar primeiras linhas
         logger.info("Primeiras 5 linhas:")
-        for i, row in df.head().iterrows():
-            logger.info(f"  {row['id']},{row['target']}")
-        
+        for row in primeiras_linhas.itertuples(index=False):
+            logger.info(f"  {row.id},{row.target}")
+
+        if not valido:
+            logger.error("❌ Verificação encontrou problemas")
+            return False
+
         logger.info("✅ Verificação concluída com sucesso!")
         return True
-        
+
     except Exception as e:
         logger.error(f"Erro durante verificação: {e}")
         return False
 
 if __name__ == "__main__":
-    sucesso = verificar_resultado()
+    parser = argparse.ArgumentParser(description='Verificação do arquivo de resultados ONIA')
+    parser.add_argument('arquivo', nargs='?', default='resultado.csv',
+                       help='Arquivo de resultados (default: resultado.csv)')
+    parser.add_argument('--teste', default=os.path.join('templates', 'teste.csv'),
+                       help='Arquivo de teste com os ids esperados (default: templates/teste.csv)')
+    parser.add_argument('--no-ids', action='store_true',
+                       help='Não comparar os ids com o arquivo de teste')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                       help=f'Linhas lidas por bloco (default: {CHUNK_SIZE})')
+    args = parser.parse_args()
+
+    sucesso = verificar_resultado(args.arquivo, None if args.no_ids else args.teste, args.chunk_size)
     if not sucesso:
-        sys.exit(1)
\ No newline at end of file
+        sys.exit(1)
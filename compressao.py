@@ -0,0 +1,146 @@
+"""
+Compressão do modelo ONIA para inferência mais rápida
+Gera versões menores do modelo treinado e mede o custo em precisão de cada uma
+
+Candidatos:
+- poda: mantém só as árvores até a melhor iteração na validação
+- profundidade: retreina com max_depth limitado
+- destilado: treina um booster pequeno (aluno) para reproduzir o
+  predict_proba do modelo original (professor)
+
+Para cada candidato são medidos tamanho em disco, latência por linha e a
+diferença de Medida-F em relação ao professor.
+"""
+
+import logging
+import time
+
+import numpy as np
+import xgboost as xgb
+from sklearn.metrics import f1_score, log_loss
+from xgboost import XGBClassifier
+
+def _classificador_de_booster(booster, xgboost_params):
+    """Carrega um booster em um XGBClassifier com os parâmetros dados."""
+    modelo = XGBClassifier(**xgboost_params)
+    modelo.load_model(bytearray(booster.save_raw()))
+    return modelo
+
+def tamanho_modelo_bytes(modelo):
+    """Tamanho do modelo no formato binário nativo (UBJSON)."""
+    return len(modelo.get_booster().save_raw(raw_format='ubj'))
+
+def latencia_por_linha_ms(modelo, X, repeticoes=5):
+    """Menor latência média por linha (ms) de modelo.predict sobre X."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        modelo.predict(X)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos) / len(X) * 1000
+
+def podar_melhor_iteracao(modelo, X_val, y_val, xgboost_params, pontos=50):
+    """
+    Mantém só as árvores até a melhor iteração na validação.
+
+    Usa a melhor iteração do early stopping quando existir; caso contrário,
+    avalia o mlogloss na validação em até `pontos` prefixos do modelo.
+    """
+    booster = modelo.get_booster()
+    melhor = booster.attr('best_iteration')
+    if melhor is not None:
+        n_arvores = int(melhor) + 1
+    else:
+        total = booster.num_boosted_rounds()
+        passo = max(1, total // pontos)
+        matriz = xgb.DMatrix(X_val)
+        perdas = {n: log_loss(y_val, booster.predict(matriz, iteration_range=(0, n)),
+                              labels=modelo.classes_)
+                  for n in sorted(set(range(passo, total + 1, passo)) | {total})}
+        n_arvores = min(perdas, key=perdas.get)
+    return _classificador_de_booster(booster[:n_arvores], xgboost_params), n_arvores
+
+def retreinar_profundidade(X_train, y_train, xgboost_params, max_depth):
+    """Retreina o modelo com profundidade máxima limitada."""
+    params = dict(xgboost_params, max_depth=max_depth, early_stopping_rounds=None)
+    return XGBClassifier(**params).fit(X_train, y_train)
+
+def destilar(professor, X_train, parametros_aluno):
+    """
+    Treina um aluno pequeno sobre as probabilidades do professor.
+
+    Cada linha é repetida uma vez por classe, com rótulo k e peso p_k do
+    professor: a log-loss multiclasse ponderada equivale à entropia cruzada
+    com os alvos suaves do professor.
+    """
+    proba = professor.predict_proba(X_train)
+    n, n_classes = proba.shape
+    X_rep = np.repeat(np.asarray(X_train), n_classes, axis=0)
+    y_rep = np.tile(np.arange(n_classes), n)
+    pesos = proba.reshape(-1)
+
+    # Pesos desprezíveis são descartados, mas cada classe mantém ao menos a
+    # linha em que o professor lhe dá mais probabilidade: sem rótulos de uma
+    # classe rara o aluno teria menos saídas que o professor
+    manter = pesos > 1e-6
+    manter[np.argmax(proba, axis=0) * n_classes + np.arange(n_classes)] = True
+    aluno = XGBClassifier(**parametros_aluno)
+    aluno.fit(X_rep[manter], y_rep[manter], sample_weight=pesos[manter])
+    if aluno.n_classes_ != n_classes:
+        raise ValueError(f"Aluno destilado com {aluno.n_classes_} classes; o professor tem {n_classes}")
+    return aluno
+
+def comprimir_modelo(modelo, X_train, y_train, X_val, y_val, xgboost_params,
+                     max_depth=6, parametros_aluno=None):
+    """
+    Gera os candidatos comprimidos e o relatório de tamanho/latência/F1.
+
+    Args:
+        modelo (XGBClassifier): Modelo treinado (professor)
+        X_train, y_train: Dados de treino
+        X_val, y_val: Dados de validação
+        xgboost_params (dict): Parâmetros usados no treino do professor
+        max_depth (int): Profundidade do candidato retreinado
+        parametros_aluno (dict): Parâmetros do aluno destilado
+
+    Returns:
+        dict: {nome: {'modelo', 'tamanho_bytes', 'latencia_ms_linha', 'f1', 'delta_f1'}}
+    """
+    logger = logging.getLogger(__name__)
+
+    if parametros_aluno is None:
+        parametros_aluno = {'n_estimators': 100, 'max_depth': 6, 'learning_rate': 0.1}
+    parametros_aluno = dict(parametros_aluno)
+    for chave in ('random_state', 'n_jobs', 'tree_method'):
+        if chave in xgboost_params:
+            parametros_aluno.setdefault(chave, xgboost_params[chave])
+
+    candidatos = {'professor': modelo}
+
+    logger.info("Compressão: podando até a melhor iteração...")
+    candidatos['poda'], n_arvores = podar_melhor_iteracao(modelo, X_val, y_val, xgboost_params)
+    logger.info(f"  Melhor iteração: {n_arvores} de {modelo.get_booster().num_boosted_rounds()} rodadas")
+
+    logger.info(f"Compressão: retreinando com max_depth={max_depth}...")
+    candidatos['profundidade'] = retreinar_profundidade(X_train, y_train, xgboost_params, max_depth)
+
+    logger.info(f"Compressão: destilando em aluno {parametros_aluno}...")
+    candidatos['destilado'] = destilar(modelo, X_train, parametros_aluno)
+
+    f1_professor = f1_score(y_val, modelo.predict(X_val), average='weighted')
+    relatorio = {}
+    logger.info(f"{'candidato':<13} {'tamanho (KB)':>13} {'ms/linha':>10} {'F1 val':>8} {'ΔF1':>8}")
+    for nome, candidato in candidatos.items():
+        f1 = f1_score(y_val, candidato.predict(X_val), average='weighted')
+        relatorio[nome] = {
+            'modelo': candidato,
+            'tamanho_bytes': tamanho_modelo_bytes(candidato),
+            'latencia_ms_linha': latencia_por_linha_ms(candidato, X_val),
+            'f1': f1,
+            'delta_f1': f1 - f1_professor,
+        }
+        r = relatorio[nome]
+        logger.info(f"{nome:<13} {r['tamanho_bytes'] / 1024:>13.1f} {r['latencia_ms_linha']:>10.4f} "
+                    f"{f1:>8.4f} {r['delta_f1']:>+8.4f}")
+
+    return relatorio
@@ -4,6 +4,11 @@
 DATA_DIR = "templates"
 OUTPUT_FILE = "resultado.csv"
 LOG_FILE = "modelo_onia.log"
+USE_DATA_CACHE = True  # Cache binário (.npy) dos CSVs em <DATA_DIR>/.cache
+USE_STAGE_CACHE = False  # Reaproveitar dados preparados e modelo entre execuções (opt-in: --stage-cache)
+STAGE_CACHE_DIR = ".cache_etapas"
+STAGE_CACHE_MAX_MB = 2048  # Limite do cache de etapas (remoção LRU)
+MODEL_DIR = "modelo_onia"  # Artefato do modelo treinado (None para não salvar)
 
 # Configurações do Modelo XGBoost
 XGBOOST_PARAMS = {
@@ -11,16 +16,81 @@ XGBOOST_PARAMS = {
     "max_depth": 20,
     "learning_rate": 0.1,
     "random_state": 52,
-    "n_jobs": -1,
-    "eval_metric": "mlogloss"
+    "n_jobs": -1,  # Número de threads (nthread); -1 usa todos os cores
+    "tree_method": "hist",  # hist, approx ou exact
+    "max_bin": 256,  # Número de bins do histograma (hist/approx)
+    "grow_policy": "depthwise",  # depthwise ou lossguide
+    "max_leaves": 0,  # Máximo de folhas por árvore (0 = sem limite; usar com lossguide)
+    "eval_metric": "mlogloss",
+    "early_stopping_rounds": None  # Paciência do early stopping (None desabilita)
 }
 
+# Representação compacta: features em float32, target em int32 (ids em int64) e
+# QuantileDMatrix construída uma vez para treino e validação
+COMPACT_DTYPES = False
+
+# Ensemble de modelos base (None, "soft" ou "stacking")
+ENSEMBLE = None
+MAX_CORES = None  # Limite total de cores do ensemble (None = todos)
+
+# Compressão do modelo após o treino (poda, profundidade limitada, destilação)
+COMPRESSION = False
+COMPRESSION_MAX_DEPTH = 6  # max_depth do candidato retreinado
+DISTILLATION_PARAMS = {"n_estimators": 100, "max_depth": 6, "learning_rate": 0.1}
+COMPRESSION_SHIP = None  # Candidato usado no artefato/previsões: "poda", "profundidade" ou "destilado"
+
+# Seleção de features por importância (ganho e permutação na validação; ver selecao_features.py)
+FEATURE_SELECTION = False
+FEATURE_SELECTION_MIN = 1  # Menor subconjunto avaliado
+FEATURE_SELECTION_STEP = 1  # Features removidas por iteração
+FEATURE_SELECTION_TOLERANCE = 0.005  # Perda de F1 aceita em relação ao melhor subconjunto
+FEATURES = None  # Colunas lidas e usadas no treino (None = todas)
+
+# Treino incremental: rodadas de boosting adicionadas a cada lote de dados novos
+INCREMENTAL_ROUNDS = 50
+
+# Pipeline concorrente (grafo de etapas em threads; ver agendador.py)
+CONCURRENT = False
+THREAD_BUDGET = None  # Threads totais compartilhadas com o nthread do XGBoost (None = todos os cores)
+
 # Configurações de Validação
 VALIDATION_SIZE = 0.1  # 10% para validação
 RANDOM_STATE = 52
 
 # Configurações de Normalização
 USE_SCALING = True
+FOLD_SCALER = False  # Incorporar a normalização aos limiares do artefato salvo
+
+# Configurações de Previsão
+STREAMING_PREDICTION = False  # Ler o teste em blocos em vez de carregá-lo inteiro
+CHUNK_SIZE = 100_000  # Linhas por bloco no modo streaming
+
+# Backend de inferência: "xgboost" (XGBClassifier.predict) ou "compilado"
+# (árvores em arrays NumPy, ver preditor_compilado.py; mesmas classes previstas).
+# O compilado só é mais rápido em lotes de até 4 linhas (serve.py); lotes maiores
+# são repassados ao booster
+INFERENCE_BACKEND = "xgboost"
+
+# Previsão em lote de vários arquivos (batch_predict.py)
+BATCH_WORKERS = None  # Processos paralelos (None = min(arquivos, cores))
+
+# Cache persistente de previsões por linha (cache_previsoes.py); None = desativado
+PREDICTION_CACHE_DIR = None  # ex.: ".cache_previsoes"
+PREDICTION_CACHE_MAX_ROWS = 10_000_000  # Limite de entradas (remoção LRU)
+
+# Explicação das previsões (explain.py)
+EXPLAIN_DIR = "explicacoes"
+EXPLAIN_CHUNK_SIZE = 10_000  # Linhas por bloco no cálculo das contribuições SHAP
+
+# Configurações do Servidor de Previsão
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8080
+MAX_BATCH_SIZE = 256  # Máximo de requisições agrupadas em uma chamada ao modelo
+MAX_WAIT_MS = 2.0  # Tempo máximo de espera para completar um micro-lote
+
+# Configurações de Instrumentação
+RUN_REPORT = True  # Relatório JSON por etapa (<saída>.run.json) ao lado do resultado
+PROFILE = False  # cProfile no treino (<saída>.fit.prof) e tracemalloc por etapa
 
 # Configurações de Logging
 LOG_LEVEL = "INFO"
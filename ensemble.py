@@ -0,0 +1,216 @@
+"""
+Ensemble de modelos para o ONIA
+Treina vários modelos base em processos paralelos e os combina por votação
+suave (média das probabilidades) ou por stacking (regressão logística sobre
+as probabilidades out-of-fold)
+
+Modelos base padrão (modelos_base_padrao): XGBoost com os parâmetros
+configurados variando só semente e profundidade, HistGradientBoostingClassifier
+e RandomForest com o mesmo número de iterações/árvores (ver processo.txt).
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import f1_score
+from sklearn.model_selection import StratifiedKFold
+
+import validacao_cruzada as vc
+
+# Parâmetros do XGBoost que não se aplicam aos modelos base: as threads vêm
+# do orçamento do ensemble e os ajustes nos workers não têm eval_set
+PARAMETROS_IGNORADOS = ('n_jobs', 'nthread', 'early_stopping_rounds')
+
+# Profundidades dos XGBoost base, como fração da configurada (20 -> 20, 12, 8)
+FRACOES_PROFUNDIDADE = (1.0, 0.6, 0.4)
+
+def modelos_base_padrao(xgboost_params):
+    """
+    Modelos base derivados dos parâmetros do XGBoost configurados.
+
+    Os XGBoost usam os parâmetros configurados, variando só a semente e a
+    profundidade; HistGradientBoosting e RandomForest recebem o mesmo
+    número de iterações/árvores (e a taxa de aprendizado/profundidade).
+
+    Args:
+        xgboost_params (dict): Parâmetros do XGBClassifier (config.XGBOOST_PARAMS)
+
+    Returns:
+        dict: {nome: (tipo, parâmetros)}
+    """
+    base = {k: v for k, v in xgboost_params.items() if k not in PARAMETROS_IGNORADOS}
+    semente = base.get('random_state', 52)
+    n_estimators = base.get('n_estimators', 100)
+    profundidade = base.get('max_depth') or 6
+
+    modelos = {}
+    for i, fracao in enumerate(FRACOES_PROFUNDIDADE):
+        parametros = dict(base, max_depth=max(1, round(profundidade * fracao)), random_state=semente + i)
+        modelos[f"xgb_d{parametros['max_depth']}_s{parametros['random_state']}"] = ('xgboost', parametros)
+    modelos['hist_gb'] = ('hist_gradient_boosting', {
+        'max_iter': n_estimators, 'learning_rate': base.get('learning_rate', 0.1), 'random_state': semente})
+    modelos['random_forest'] = ('random_forest', {
+        'n_estimators': n_estimators, 'max_depth': profundidade, 'random_state': semente})
+    return modelos
+
+# Dados do processo worker, preenchidos por _inicializar_worker
+_dados_worker = {}
+
+def criar_modelo(tipo, parametros, n_threads):
+    """Instancia um modelo base do tipo dado."""
+    if tipo == 'xgboost':
+        from xgboost import XGBClassifier
+        return XGBClassifier(**{'eval_metric': 'mlogloss', **parametros, 'n_jobs': n_threads})
+    if tipo == 'hist_gradient_boosting':
+        from sklearn.ensemble import HistGradientBoostingClassifier
+        return HistGradientBoostingClassifier(**parametros)
+    if tipo == 'random_forest':
+        from sklearn.ensemble import RandomForestClassifier
+        return RandomForestClassifier(**parametros, n_jobs=n_threads)
+    raise ValueError(f"Tipo de modelo base desconhecido: {tipo}")
+
+def _inicializar_worker(X, y, n_threads):
+    """Recebe os dados de treino uma única vez por processo worker."""
+    _dados_worker.update(X=X, y=y, n_threads=n_threads)
+
+def _ajustar(nome, tipo, parametros, indices_treino, indices_previsao):
+    """
+    Ajusta um modelo base. Executado no processo worker.
+
+    Com indices_previsao, devolve as probabilidades out-of-fold dessas linhas;
+    sem eles, devolve o modelo ajustado.
+    """
+    from threadpoolctl import threadpool_limits
+
+    X, y, n_threads = _dados_worker['X'], _dados_worker['y'], _dados_worker['n_threads']
+    with threadpool_limits(limits=n_threads):
+        modelo = criar_modelo(tipo, parametros, n_threads)
+        inicio = time.perf_counter()
+        if indices_treino is None:
+            modelo.fit(X, y)
+        else:
+            modelo.fit(X[indices_treino], y[indices_treino])
+        tempo_fit = time.perf_counter() - inicio
+
+        if indices_previsao is not None:
+            return nome, indices_previsao, modelo.predict_proba(X[indices_previsao]), tempo_fit
+    return nome, None, modelo, tempo_fit
+
+class Ensemble:
+    """Combinação de modelos base já ajustados, com a interface predict/predict_proba."""
+
+    def __init__(self, modelos, metodo='soft', meta_modelo=None):
+        self.modelos = modelos
+        self.metodo = metodo
+        self.meta_modelo = meta_modelo
+        self.classes_ = next(iter(modelos.values())).classes_
+
+    def probabilidades_base(self, X):
+        """Probabilidades de cada modelo base, concatenadas por coluna."""
+        return np.hstack([m.predict_proba(X) for m in self.modelos.values()])
+
+    def predict_proba(self, X):
+        if self.metodo == 'stacking':
+            return self.meta_modelo.predict_proba(self.probabilidades_base(X))
+        return np.mean([m.predict_proba(X) for m in self.modelos.values()], axis=0)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+def _latencia_por_linha_ms(funcao, X, repeticoes=3):
+    """Mede a latência média por linha (ms) de uma função de previsão."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(X)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos) / len(X) * 1000
+
+def treinar_ensemble(X_train, y_train, X_val, y_val, metodo='soft', modelos_base=None,
+                     max_cores=None, k_folds=5, random_state=52, xgboost_params=None):
+    """
+    Treina os modelos base em paralelo e os combina.
+
+    Args:
+        X_train, y_train: Dados de treino
+        X_val, y_val: Dados de validação (para o relatório de F1/latência)
+        metodo (str): 'soft' (média das probabilidades) ou 'stacking'
+        modelos_base (dict): {nome: (tipo, parâmetros)} (default: modelos_base_padrao(xgboost_params))
+        max_cores (int): Limite total de cores (default: todos)
+        k_folds (int): Folds das probabilidades out-of-fold do stacking
+        random_state (int): Semente
+        xgboost_params (dict): Parâmetros configurados do XGBoost, dos quais
+            os modelos base padrão são derivados (default: config.XGBOOST_PARAMS)
+
+    Returns:
+        Ensemble: Ensemble ajustado
+    """
+    logger = logging.getLogger(__name__)
+
+    if metodo not in ('soft', 'stacking'):
+        raise ValueError(f"Método de ensemble desconhecido: {metodo}")
+    if modelos_base is None:
+        if xgboost_params is None:
+            import config
+            xgboost_params = config.XGBOOST_PARAMS
+        if xgboost_params.get('early_stopping_rounds'):
+            logger.warning("Early stopping desabilitado nos modelos base do ensemble (ajustes sem eval_set)")
+        modelos_base = modelos_base_padrao(xgboost_params)
+
+    X_train = np.ascontiguousarray(X_train)
+    y_train = np.asarray(y_train)
+
+    total_cores = max_cores if max_cores and max_cores > 0 else (os.cpu_count() or 1)
+    tarefas = [(nome, tipo, parametros, None, None) for nome, (tipo, parametros) in modelos_base.items()]
+    if metodo == 'stacking':
+        folds = list(StratifiedKFold(n_splits=k_folds, shuffle=True,
+                                     random_state=random_state).split(X_train, y_train))
+        tarefas += [(nome, tipo, parametros, treino, validacao)
+                    for nome, (tipo, parametros) in modelos_base.items()
+                    for treino, validacao in folds]
+
+    n_workers = max(1, min(len(tarefas), total_cores))
+    n_threads = vc.dividir_threads(total_cores, n_workers)
+    logger.info(f"Ensemble ({metodo}): {len(modelos_base)} modelos base, {len(tarefas)} ajustes, "
+                f"{n_workers} processos x {n_threads} threads (limite de {total_cores} cores)")
+
+    modelos, tempos_fit = {}, {}
+    n_classes = len(np.unique(y_train))
+    oof = {nome: np.zeros((len(y_train), n_classes)) for nome in modelos_base}
+
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=get_context('spawn'),
+                             initializer=_inicializar_worker,
+                             initargs=(X_train, y_train, n_threads)) as executor:
+        futuros = [executor.submit(_ajustar, *tarefa) for tarefa in tarefas]
+        for futuro in futuros:
+            nome, indices, resultado, tempo_fit = futuro.result()
+            if indices is None:
+                modelos[nome] = resultado
+                tempos_fit[nome] = tempo_fit
+            else:
+                oof[nome][indices] = resultado
+
+    meta_modelo = None
+    if metodo == 'stacking':
+        logger.info("Ajustando a camada de stacking (regressão logística) nas probabilidades out-of-fold...")
+        meta_modelo = LogisticRegression(max_iter=1000)
+        meta_modelo.fit(np.hstack([oof[nome] for nome in modelos_base]), y_train)
+
+    ensemble = Ensemble({nome: modelos[nome] for nome in modelos_base}, metodo, meta_modelo)
+
+    # Relatório de precisão x latência
+    logger.info(f"{'modelo':<16} {'F1 val':>8} {'fit (s)':>9} {'ms/linha':>10}")
+    for nome, modelo in ensemble.modelos.items():
+        f1 = f1_score(y_val, modelo.predict(X_val), average='weighted')
+        latencia = _latencia_por_linha_ms(modelo.predict, X_val)
+        logger.info(f"{nome:<16} {f1:>8.4f} {tempos_fit[nome]:>9.2f} {latencia:>10.4f}")
+    f1 = f1_score(y_val, ensemble.predict(X_val), average='weighted')
+    latencia = _latencia_por_linha_ms(ensemble.predict, X_val)
+    logger.info(f"{'ensemble':<16} {f1:>8.4f} {sum(tempos_fit.values()):>9.2f} {latencia:>10.4f}")
+
+    return ensemble
@@ -0,0 +1,195 @@
+"""
+Explicação das previsões de modelos ONIA
+Calcula as contribuições por feature (SHAP, pred_contribs do XGBoost) de cada
+linha de um CSV e as grava em disco
+
+O CSV é lido em blocos (pd.read_csv com chunksize), depois de uma primeira
+passada só pela coluna 'id' para saber o número de linhas; nenhum cache é
+gravado junto da entrada. Os blocos são distribuídos entre threads, com no
+máximo dois por thread em memória, e cada um grava suas contribuições direto
+na sua faixa de um array .npy mapeado em memória, de modo que a memória
+usada depende do tamanho do bloco e não do arquivo. Saídas no diretório de
+destino:
+- contribuicoes.npy: float32 com shape (linhas, classes, features + 1); o
+  último índice é o viés (valor esperado da margem)
+- interacoes.npy: (linhas, classes, features + 1, features + 1), com --interactions
+- ids.npy: id de cada linha, na mesma ordem (índice das linhas)
+- importancias.csv: importância global por classe (média de |contribuição|
+  e média da contribuição), agregada bloco a bloco
+- metadados.json: classes, nomes das features e shapes
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+import artefato as art
+import config
+
+def _contribuicoes(booster, matriz, interacoes=False):
+    """Contribuições de um bloco com shape (linhas, classes, features + 1[, features + 1])."""
+    if interacoes:
+        saida = booster.predict(matriz, pred_interactions=True)
+        return saida if saida.ndim == 4 else saida[:, np.newaxis]
+    saida = booster.predict(matriz, pred_contribs=True)
+    # Objetivo binário devolve (linhas, features + 1): uma única margem
+    return saida if saida.ndim == 3 else saida[:, np.newaxis]
+
+def explicar_arquivo(artefato, arquivo_entrada, diretorio_saida, chunk_size=None,
+                     n_workers=None, interacoes=False):
+    """
+    Calcula e grava as contribuições por feature de todas as linhas de um CSV.
+
+    Args:
+        artefato (dict): Artefato carregado
+        arquivo_entrada (str): CSV com a coluna 'id' e as features do artefato
+        diretorio_saida (str): Diretório de destino
+        chunk_size (int): Linhas por bloco (default: config.EXPLAIN_CHUNK_SIZE)
+        n_workers (int): Threads de blocos simultâneos (default: min(4, cores))
+        interacoes (bool): Gravar também as interações SHAP (pred_interactions)
+
+    Returns:
+        DataFrame: Importâncias globais por classe e feature
+    """
+    logger = logging.getLogger(__name__)
+
+    if chunk_size is None:
+        chunk_size = config.EXPLAIN_CHUNK_SIZE
+    total_cores = os.cpu_count() or 1
+    n_workers = max(1, n_workers or min(4, total_cores))
+    # Cada bloco usa as threads do booster; o total fica próximo do número de cores
+    booster = artefato['booster']
+    booster.set_param({'nthread': max(1, total_cores // n_workers)})
+
+    # Primeira passada só pelos ids: dá o número de linhas para os arrays de saída
+    ids = [bloco['id'].to_numpy(dtype=np.int64)
+           for bloco in pd.read_csv(arquivo_entrada, usecols=['id'], chunksize=chunk_size)]
+    ids = np.concatenate(ids) if ids else np.zeros(0, dtype=np.int64)
+    n_linhas = len(ids)
+    colunas = artefato['colunas']
+    n_classes = len(artefato['classes']) if len(artefato['classes']) > 2 else 1
+    nomes = colunas + ['vies']
+    destino = Path(diretorio_saida)
+    destino.mkdir(parents=True, exist_ok=True)
+
+    contribuicoes = np.lib.format.open_memmap(destino / 'contribuicoes.npy', mode='w+', dtype=np.float32,
+                                              shape=(n_linhas, n_classes, len(nomes)))
+    matriz_interacoes = None
+    if interacoes:
+        matriz_interacoes = np.lib.format.open_memmap(destino / 'interacoes.npy', mode='w+', dtype=np.float32,
+                                                      shape=(n_linhas, n_classes, len(nomes), len(nomes)))
+    np.save(destino / 'ids.npy', ids)
+    del ids
+
+    soma_abs = np.zeros((n_classes, len(nomes)))
+    soma = np.zeros((n_classes, len(nomes)))
+    trava = threading.Lock()
+
+    def processar(inicio, dados):
+        fim = inicio + len(dados)
+        matriz = xgb.DMatrix(art.transformar(artefato, dados))
+        bloco = _contribuicoes(booster, matriz)
+        contribuicoes[inicio:fim] = bloco
+        if matriz_interacoes is not None:
+            matriz_interacoes[inicio:fim] = _contribuicoes(booster, matriz, interacoes=True)
+        with trava:
+            soma_abs[...] += np.abs(bloco).sum(axis=0, dtype=np.float64)
+            soma[...] += bloco.sum(axis=0, dtype=np.float64)
+        return fim - inicio
+
+    logger.info(f"Explicando {n_linhas} linhas de {arquivo_entrada} em blocos de {chunk_size} "
+                f"({n_workers} threads){' com interações' if interacoes else ''}...")
+    inicio_tempo = time.perf_counter()
+    processadas = 0
+    with ThreadPoolExecutor(max_workers=n_workers, thread_name_prefix='explicacao') as executor:
+        pendentes = deque()
+        inicio = 0
+        for dados in pd.read_csv(arquivo_entrada, usecols=['id'] + colunas, chunksize=chunk_size):
+            # Limita os blocos lidos e ainda não processados
+            if len(pendentes) >= 2 * n_workers:
+                processadas += pendentes.popleft().result()
+                logger.debug(f"  {processadas}/{n_linhas} linhas")
+            pendentes.append(executor.submit(processar, inicio, dados))
+            inicio += len(dados)
+        while pendentes:
+            processadas += pendentes.popleft().result()
+            logger.debug(f"  {processadas}/{n_linhas} linhas")
+        if inicio != n_linhas:
+            raise ValueError(f"{arquivo_entrada} mudou durante a leitura ({n_linhas} -> {inicio} linhas)")
+    tempo = time.perf_counter() - inicio_tempo
+
+    contribuicoes.flush()
+    if matriz_interacoes is not None:
+        matriz_interacoes.flush()
+
+    classes = [int(c) for c in artefato['classes']][-n_classes:]
+    importancias = pd.DataFrame([
+        {'classe': classe, 'feature': nome,
+         'media_abs': soma_abs[i, j] / max(n_linhas, 1), 'media': soma[i, j] / max(n_linhas, 1)}
+        for i, classe in enumerate(classes) for j, nome in enumerate(nomes)
+    ])
+    importancias.to_csv(destino / 'importancias.csv', index=False)
+
+    with open(destino / 'metadados.json', 'w', encoding='utf-8') as f:
+        json.dump({'arquivo': str(arquivo_entrada), 'linhas': n_linhas, 'classes': classes,
+                   'features': nomes, 'contribuicoes_shape': list(contribuicoes.shape),
+                   'interacoes': interacoes}, f, indent=2)
+
+    logger.info(f"Contribuições de {n_linhas} linhas em {tempo:.1f}s "
+                f"({n_linhas / tempo if tempo > 0 else 0:,.0f} linhas/s) salvas em {destino}")
+    for classe, grupo in importancias[importancias['feature'] != 'vies'].groupby('classe'):
+        principais = grupo.nlargest(3, 'media_abs')
+        logger.info(f"  Classe {classe}: " + ", ".join(
+            f"{linha.feature}={linha.media_abs:.4f}" for linha in principais.itertuples()))
+    return importancias
+
+def main():
+    parser = argparse.ArgumentParser(description='Contribuições por feature (SHAP) das previsões ONIA')
+    parser.add_argument('--model-dir', default=config.MODEL_DIR,
+                       help=f'Diretório do artefato do modelo (default: {config.MODEL_DIR})')
+    parser.add_argument('--input', default='templates/teste.csv',
+                       help='CSV a ser explicado (default: templates/teste.csv)')
+    parser.add_argument('--output-dir', default=config.EXPLAIN_DIR,
+                       help=f'Diretório de saída (default: {config.EXPLAIN_DIR})')
+    parser.add_argument('--chunk-size', type=int, default=config.EXPLAIN_CHUNK_SIZE,
+                       help=f'Linhas por bloco (default: {config.EXPLAIN_CHUNK_SIZE})')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Blocos processados em paralelo (default: min(4, cores))')
+    parser.add_argument('--interactions', action='store_true',
+                       help='Gravar também as interações SHAP entre pares de features')
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format=config.LOG_FORMAT)
+
+    if not Path(args.model_dir).exists():
+        print(f"Erro: Artefato {args.model_dir} não encontrado")
+        sys.exit(1)
+
+    if not Path(args.input).exists():
+        print(f"Erro: Arquivo {args.input} não encontrado")
+        sys.exit(1)
+
+    try:
+        artefato = art.carregar_artefato(args.model_dir)
+        explicar_arquivo(artefato, args.input, args.output_dir, args.chunk_size,
+                         args.workers, args.interactions)
+        print("\n✅ Explicação concluída com sucesso!")
+
+    except Exception as e:
+        print(f"\n❌ Erro durante explicação: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,7 @@ import os
 import sys
 import logging
 from pathlib import Path
+import cache_dados
 
 # Configurar logging
 logging.basicConfig(
@@ -45,10 +46,10 @@ def carregar_dados(diretorio='templates'):
         caminho_teste = Path(diretorio) / 'teste.csv'
         
         logger.info(f"Carregando dados de treino: {caminho_treino}")
-        treino = pd.read_csv(caminho_treino)
+        treino = cache_dados.ler_csv(caminho_treino)
         
         logger.info(f"Carregando dados de teste: {caminho_teste}")
-        teste = pd.read_csv(caminho_teste)
+        teste = cache_dados.ler_csv(caminho_teste)
         
         logger.info(f"Dados carregados: {len(treino)} amostras de treino, {len(teste)} amostras de teste")
         
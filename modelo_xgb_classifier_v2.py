@@ -17,6 +17,13 @@ import sys
 import logging
 from pathlib import Path
 import config
+import artefato as art
+import cache_dados
+import perfil
+import cache_etapas
+
+# ensemble, compressao, preditor_compilado e validacao_cruzada são importados
+# apenas nos modos que os usam, para não pesar na inicialização do treino padrão
 
 def configurar_logging(log_file=None, level=logging.INFO):
     """Configura o sistema de logging."""
@@ -31,12 +38,71 @@ def configurar_logging(log_file=None, level=logging.INFO):
     )
     return logging.getLogger(__name__)
 
-def carregar_dados(diretorio='templates'):
+def dtypes_compactos(caminho):
+    """
+    Monta o mapa de dtypes compactos para um CSV do ONIA.
+    
+    Features em float32 e 'target' em int32, em vez dos float64/int64
+    inferidos pelo pandas. 'id' fica em int64: ids acima de 2**31 não cabem
+    em int32.
+    
+    Args:
+        caminho (str): Caminho do CSV
+    
+    Returns:
+        dict: {coluna: dtype}
+    """
+    colunas = pd.read_csv(caminho, nrows=0).columns
+    return {c: np.int32 if c == 'target' else np.float32 for c in colunas if c != 'id'}
+
+def ler_arquivo(caminho, usar_cache=None, compacto=False, colunas=None):
+    """
+    Lê um CSV do ONIA, pelo cache binário ou diretamente.
+    
+    Args:
+        caminho (str): Caminho do CSV
+        usar_cache (bool): Se deve usar o cache binário (default: config.USE_DATA_CACHE)
+        compacto (bool): Ler features em float32 e target em int32 (ids em int64)
+        colunas (list): Features a ler, além de 'id' e 'target' (None = todas)
+    
+    Returns:
+        DataFrame: Dados do arquivo
+    """
+    if usar_cache is None:
+        usar_cache = config.USE_DATA_CACHE
+    
+    usecols = None
+    if colunas is not None:
+        manter = set(colunas) | {'id', 'target'}
+        usecols = lambda coluna: coluna in manter
+    
+    if usar_cache:
+        df = cache_dados.ler_csv(caminho, dtype=np.float32 if compacto else np.float64)
+        if usecols is not None:
+            df = df[[c for c in df.columns if usecols(c)]]
+        if compacto and 'target' in df.columns:
+            # Converter só o target, sem copiar o bloco de features; 'id' fica em
+            # int64 e o target só é reduzido se couber em int32
+            limites = np.iinfo(np.int32)
+            target = df['target']
+            if len(target) == 0 or (target.min() >= limites.min and target.max() <= limites.max):
+                df['target'] = target.astype(np.int32)
+        return df
+    if compacto:
+        return pd.read_csv(caminho, dtype=dtypes_compactos(caminho), usecols=usecols)
+    return pd.read_csv(caminho, usecols=usecols)
+
+def carregar_dados(diretorio='templates', carregar_teste=True, usar_cache=None, compacto=False, colunas=None):
     """
     Carrega os dados de treino e teste do diretório especificado.
     
     Args:
         diretorio (str): Diretório onde estão os arquivos CSV
+        carregar_teste (bool): Se False, lê apenas o cabeçalho do teste
+            (usado no modo de previsão em blocos)
+        usar_cache (bool): Se deve usar o cache binário (default: config.USE_DATA_CACHE)
+        compacto (bool): Ler features em float32 e target em int32 (ids em int64)
+        colunas (list): Features a ler, além de 'id' e 'target' (None = todas)
     
     Returns:
         tuple: (treino_df, teste_df) ou (None, None) em caso de erro
@@ -49,10 +115,16 @@ def carregar_dados(diretorio='templates'):
         caminho_teste = Path(diretorio) / 'teste.csv'
         
         logger.info(f"Carregando dados de treino: {caminho_treino}")
-        treino = pd.read_csv(caminho_treino)
+        treino = ler_arquivo(caminho_treino, usar_cache, compacto, colunas)
         
-        logger.info(f"Carregando dados de teste: {caminho_teste}")
-        teste = pd.read_csv(caminho_teste)
+        if carregar_teste:
+            logger.info(f"Carregando dados de teste: {caminho_teste}")
+            teste = ler_arquivo(caminho_teste, usar_cache, compacto, colunas)
+        else:
+            logger.info(f"Lendo apenas o cabeçalho do teste: {caminho_teste}")
+            teste = pd.read_csv(caminho_teste, nrows=0)
+            if colunas is not None:
+                teste = teste[['id'] + [c for c in teste.columns if c in colunas]]
         
         logger.info(f"Dados carregados: {len(treino)} amostras de treino, {len(teste)} amostras de teste")
         
@@ -102,16 +174,17 @@ def validar_dados(treino_df, teste_df):
         logger.error(f"Erro na validação dos dados: {e}")
         return False
 
-def preparar_dados(treino, teste, use_scaling=True, validation_size=0.1, random_state=52):
+def preparar_dados(treino, teste, use_scaling=True, validation_size=0.1, random_state=52, compacto=False):
     """
     Prepara os dados para treinamento.
     
     Args:
         treino (DataFrame): Dados de treino
-        teste (DataFrame): Dados de teste
+        teste (DataFrame): Dados de teste (None para não transformar o teste)
         use_scaling (bool): Se deve normalizar os dados
         validation_size (float): Proporção para validação
         random_state (int): Semente aleatória
+        compacto (bool): Manter as matrizes em float32
     
     Returns:
         tuple: (X_train, X_val, y_train, y_val, X_teste_final, ids_teste, scaler)
@@ -122,24 +195,34 @@ def preparar_dados(treino, teste, use_scaling=True, validation_size=0.1, random_
         # Separar features e target
         X_treino = treino.drop(columns=['id', 'target'])
         y_treino = treino['target']
-        X_teste = teste.drop(columns=['id'])
-        ids_teste = teste['id']
+        X_teste = teste.drop(columns=['id']) if teste is not None else None
+        ids_teste = teste['id'] if teste is not None else None
         
         logger.info(f"Features de treino: {X_treino.shape}")
         logger.info(f"Target de treino: {y_treino.shape}")
-        logger.info(f"Features de teste: {X_teste.shape}")
+        if X_teste is not None:
+            logger.info(f"Features de teste: {X_teste.shape}")
         
         # Normalização (opcional)
         scaler = None
+        X_teste_scaled = None
         if use_scaling:
             logger.info("Normalizando dados com StandardScaler...")
             scaler = StandardScaler()
             X_treino_scaled = scaler.fit_transform(X_treino)
-            X_teste_scaled = scaler.transform(X_teste)
+            if X_teste is not None:
+                X_teste_scaled = scaler.transform(X_teste)
         else:
             logger.info("Pular normalização...")
             X_treino_scaled = X_treino.values
-            X_teste_scaled = X_teste.values
+            if X_teste is not None:
+                X_teste_scaled = X_teste.values
+        
+        if compacto:
+            # StandardScaler preserva float32; garante o dtype mesmo se a entrada veio em float64
+            X_treino_scaled = np.asarray(X_treino_scaled, dtype=np.float32)
+            if X_teste_scaled is not None:
+                X_teste_scaled = np.asarray(X_teste_scaled, dtype=np.float32)
         
         # Dividir dados
         logger.info(f"Dividindo dados em treino e validação ({(1-validation_size)*100:.0f}%/{validation_size*100:.0f}%)...")
@@ -158,14 +241,26 @@ def preparar_dados(treino, teste, use_scaling=True, validation_size=0.1, random_
         logger.error(f"Erro na preparação dos dados: {e}")
         raise
 
-def treinar_modelo_xgb(X_train, y_train, xgboost_params=None):
+def treinar_modelo_xgb(X_train, y_train, xgboost_params=None, X_val=None, y_val=None, compacto=False):
     """
     Treina o modelo XGBoost.
     
+    Se X_val/y_val forem fornecidos, são usados como eval_set e a curva de
+    mlogloss é registrada no log. Com 'early_stopping_rounds' nos parâmetros,
+    o treinamento para quando a validação deixa de melhorar e o modelo passa
+    a prever com a melhor iteração.
+    
+    No modo compacto, o treino e a validação viram QuantileDMatrix uma única
+    vez (a validação usa o treino como referência dos bins) e o modelo é
+    treinado com xgb.train, sem as conversões internas do XGBClassifier.fit.
+    
     Args:
         X_train (array): Features de treino
         y_train (array): Target de treino
         xgboost_params (dict): Parâmetros do XGBoost
+        X_val (array): Features de validação (opcional)
+        y_val (array): Target de validação (opcional)
+        compacto (bool): Treinar a partir de QuantileDMatrix em float32
     
     Returns:
         XGBClassifier: Modelo treinado
@@ -175,12 +270,27 @@ def treinar_modelo_xgb(X_train, y_train, xgboost_params=None):
     if xgboost_params is None:
         xgboost_params = config.XGBOOST_PARAMS
     
+    xgboost_params = dict(xgboost_params)
+    usar_validacao = X_val is not None and y_val is not None
+    if not usar_validacao and xgboost_params.get('early_stopping_rounds'):
+        logger.warning("Early stopping requer conjunto de validação; desabilitando")
+        xgboost_params['early_stopping_rounds'] = None
+    
     try:
         logger.info("Criando e treinando modelo XGBoost...")
         logger.info(f"Parâmetros: {xgboost_params}")
         
-        modelo = XGBClassifier(**xgboost_params)
-        modelo.fit(X_train, y_train)
+        if compacto:
+            modelo = _treinar_quantile_dmatrix(X_train, y_train, xgboost_params, X_val, y_val)
+            if usar_validacao:
+                registrar_curva_validacao(modelo)
+        else:
+            modelo = XGBClassifier(**xgboost_params)
+            if usar_validacao:
+                modelo.fit(X_train, y_train, eval_set=[(X_val, y_val)], verbose=False)
+                registrar_curva_validacao(modelo)
+            else:
+                modelo.fit(X_train, y_train)
         
         logger.info("Treinamento concluído!")
         return modelo
@@ -189,6 +299,69 @@ def treinar_modelo_xgb(X_train, y_train, xgboost_params=None):
         logger.error(f"Erro no treinamento do modelo: {e}")
         raise
 
+def _treinar_quantile_dmatrix(X_train, y_train, xgboost_params, X_val=None, y_val=None):
+    """
+    Treina com xgb.train sobre QuantileDMatrix e devolve um XGBClassifier.
+    
+    O booster resultante é carregado em um XGBClassifier com os mesmos
+    parâmetros, para que o restante do pipeline (avaliação, previsão,
+    artefato) funcione igual ao modo padrão.
+    """
+    import xgboost as xgb
+    from treino_externo import parametros_booster
+    
+    logger = logging.getLogger(__name__)
+    
+    y_train = np.asarray(y_train, dtype=np.int32)
+    n_classes = int(y_train.max()) + 1
+    params, num_boost_round, early_stopping_rounds = parametros_booster(xgboost_params, n_classes)
+    if params.get('tree_method') != 'hist':
+        logger.warning(f"QuantileDMatrix requer tree_method='hist'; ignorando '{params.get('tree_method')}'")
+        params['tree_method'] = 'hist'
+    
+    dtreino = xgb.QuantileDMatrix(np.asarray(X_train, dtype=np.float32), y_train,
+                                  max_bin=params.get('max_bin', 256))
+    avaliacoes = []
+    if X_val is not None and y_val is not None:
+        dvalidacao = xgb.QuantileDMatrix(np.asarray(X_val, dtype=np.float32),
+                                         np.asarray(y_val, dtype=np.int32), ref=dtreino)
+        avaliacoes = [(dvalidacao, 'validation_0')]
+    
+    resultado_avaliacao = {}
+    booster = xgb.train(params, dtreino, num_boost_round=num_boost_round, evals=avaliacoes,
+                        early_stopping_rounds=early_stopping_rounds if avaliacoes else None,
+                        evals_result=resultado_avaliacao, verbose_eval=False)
+    
+    modelo = XGBClassifier(**xgboost_params)
+    modelo.load_model(bytearray(booster.save_raw()))
+    modelo.evals_result_ = resultado_avaliacao
+    return modelo
+
+def registrar_curva_validacao(modelo, intervalo=None):
+    """
+    Registra no log a curva da métrica de validação e a melhor iteração.
+    
+    Args:
+        modelo (XGBClassifier): Modelo treinado com eval_set
+        intervalo (int): Registrar a cada N iterações (default: ~20 pontos)
+    """
+    logger = logging.getLogger(__name__)
+    
+    for metrica, valores in modelo.evals_result().get('validation_0', {}).items():
+        if intervalo is None:
+            passo = max(1, len(valores) // 20)
+        else:
+            passo = intervalo
+        logger.info(f"Curva de {metrica} na validação ({len(valores)} iterações):")
+        for i in range(0, len(valores), passo):
+            logger.info(f"  [{i:4d}] {metrica}={valores[i]:.5f}")
+        if (len(valores) - 1) % passo != 0:
+            logger.info(f"  [{len(valores) - 1:4d}] {metrica}={valores[-1]:.5f}")
+    
+    if modelo.get_params().get('early_stopping_rounds'):
+        logger.info(f"Early stopping: melhor iteração {modelo.best_iteration} "
+                    f"(score={modelo.best_score:.5f})")
+
 def avaliar_modelo(modelo, X_val, y_val):
     """
     Avalia o modelo no conjunto de validação.
@@ -220,7 +393,7 @@ def avaliar_modelo(modelo, X_val, y_val):
         logger.error(f"Erro na avaliação do modelo: {e}")
         raise
 
-def gerar_previsoes(modelo, X_teste, ids_teste, arquivo_saida='resultado.csv'):
+def gerar_previsoes(modelo, X_teste, ids_teste, arquivo_saida='resultado.csv', cache=None, X_bruto=None):
     """
     Gera previsões e salva em arquivo.
     
@@ -229,6 +402,9 @@ def gerar_previsoes(modelo, X_teste, ids_teste, arquivo_saida='resultado.csv'):
         X_teste (array): Features de teste
         ids_teste (array): IDs de teste
         arquivo_saida (str): Arquivo de saída
+        cache (CachePrevisoes): Cache de previsões por linha (opcional); só
+            as linhas ausentes do cache são previstas pelo modelo
+        X_bruto (array): Features de teste antes da normalização (chaves do cache)
     
     Returns:
         bool: True se sucesso
@@ -237,10 +413,82 @@ def gerar_previsoes(modelo, X_teste, ids_teste, arquivo_saida='resultado.csv'):
     
     try:
         logger.info("Gerando previsões para o conjunto de teste...")
-        previsoes_teste = modelo.predict(X_teste)
+        if cache is not None:
+            previsoes_teste = cache.prever(X_bruto, lambda falhas: modelo.predict(X_teste[falhas]))
+        else:
+            previsoes_teste = modelo.predict(X_teste)
         logger.info(f"Previsões geradas para {len(previsoes_teste)} amostras")
         
-        # Salvar resultados
+        return salvar_previsoes(ids_teste, previsoes_teste, arquivo_saida)
+        
+    except Exception as e:
+        logger.error(f"Erro ao gerar previsões: {e}")
+        return False
+
+def prever_dmatrix(modelo, matriz):
+    """
+    Prevê as classes de uma DMatrix já construída (equivalente a modelo.predict).
+    
+    Args:
+        modelo (XGBClassifier): Modelo treinado
+        matriz (DMatrix): Features na mesma representação do treino
+    
+    Returns:
+        ndarray: Classes previstas
+    """
+    booster = modelo.get_booster()
+    melhor_iteracao = booster.attr('best_iteration')
+    intervalo = (0, int(melhor_iteracao) + 1) if melhor_iteracao is not None else (0, 0)
+    proba = booster.predict(matriz, iteration_range=intervalo)
+    if proba.ndim == 1:
+        return modelo.classes_[(proba > 0.5).astype(np.intp)]
+    return modelo.classes_[np.argmax(proba, axis=1)]
+
+def criar_cache_previsoes(configuracao, modelo, scaler, colunas):
+    """
+    Abre o cache de previsões por linha para o modelo treinado, se configurado.
+    
+    Com model_dir, a impressão digital é a do artefato salvo (carregado do
+    disco, como em predict.py e batch_predict.py), para que as linhas
+    previstas no treino sejam reaproveitadas por esses scripts. Sem artefato,
+    usa o modelo em memória.
+    
+    Args:
+        configuracao (dict): Configurações (chaves prediction_cache e model_dir)
+        modelo (XGBClassifier): Modelo treinado
+        scaler (StandardScaler): Scaler ajustado (None se sem normalização)
+        colunas (list): Colunas de features, na ordem do treino
+    
+    Returns:
+        CachePrevisoes: Cache aberto, ou None se desativado
+    """
+    diretorio = configuracao.get('prediction_cache', config.PREDICTION_CACHE_DIR)
+    if not diretorio:
+        return None
+    import cache_previsoes as cp
+    if configuracao.get('model_dir'):
+        impressao = cp.impressao_artefato(art.carregar_artefato(configuracao['model_dir']))
+    else:
+        impressao = cp.impressao_modelo(modelo.get_booster(), colunas, modelo.classes_,
+                                        scaler.mean_ if scaler is not None else None,
+                                        scaler.scale_ if scaler is not None else None)
+    return cp.CachePrevisoes(diretorio, impressao, config.PREDICTION_CACHE_MAX_ROWS)
+
+def salvar_previsoes(ids_teste, previsoes_teste, arquivo_saida='resultado.csv'):
+    """
+    Salva as previsões em arquivo e registra a distribuição das classes.
+    
+    Args:
+        ids_teste (array): IDs de teste
+        previsoes_teste (array): Classes previstas
+        arquivo_saida (str): Arquivo de saída
+    
+    Returns:
+        bool: True se sucesso
+    """
+    logger = logging.getLogger(__name__)
+    
+    try:
         resultado = pd.DataFrame({'id': ids_teste, 'target': previsoes_teste})
         resultado.to_csv(arquivo_saida, index=False)
         
@@ -256,9 +504,151 @@ def gerar_previsoes(modelo, X_teste, ids_teste, arquivo_saida='resultado.csv'):
         return True
         
     except Exception as e:
-        logger.error(f"Erro ao gerar previsões: {e}")
+        logger.error(f"Erro ao salvar previsões: {e}")
         return False
 
+def gerar_previsoes_streaming(modelo, caminho_teste, scaler=None,
+                             arquivo_saida='resultado.csv', chunk_size=None, cache=None, colunas=None):
+    """
+    Gera previsões lendo o arquivo de teste em blocos de tamanho fixo.
+    
+    Cada bloco é normalizado com o scaler já ajustado, previsto e anexado
+    ao arquivo de saída, de modo que o pico de memória depende apenas de
+    chunk_size e não do tamanho do arquivo de teste.
+    
+    Args:
+        modelo: Modelo treinado
+        caminho_teste (str): Caminho para o CSV de teste
+        scaler (StandardScaler): Scaler ajustado no treino (None se sem normalização)
+        arquivo_saida (str): Arquivo de saída
+        chunk_size (int): Número de linhas por bloco
+        cache (CachePrevisoes): Cache de previsões por linha (opcional); as
+            linhas encontradas no cache não são normalizadas nem previstas
+        colunas (list): Features usadas pelo modelo; só elas são lidas do CSV
+            (None = todas as colunas exceto 'id')
+    
+    Returns:
+        bool: True se sucesso
+    """
+    logger = logging.getLogger(__name__)
+    
+    if chunk_size is None:
+        chunk_size = config.CHUNK_SIZE
+    
+    def prever_bloco(X_bloco):
+        if scaler is not None:
+            return modelo.predict(scaler.transform(X_bloco))
+        return modelo.predict(X_bloco.values)
+    
+    try:
+        logger.info(f"Gerando previsões em blocos de {chunk_size} linhas: {caminho_teste}")
+        
+        total = 0
+        distribuicao = {}
+        primeiro_bloco = True
+        
+        usecols = None if colunas is None else ['id'] + list(colunas)
+        for bloco in pd.read_csv(caminho_teste, chunksize=chunk_size, usecols=usecols):
+            X_bloco = bloco.drop(columns=['id']) if colunas is None else bloco[colunas]
+            if cache is not None:
+                previsoes_bloco = cache.prever(X_bloco.to_numpy(dtype=np.float64),
+                                               lambda falhas: prever_bloco(X_bloco[falhas]))
+            else:
+                previsoes_bloco = prever_bloco(X_bloco)
+            
+            resultado = pd.DataFrame({'id': bloco['id'].values, 'target': previsoes_bloco})
+            resultado.to_csv(arquivo_saida, mode='w' if primeiro_bloco else 'a',
+                             header=primeiro_bloco, index=False)
+            primeiro_bloco = False
+            
+            total += len(resultado)
+            for classe, count in resultado['target'].value_counts().items():
+                distribuicao[classe] = distribuicao.get(classe, 0) + count
+        
+        if primeiro_bloco:
+            logger.error(f"Arquivo de teste vazio: {caminho_teste}")
+            return False
+        
+        logger.info(f"Arquivo {arquivo_saida} criado com sucesso!")
+        logger.info(f"Total de previsões: {total}")
+        
+        logger.info("Distribuição das classes previstas:")
+        for classe in sorted(distribuicao):
+            count = distribuicao[classe]
+            logger.info(f"  Classe {classe}: {count} amostras ({count/total*100:.1f}%)")
+        
+        return True
+        
+    except Exception as e:
+        logger.error(f"Erro ao gerar previsões em blocos: {e}")
+        return False
+
+def verificar_paridade(modelo, X_teste, diretorio_artefato, teste):
+    """
+    Compara as previsões do modelo em memória com as do artefato salvo.
+    
+    Usado para confirmar que o artefato com a normalização incorporada às
+    árvores (features brutas) prevê as mesmas classes que o modelo treinado
+    com features normalizadas.
+    
+    Args:
+        modelo: Modelo treinado
+        X_teste (array): Features de teste normalizadas
+        diretorio_artefato (str): Diretório do artefato salvo
+        teste (DataFrame): Dados de teste brutos
+    
+    Returns:
+        int: Número de previsões divergentes (0)
+    
+    Raises:
+        ValueError: Se alguma previsão do artefato divergir da do modelo
+    """
+    logger = logging.getLogger(__name__)
+    
+    artefato = art.carregar_artefato(diretorio_artefato)
+    previsoes_modelo = modelo.predict(X_teste)
+    previsoes_artefato = art.prever(artefato, teste)
+    
+    divergentes = int((previsoes_modelo != previsoes_artefato).sum())
+    if divergentes:
+        raise ValueError(f"Paridade do artefato: {divergentes} de {len(teste)} previsões divergentes "
+                         f"em {diretorio_artefato}")
+    logger.info(f"Paridade do artefato: previsões idênticas em {len(teste)} amostras de teste")
+    return divergentes
+
+def calcular_chave_preparo(configuracao):
+    """
+    Calcula a chave do cache de etapas para os dados preparados.
+    
+    Depende do conteúdo de treino.csv e teste.csv, das colunas lidas e dos
+    parâmetros que afetam a normalização e a divisão treino/validação. No
+    modo streaming o teste não entra nos dados preparados (é lido em blocos
+    só na previsão), então é identificado só por tamanho e mtime, sem ler o
+    arquivo inteiro.
+    
+    Args:
+        configuracao (dict): Configurações do treinamento
+    
+    Returns:
+        str: Chave do cache
+    """
+    diretorio = Path(configuracao['data_dir'])
+    if configuracao.get('streaming', False):
+        teste = cache_etapas.assinatura_arquivo(diretorio / 'teste.csv')
+    else:
+        teste = cache_dados.hash_arquivo(diretorio / 'teste.csv')
+    return cache_etapas.calcular_chave(
+        'preparar',
+        cache_dados.hash_arquivo(diretorio / 'treino.csv'),
+        teste,
+        configuracao['use_scaling'],
+        configuracao['validation_size'],
+        configuracao['xgboost_params']['random_state'],
+        configuracao.get('streaming', False),
+        configuracao.get('compact', False),
+        configuracao.get('features')
+    )
+
 def treinar_modelo(configuracao=None):
     """
     Função principal para treinamento completo do modelo.
@@ -276,39 +666,245 @@ def treinar_modelo(configuracao=None):
             'output_file': config.OUTPUT_FILE,
             'xgboost_params': config.XGBOOST_PARAMS,
             'validation_size': config.VALIDATION_SIZE,
-            'use_scaling': config.USE_SCALING
+            'use_scaling': config.USE_SCALING,
+            'chunk_size': config.CHUNK_SIZE,
+            'streaming': config.STREAMING_PREDICTION,
+            'model_dir': config.MODEL_DIR,
+            'use_cache': config.USE_DATA_CACHE,
+            'fold_scaler': config.FOLD_SCALER,
+            'run_report': config.RUN_REPORT,
+            'profile': config.PROFILE,
+            'stage_cache': config.USE_STAGE_CACHE,
+            'compact': config.COMPACT_DTYPES,
+            'ensemble': config.ENSEMBLE,
+            'max_cores': config.MAX_CORES,
+            'compress': config.COMPRESSION,
+            'compress_ship': config.COMPRESSION_SHIP,
+            'backend': config.INFERENCE_BACKEND,
+            'prediction_cache': config.PREDICTION_CACHE_DIR,
+            'feature_selection': config.FEATURE_SELECTION,
+            'features': config.FEATURES
         }
     
+    streaming = configuracao.get('streaming', False)
+    compacto = configuracao.get('compact', config.COMPACT_DTYPES)
+    metodo_ensemble = configuracao.get('ensemble', config.ENSEMBLE)
+    profile = configuracao.get('profile', config.PROFILE)
+    relatorio = perfil.RelatorioExecucao(usar_tracemalloc=profile)
+    f1_score_val = None
+    resumo_compressao = None
+    resumo_cache_previsoes = None
+    resumo_selecao = None
+    sucesso = False
+    
     try:
-        # 1. Carregar dados
-        treino, teste = carregar_dados(configuracao['data_dir'])
-        if treino is None or teste is None:
-            logger.error("Falha ao carregar os dados. Encerrando execução.")
-            return False
+        cache = None
+        if configuracao.get('stage_cache', config.USE_STAGE_CACHE):
+            cache = cache_etapas.CacheEtapas(config.STAGE_CACHE_DIR, config.STAGE_CACHE_MAX_MB)
         
-        # 2. Validar dados
-        if not validar_dados(treino, teste):
-            logger.error("Dados inválidos. Encerrando execução.")
-            return False
+        # 1-3. Carregar, validar e preparar (reaproveitados se dados e parâmetros não mudaram)
+        treino, teste, preparado = None, None, None
+        if cache is not None:
+            with relatorio.etapa('hash_dados'):
+                chave_preparo = calcular_chave_preparo(configuracao)
+            preparado = cache.obter(chave_preparo)
+            if preparado is not None:
+                logger.info("Cache de etapas: dados preparados reaproveitados")
         
-        # 3. Preparar dados
-        X_train, X_val, y_train, y_val, X_teste, ids_teste, scaler = preparar_dados(
-            treino, teste,
-            use_scaling=configuracao['use_scaling'],
-            validation_size=configuracao['validation_size'],
-            random_state=configuracao['xgboost_params']['random_state']
-        )
+        if preparado is None:
+            # 1. Carregar dados (no modo streaming o teste é lido só na previsão)
+            with relatorio.etapa('carregar'):
+                treino, teste = carregar_dados(
+                    configuracao['data_dir'],
+                    carregar_teste=not streaming,
+                    usar_cache=configuracao.get('use_cache', config.USE_DATA_CACHE),
+                    compacto=compacto,
+                    colunas=configuracao.get('features')
+                )
+            if treino is None or teste is None:
+                logger.error("Falha ao carregar os dados. Encerrando execução.")
+                return False
+            
+            # 2. Validar dados
+            with relatorio.etapa('validar'):
+                dados_validos = validar_dados(treino, teste)
+            if not dados_validos:
+                logger.error("Dados inválidos. Encerrando execução.")
+                return False
+            
+            # 3. Preparar dados
+            with relatorio.etapa('preparar'):
+                preparado = preparar_dados(
+                    treino, None if streaming else teste,
+                    use_scaling=configuracao['use_scaling'],
+                    validation_size=configuracao['validation_size'],
+                    random_state=configuracao['xgboost_params']['random_state'],
+                    compacto=compacto
+                ) + (list(treino.drop(columns=['id', 'target']).columns),)
+            if cache is not None:
+                cache.guardar(chave_preparo, preparado)
+        
+        X_train, X_val, y_train, y_val, X_teste, ids_teste, scaler, colunas = preparado
+        # n_jobs não altera o modelo resultante, só o tempo de treino
+        parametros_modelo = {k: v for k, v in configuracao['xgboost_params'].items() if k != 'n_jobs'}
+        
+        # 3.5. Selecionar features por importância (opcional; reaproveitada pelo cache de etapas)
+        if configuracao.get('feature_selection', config.FEATURE_SELECTION) and metodo_ensemble:
+            logger.warning("Seleção de features não suportada para ensemble; usando todas as features")
+        elif configuracao.get('feature_selection', config.FEATURE_SELECTION):
+            import selecao_features as sf
+            opcoes_selecao = (config.FEATURE_SELECTION_MIN, config.FEATURE_SELECTION_STEP,
+                              config.FEATURE_SELECTION_TOLERANCE)
+            selecao = None
+            if cache is not None:
+                chave_selecao = cache_etapas.calcular_chave('selecao', chave_preparo, parametros_modelo,
+                                                            opcoes_selecao)
+                selecao = cache.obter(chave_selecao)
+                if selecao is not None:
+                    logger.info("Cache de etapas: seleção de features reaproveitada")
+            if selecao is None:
+                with relatorio.etapa('selecionar_features'):
+                    selecao = sf.selecionar_features(X_train, y_train, X_val, y_val, colunas,
+                                                     configuracao['xgboost_params'], *opcoes_selecao)
+                del selecao['modelo']
+                if cache is not None:
+                    cache.guardar(chave_selecao, selecao)
+            
+            tabela = pd.DataFrame(selecao['tabela'])
+            tabela['colunas'] = tabela['colunas'].str.join('|')
+            tabela['removidas'] = tabela['removidas'].str.join('|')
+            arquivo_tabela = Path(configuracao['output_file']).with_suffix('.features.csv')
+            tabela.drop(columns=['ganho', 'permutacao']).to_csv(arquivo_tabela, index=False)
+            logger.info(f"Tabela da seleção de features salva em {arquivo_tabela}")
+            resumo_selecao = selecao['tabela']
+            
+            indices = selecao['indices']
+            X_train, X_val = X_train[:, indices], X_val[:, indices]
+            if X_teste is not None:
+                X_teste = X_teste[:, indices]
+            scaler = sf.recortar_scaler(scaler, indices)
+            colunas = selecao['colunas']
+        
+        # 4. Treinar modelo (reaproveitado se dados preparados e parâmetros não mudaram)
+        modelo = None
+        if cache is not None:
+            chave_modelo = cache_etapas.calcular_chave('modelo', chave_preparo, parametros_modelo,
+                                                       compacto, metodo_ensemble, colunas)
+            modelo = cache.obter(chave_modelo)
+            if modelo is not None:
+                logger.info("Cache de etapas: modelo treinado reaproveitado")
         
-        # 4. Treinar modelo
-        modelo = treinar_modelo_xgb(X_train, y_train, configuracao['xgboost_params'])
+        if modelo is None:
+            with relatorio.etapa('treinar'):
+                if metodo_ensemble:
+                    import ensemble as ens
+                    # Sem --max-cores, o limite de cores vem do n_jobs configurado
+                    n_jobs = configuracao['xgboost_params'].get('n_jobs')
+                    modelo = ens.treinar_ensemble(
+                        X_train, y_train, X_val, y_val,
+                        metodo=metodo_ensemble,
+                        max_cores=configuracao.get('max_cores') or (n_jobs if n_jobs and n_jobs > 0 else None),
+                        random_state=configuracao['xgboost_params']['random_state'],
+                        xgboost_params=configuracao['xgboost_params']
+                    )
+                elif profile:
+                    arquivo_prof = Path(configuracao['output_file']).with_suffix('.fit.prof')
+                    with perfil.perfilar(arquivo_prof):
+                        modelo = treinar_modelo_xgb(X_train, y_train, configuracao['xgboost_params'],
+                                                    X_val, y_val, compacto)
+                else:
+                    modelo = treinar_modelo_xgb(X_train, y_train, configuracao['xgboost_params'],
+                                                X_val, y_val, compacto)
+            if cache is not None:
+                cache.guardar(chave_modelo, modelo)
         
         # 5. Avaliar modelo
-        f1_score_val = avaliar_modelo(modelo, X_val, y_val)
+        with relatorio.etapa('avaliar'):
+            f1_score_val = avaliar_modelo(modelo, X_val, y_val)
+        
+        # 5.2. Comprimir modelo (opcional)
+        if configuracao.get('compress', config.COMPRESSION) and not metodo_ensemble:
+            import compressao
+            with relatorio.etapa('comprimir'):
+                candidatos = compressao.comprimir_modelo(
+                    modelo, X_train, y_train, X_val, y_val, configuracao['xgboost_params'],
+                    max_depth=config.COMPRESSION_MAX_DEPTH,
+                    parametros_aluno=config.DISTILLATION_PARAMS
+                )
+            resumo_compressao = {nome: {k: v for k, v in c.items() if k != 'modelo'}
+                                 for nome, c in candidatos.items()}
+            escolhido = configuracao.get('compress_ship', config.COMPRESSION_SHIP)
+            if escolhido:
+                modelo = candidatos[escolhido]['modelo']
+                logger.info(f"Usando o modelo comprimido '{escolhido}' "
+                            f"(ΔF1={candidatos[escolhido]['delta_f1']:+.4f})")
+        
+        # 5.5. Salvar artefato (opcional; o artefato guarda um único booster XGBoost)
+        if configuracao.get('model_dir') and metodo_ensemble:
+            logger.warning("Artefato não suportado para ensemble; modelo não será salvo")
+        elif configuracao.get('model_dir'):
+            with relatorio.etapa('salvar_artefato'):
+                incorporar = configuracao.get('fold_scaler', False) and scaler is not None
+                caminho_treino = Path(configuracao['data_dir']) / 'treino.csv'
+                art.salvar_artefato(modelo, scaler, colunas, configuracao['model_dir'],
+                                    incorporar_normalizacao=incorporar,
+                                    shards=[art.descrever_shard(caminho_treino, len(y_train) + len(y_val))])
+                if incorporar and not streaming:
+                    if teste is None:
+                        _, teste = carregar_dados(
+                            configuracao['data_dir'],
+                            usar_cache=configuracao.get('use_cache', config.USE_DATA_CACHE),
+                            colunas=colunas
+                        )
+                    verificar_paridade(modelo, X_teste, configuracao['model_dir'], teste)
         
         # 6. Gerar previsões
-        sucesso = gerar_previsoes(modelo, X_teste, ids_teste, configuracao['output_file'])
+        with relatorio.etapa('prever_e_salvar'):
+            preditor = modelo
+            if configuracao.get('backend', config.INFERENCE_BACKEND) == 'compilado':
+                if metodo_ensemble:
+                    logger.warning("Backend compilado não suportado para ensemble; usando o modelo original")
+                else:
+                    import preditor_compilado as pc
+                    preditor = pc.compilar_modelo(modelo)
+            
+            cache_previsoes = None
+            if configuracao.get('prediction_cache', config.PREDICTION_CACHE_DIR):
+                if metodo_ensemble:
+                    logger.warning("Cache de previsões não suportado para ensemble; desativado")
+                else:
+                    cache_previsoes = criar_cache_previsoes(configuracao, modelo, scaler, colunas)
+            
+            if streaming:
+                sucesso = gerar_previsoes_streaming(
+                    preditor,
+                    Path(configuracao['data_dir']) / 'teste.csv',
+                    scaler,
+                    configuracao['output_file'],
+                    configuracao.get('chunk_size', config.CHUNK_SIZE),
+                    cache_previsoes,
+                    colunas
+                )
+            else:
+                X_bruto = None
+                if cache_previsoes is not None:
+                    # As chaves do cache usam as features brutas (antes da normalização)
+                    if teste is None:
+                        _, teste = carregar_dados(
+                            configuracao['data_dir'],
+                            usar_cache=configuracao.get('use_cache', config.USE_DATA_CACHE),
+                            colunas=colunas
+                        )
+                    X_bruto = teste[colunas].to_numpy(dtype=np.float64)
+                sucesso = gerar_previsoes(preditor, X_teste, ids_teste, configuracao['output_file'],
+                                          cache_previsoes, X_bruto)
+            
+            if cache_previsoes is not None:
+                cache_previsoes.salvar()
+                resumo_cache_previsoes = cache_previsoes.registrar_resumo()
         
         if sucesso:
+            logger.info(f"Pico de RSS (em memória): {perfil.pico_rss_mb():.1f}MB")
             logger.info("Processo concluído com sucesso!")
             return True
         else:
@@ -318,6 +914,389 @@ def treinar_modelo(configuracao=None):
     except Exception as e:
         logger.error(f"Erro durante execução: {e}")
         return False
+    
+    finally:
+        # 7. Relatório de execução ao lado do arquivo de saída
+        if configuracao.get('run_report', config.RUN_REPORT) and relatorio.etapas:
+            try:
+                relatorio.salvar(
+                    Path(configuracao['output_file']).with_suffix('.run.json'),
+                    {'sucesso': sucesso, 'modo': 'em_memoria', 'f1_validacao': f1_score_val,
+                     'compressao': resumo_compressao, 'cache_previsoes': resumo_cache_previsoes,
+                     'selecao_features': resumo_selecao, 'configuracao': configuracao}
+                )
+            except Exception as e:
+                logger.error(f"Erro ao salvar relatório de execução: {e}")
+
+def treinar_modelo_concorrente(configuracao):
+    """
+    Pipeline em memória como grafo de etapas executado em paralelo.
+    
+    Etapas independentes rodam ao mesmo tempo (ver agendador): o teste é
+    carregado, normalizado e convertido em DMatrix enquanto o modelo treina.
+    O orçamento de threads é dividido entre o XGBoost (nthread) e as demais
+    etapas. A linha do tempo e o caminho crítico vão para o relatório de
+    execução.
+    
+    Ensemble, compressão, previsão em blocos, cache de previsões e seleção
+    de features não fazem parte do grafo; com eles a execução volta ao
+    pipeline sequencial de treinar_modelo. O cache
+    de etapas não é usado neste modo.
+    
+    Args:
+        configuracao (dict): Configurações (mesmo formato de treinar_modelo),
+            com 'thread_budget' opcional (default: config.THREAD_BUDGET ou
+            todos os cores)
+    
+    Returns:
+        bool: True se sucesso
+    """
+    import xgboost as xgb
+    import agendador
+    
+    logger = configurar_logging(config.LOG_FILE)
+    
+    sequenciais = [chave for chave in ('ensemble', 'compress', 'streaming', 'prediction_cache',
+                                       'feature_selection')
+                   if configuracao.get(chave)]
+    if sequenciais:
+        logger.warning(f"Modo concorrente não suporta {sequenciais}; usando o pipeline sequencial")
+        return treinar_modelo(configuracao)
+    
+    orcamento = configuracao.get('thread_budget') or config.THREAD_BUDGET or os.cpu_count() or 1
+    # O XGBoost fica com o orçamento menos uma thread, reservada para as etapas de E/S
+    threads_xgb = max(1, orcamento - 1)
+    diretorio = Path(configuracao['data_dir'])
+    usar_cache = configuracao.get('use_cache', config.USE_DATA_CACHE)
+    compacto = configuracao.get('compact', config.COMPACT_DTYPES)
+    xgboost_params = dict(configuracao['xgboost_params'], n_jobs=threads_xgb)
+    model_dir = configuracao.get('model_dir')
+    incorporar = configuracao.get('fold_scaler', False) and configuracao['use_scaling']
+    
+    def carregar_treino():
+        logger.info(f"Carregando dados de treino: {diretorio / 'treino.csv'}")
+        return ler_arquivo(diretorio / 'treino.csv', usar_cache, compacto, configuracao.get('features'))
+    
+    def carregar_teste():
+        logger.info(f"Carregando dados de teste: {diretorio / 'teste.csv'}")
+        return ler_arquivo(diretorio / 'teste.csv', usar_cache, compacto, configuracao.get('features'))
+    
+    def validar(treino, teste):
+        if not validar_dados(treino, teste):
+            raise ValueError("Dados inválidos")
+    
+    def ajustar_scaler(treino):
+        X = treino.drop(columns=['id', 'target'])
+        colunas = list(X.columns)
+        scaler = None
+        if configuracao['use_scaling']:
+            logger.info("Normalizando dados com StandardScaler...")
+            scaler = StandardScaler()
+            X = scaler.fit_transform(X)
+        else:
+            X = X.values
+        if compacto:
+            X = np.asarray(X, dtype=np.float32)
+        return scaler, X, treino['target'], colunas
+    
+    def dividir(ajuste):
+        _, X, y, _ = ajuste
+        return train_test_split(X, y, test_size=configuracao['validation_size'],
+                                random_state=xgboost_params['random_state'], stratify=y)
+    
+    def treinar(divisao):
+        X_train, X_val, y_train, y_val = divisao
+        return treinar_modelo_xgb(X_train, y_train, xgboost_params, X_val, y_val, compacto)
+    
+    def preparar_teste(ajuste, teste, _validacao):
+        scaler = ajuste[0]
+        X_teste = teste.drop(columns=['id'])
+        X_teste = scaler.transform(X_teste) if scaler is not None else X_teste.values
+        if compacto:
+            X_teste = np.asarray(X_teste, dtype=np.float32)
+        return X_teste, xgb.DMatrix(X_teste, nthread=1), teste['id']
+    
+    def avaliar(modelo, divisao):
+        _, X_val, _, y_val = divisao
+        return avaliar_modelo(modelo, X_val, y_val)
+    
+    def prever(modelo, teste_preparado):
+        _, matriz, ids_teste = teste_preparado
+        logger.info("Gerando previsões para o conjunto de teste...")
+        return ids_teste, prever_dmatrix(modelo, matriz)
+    
+    def salvar_resultado(previsoes):
+        if not salvar_previsoes(*previsoes, configuracao['output_file']):
+            raise RuntimeError("Falha ao salvar resultados")
+    
+    def salvar_artefato(modelo, ajuste):
+        scaler, _, y, colunas = ajuste
+        art.salvar_artefato(modelo, scaler, colunas, model_dir, incorporar_normalizacao=incorporar,
+                            shards=[art.descrever_shard(diretorio / 'treino.csv', len(y))])
+    
+    def paridade(_artefato, modelo, teste_preparado, teste):
+        verificar_paridade(modelo, teste_preparado[0], model_dir, teste)
+    
+    Etapa = agendador.Etapa
+    etapas = [
+        Etapa('carregar_treino', carregar_treino),
+        Etapa('carregar_teste', carregar_teste),
+        Etapa('validar', validar, ['carregar_treino', 'carregar_teste']),
+        Etapa('ajustar_scaler', ajustar_scaler, ['carregar_treino']),
+        Etapa('dividir', dividir, ['ajustar_scaler']),
+        # O treino não espera o teste: a validação treino x teste só bloqueia o preparo do teste
+        Etapa('treinar', treinar, ['dividir'], threads=threads_xgb),
+        Etapa('preparar_teste', preparar_teste, ['ajustar_scaler', 'carregar_teste', 'validar']),
+        Etapa('avaliar', avaliar, ['treinar', 'dividir'], threads=threads_xgb),
+        Etapa('prever', prever, ['treinar', 'preparar_teste'], threads=threads_xgb),
+        Etapa('salvar_resultado', salvar_resultado, ['prever']),
+    ]
+    if model_dir:
+        etapas.append(Etapa('salvar_artefato', salvar_artefato, ['treinar', 'ajustar_scaler']))
+        if incorporar:
+            etapas.append(Etapa('verificar_paridade', paridade,
+                                ['salvar_artefato', 'treinar', 'preparar_teste', 'carregar_teste']))
+    
+    logger.info(f"Pipeline concorrente: {len(etapas)} etapas, orçamento de {orcamento} threads "
+                f"({threads_xgb} para o XGBoost)")
+    
+    resultados = None
+    execucao = None
+    sucesso = False
+    try:
+        resultados, execucao = agendador.executar_grafo(etapas, orcamento)
+        for etapa in execucao['linha_do_tempo']:
+            logger.info(f"  {etapa['etapa']:<20} {etapa['inicio_s']:>8.2f}s -> {etapa['fim_s']:>8.2f}s "
+                        f"({etapa['threads']} thread(s))")
+        logger.info(f"Pico de RSS (concorrente): {perfil.pico_rss_mb():.1f}MB")
+        logger.info("Processo concluído com sucesso!")
+        sucesso = True
+        return True
+        
+    except Exception as e:
+        logger.error(f"Erro durante execução concorrente: {e}")
+        return False
+    
+    finally:
+        if configuracao.get('run_report', config.RUN_REPORT) and execucao is not None:
+            try:
+                perfil.RelatorioExecucao().salvar(
+                    Path(configuracao['output_file']).with_suffix('.run.json'),
+                    {'sucesso': sucesso, 'modo': 'concorrente',
+                     'f1_validacao': resultados['avaliar'],
+                     'duracao_total_s': execucao['duracao_total_s'],
+                     'etapas': execucao['linha_do_tempo'],
+                     'caminho_critico': execucao['caminho_critico'],
+                     'orcamento_threads': orcamento,
+                     'configuracao': configuracao}
+                )
+            except Exception as e:
+                logger.error(f"Erro ao salvar relatório de execução: {e}")
+
+def treinar_modelo_externo(configuracao):
+    """
+    Treinamento completo em modo out-of-core (dados maiores que a memória).
+    
+    O treino é lido em blocos (ver treino_externo) e o teste é previsto em
+    blocos, de modo que nenhum dos dois arquivos fica inteiro em memória.
+    
+    Args:
+        configuracao (dict): Configurações (mesmo formato de treinar_modelo)
+    
+    Returns:
+        bool: True se sucesso
+    """
+    import treino_externo
+    from predict import prever_arquivo
+    
+    logger = configurar_logging(config.LOG_FILE)
+    relatorio = perfil.RelatorioExecucao(usar_tracemalloc=configuracao.get('profile', False))
+    chunk_size = configuracao.get('chunk_size', config.CHUNK_SIZE)
+    diretorio = Path(configuracao['data_dir'])
+    resultado = None
+    resumo_cache_previsoes = None
+    sucesso = False
+    
+    try:
+        with relatorio.etapa('treinar_out_of_core'):
+            resultado = treino_externo.treinar_externo(
+                diretorio / 'treino.csv',
+                configuracao['xgboost_params'],
+                use_scaling=configuracao['use_scaling'],
+                validation_size=configuracao['validation_size'],
+                random_state=configuracao['xgboost_params']['random_state'],
+                chunk_size=chunk_size,
+                features=configuracao.get('features')
+            )
+        
+        scaler = resultado['scaler']
+        artefato = {
+            'booster': resultado['booster'],
+            'colunas': resultado['colunas'],
+            'classes': resultado['classes'],
+            'scaler_mean': scaler.mean_ if scaler is not None else None,
+            'scaler_scale': scaler.scale_ if scaler is not None else None,
+        }
+        
+        if configuracao.get('model_dir'):
+            with relatorio.etapa('salvar_artefato'):
+                shard = art.descrever_shard(diretorio / 'treino.csv', resultado['linhas'])
+                art.salvar_booster(artefato['booster'], artefato['classes'], artefato['colunas'],
+                                   configuracao['model_dir'], artefato['scaler_mean'],
+                                   artefato['scaler_scale'],
+                                   art.amostras_scaler(scaler.n_samples_seen_) if scaler is not None else None,
+                                   [{'rodadas': [0, artefato['booster'].num_boosted_rounds()],
+                                     'shards': [shard]}],
+                                   scaler.var_ if scaler is not None else None)
+        
+        with relatorio.etapa('prever_e_salvar'):
+            cache_previsoes = None
+            diretorio_cache = configuracao.get('prediction_cache', config.PREDICTION_CACHE_DIR)
+            if diretorio_cache:
+                import cache_previsoes as cp
+                # Mesma impressão de predict.py/batch_predict.py: a do artefato salvo
+                salvo = art.carregar_artefato(configuracao['model_dir']) if configuracao.get('model_dir') else artefato
+                cache_previsoes = cp.CachePrevisoes(diretorio_cache, cp.impressao_artefato(salvo),
+                                                    config.PREDICTION_CACHE_MAX_ROWS)
+            prever_arquivo(artefato, diretorio / 'teste.csv', configuracao['output_file'], chunk_size,
+                           cache_previsoes)
+            if cache_previsoes is not None:
+                cache_previsoes.salvar()
+                resumo_cache_previsoes = cache_previsoes.registrar_resumo()
+        
+        logger.info(f"Pico de RSS (out-of-core): {perfil.pico_rss_mb():.1f}MB")
+        logger.info("Processo concluído com sucesso!")
+        sucesso = True
+        return True
+        
+    except Exception as e:
+        logger.error(f"Erro durante treinamento out-of-core: {e}")
+        return False
+    
+    finally:
+        if configuracao.get('run_report', config.RUN_REPORT) and relatorio.etapas:
+            try:
+                relatorio.salvar(
+                    Path(configuracao['output_file']).with_suffix('.run.json'),
+                    {'sucesso': sucesso, 'modo': 'out_of_core',
+                     'f1_validacao': resultado['f1'] if resultado else None,
+                     'cache_previsoes': resumo_cache_previsoes,
+                     'configuracao': configuracao}
+                )
+            except Exception as e:
+                logger.error(f"Erro ao salvar relatório de execução: {e}")
+
+def treinar_modelo_incremental(configuracao, arquivos, n_rodadas=None):
+    """
+    Continua o artefato salvo em configuracao['model_dir'] com dados novos.
+    
+    As novas rodadas são treinadas apenas nos arquivos dados (ver
+    treino_incremental); o artefato é atualizado no lugar e, se houver
+    teste.csv no diretório de dados, as previsões são refeitas em blocos.
+    
+    Args:
+        configuracao (dict): Configurações (mesmo formato de treinar_modelo)
+        arquivos (list): CSVs com os dados novos rotulados
+        n_rodadas (int): Rodadas de boosting a adicionar (default: config.INCREMENTAL_ROUNDS)
+    
+    Returns:
+        bool: True se sucesso
+    """
+    import treino_incremental
+    from predict import prever_arquivo
+    
+    logger = configurar_logging(config.LOG_FILE)
+    relatorio = perfil.RelatorioExecucao(usar_tracemalloc=configuracao.get('profile', False))
+    resultado = None
+    sucesso = False
+    
+    if n_rodadas is None:
+        n_rodadas = config.INCREMENTAL_ROUNDS
+    
+    try:
+        if not configuracao.get('model_dir'):
+            raise ValueError("O treino incremental requer o diretório do artefato (model_dir)")
+        
+        with relatorio.etapa('treinar_incremental'):
+            resultado = treino_incremental.continuar_treino(
+                configuracao['model_dir'], arquivos, configuracao['xgboost_params'], n_rodadas,
+                validation_size=configuracao['validation_size'],
+                random_state=configuracao['xgboost_params']['random_state']
+            )
+        
+        caminho_teste = Path(configuracao['data_dir']) / 'teste.csv'
+        if caminho_teste.exists():
+            with relatorio.etapa('prever_e_salvar'):
+                artefato = art.carregar_artefato(configuracao['model_dir'])
+                prever_arquivo(artefato, caminho_teste, configuracao['output_file'],
+                               configuracao.get('chunk_size', config.CHUNK_SIZE))
+        
+        logger.info("Processo concluído com sucesso!")
+        sucesso = True
+        return True
+        
+    except Exception as e:
+        logger.error(f"Erro durante treinamento incremental: {e}")
+        return False
+    
+    finally:
+        if configuracao.get('run_report', config.RUN_REPORT) and relatorio.etapas:
+            try:
+                relatorio.salvar(
+                    Path(configuracao['output_file']).with_suffix('.run.json'),
+                    {'sucesso': sucesso, 'modo': 'incremental',
+                     'f1_validacao': resultado['f1_depois'] if resultado else None,
+                     'linhagem': resultado['linhagem'] if resultado else None,
+                     'configuracao': configuracao}
+                )
+            except Exception as e:
+                logger.error(f"Erro ao salvar relatório de execução: {e}")
+
+def executar_validacao_cruzada(configuracao, k=5, n_workers=None):
+    """
+    Avalia a configuração com validação cruzada estratificada K-fold.
+    
+    Args:
+        configuracao (dict): Configurações (mesmo formato de treinar_modelo)
+        k (int): Número de folds
+        n_workers (int): Número de processos paralelos
+    
+    Returns:
+        dict: Resultado de validacao_cruzada.validacao_cruzada ou None em caso de erro
+    """
+    import validacao_cruzada as vc
+    
+    logger = configurar_logging(config.LOG_FILE)
+    
+    try:
+        treino, teste = carregar_dados(
+            configuracao['data_dir'],
+            carregar_teste=False,
+            usar_cache=configuracao.get('use_cache', config.USE_DATA_CACHE),
+            colunas=configuracao.get('features')
+        )
+        if treino is None:
+            logger.error("Falha ao carregar os dados. Encerrando execução.")
+            return None
+        
+        if not validar_dados(treino, teste):
+            logger.error("Dados inválidos. Encerrando execução.")
+            return None
+        
+        X = treino.drop(columns=['id', 'target']).to_numpy()
+        y = treino['target'].to_numpy()
+        
+        # A normalização é ajustada dentro de cada fold, só nas linhas de treino
+        return vc.validacao_cruzada(
+            X, y, configuracao['xgboost_params'],
+            k=k, n_workers=n_workers,
+            random_state=configuracao['xgboost_params']['random_state'],
+            normalizar=configuracao['use_scaling']
+        )
+        
+    except Exception as e:
+        logger.error(f"Erro durante validação cruzada: {e}")
+        return None
 
 if __name__ == "__main__":
     # Executar com configurações padrão
@@ -0,0 +1,113 @@
+"""
+Instrumentação de desempenho do pipeline ONIA
+Mede tempo de parede, tempo de CPU e memória de cada etapa e gera um
+relatório JSON da execução
+"""
+
+import cProfile
+import io
+import json
+import logging
+import platform
+import pstats
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+def pico_rss_mb():
+    """Retorna o pico de RSS do processo em MB."""
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é em KB no Linux e em bytes no macOS
+    if sys.platform == 'darwin':
+        return pico / (1024 * 1024)
+    return pico / 1024
+
+class RelatorioExecucao:
+    """
+    Coleta as medições das etapas de uma execução.
+
+    Cada etapa registra tempo de parede, tempo de CPU do processo, pico de RSS
+    ao final da etapa e, se usar_tracemalloc for True, a variação e o pico de
+    memória alocada pelo Python durante a etapa.
+    """
+
+    def __init__(self, usar_tracemalloc=False):
+        self.usar_tracemalloc = usar_tracemalloc
+        self.inicio = datetime.now(timezone.utc)
+        self.etapas = []
+        if usar_tracemalloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def etapa(self, nome):
+        """Mede o bloco de código como uma etapa do pipeline."""
+        logger = logging.getLogger(__name__)
+
+        rss_antes = pico_rss_mb()
+        if self.usar_tracemalloc:
+            tracemalloc.reset_peak()
+            memoria_antes, _ = tracemalloc.get_traced_memory()
+        inicio_parede = time.perf_counter()
+        inicio_cpu = time.process_time()
+        try:
+            yield
+        finally:
+            medicao = {
+                'etapa': nome,
+                'tempo_parede_s': time.perf_counter() - inicio_parede,
+                'tempo_cpu_s': time.process_time() - inicio_cpu,
+                'pico_rss_mb': pico_rss_mb(),
+                'aumento_pico_rss_mb': pico_rss_mb() - rss_antes,
+            }
+            if self.usar_tracemalloc:
+                memoria_depois, pico = tracemalloc.get_traced_memory()
+                medicao['tracemalloc_delta_mb'] = (memoria_depois - memoria_antes) / (1024 * 1024)
+                medicao['tracemalloc_pico_mb'] = (pico - memoria_antes) / (1024 * 1024)
+            self.etapas.append(medicao)
+            logger.info(f"[perfil] {nome}: {medicao['tempo_parede_s']:.3f}s parede, "
+                        f"{medicao['tempo_cpu_s']:.3f}s CPU, pico RSS {medicao['pico_rss_mb']:.1f}MB")
+
+    def salvar(self, caminho, extra=None):
+        """
+        Grava o relatório da execução em JSON.
+
+        Args:
+            caminho (str): Arquivo de destino
+            extra (dict): Informações adicionais (configuração, métricas...)
+        """
+        relatorio = {
+            'inicio': self.inicio.isoformat(),
+            'duracao_total_s': sum(e['tempo_parede_s'] for e in self.etapas),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'etapas': self.etapas,
+        }
+        if extra:
+            relatorio.update(extra)
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump(relatorio, f, indent=2, default=str)
+        logging.getLogger(__name__).info(f"Relatório de execução salvo em: {caminho}")
+        return relatorio
+
+@contextmanager
+def perfilar(caminho=None, linhas=25):
+    """
+    Executa o bloco sob cProfile.
+
+    Grava as estatísticas em caminho (formato pstats, se fornecido) e registra
+    no log as funções com maior tempo acumulado.
+    """
+    perfilador = cProfile.Profile()
+    perfilador.enable()
+    try:
+        yield perfilador
+    finally:
+        perfilador.disable()
+        if caminho:
+            perfilador.dump_stats(str(caminho))
+        saida = io.StringIO()
+        pstats.Stats(perfilador, stream=saida).sort_stats('cumulative').print_stats(linhas)
+        logging.getLogger(__name__).info(f"[perfil] cProfile:\n{saida.getvalue()}")
@@ -0,0 +1,97 @@
+"""
+Script de previsão para modelos ONIA
+Carrega um artefato salvo e gera previsões sem retreinar o modelo
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+import artefato as art
+import config
+
+def prever_arquivo(artefato, arquivo_entrada, arquivo_saida='resultado.csv', chunk_size=config.CHUNK_SIZE, cache=None):
+    """
+    Gera previsões para um CSV lendo-o em blocos.
+
+    Args:
+        artefato (dict): Artefato carregado
+        arquivo_entrada (str): CSV com a coluna 'id' e as features do artefato
+        arquivo_saida (str): Arquivo de saída
+        chunk_size (int): Linhas por bloco
+        cache (CachePrevisoes): Cache de previsões por linha (opcional); só as
+            linhas ausentes do cache são previstas pelo modelo
+
+    Returns:
+        int: Total de previsões geradas
+    """
+    logger = logging.getLogger(__name__)
+
+    total = 0
+    primeiro_bloco = True
+    # Só as colunas usadas pelo modelo são lidas (o artefato pode ter um subconjunto das features)
+    for bloco in pd.read_csv(arquivo_entrada, chunksize=chunk_size, usecols=['id'] + artefato['colunas']):
+        if cache is not None:
+            previsoes = cache.prever_artefato(artefato, bloco)
+        else:
+            previsoes = art.prever(artefato, bloco)
+        resultado = pd.DataFrame({'id': bloco['id'].values, 'target': previsoes})
+        resultado.to_csv(arquivo_saida, mode='w' if primeiro_bloco else 'a',
+                         header=primeiro_bloco, index=False)
+        primeiro_bloco = False
+        total += len(resultado)
+
+    logger.info(f"Arquivo {arquivo_saida} criado com {total} previsões")
+    return total
+
+def main():
+    parser = argparse.ArgumentParser(description='Previsão com modelo ONIA XGBoost salvo')
+    parser.add_argument('--model-dir', default='modelo_onia',
+                       help='Diretório do artefato do modelo (default: modelo_onia)')
+    parser.add_argument('--input', default='templates/teste.csv',
+                       help='CSV a ser previsto (default: templates/teste.csv)')
+    parser.add_argument('--output', default='resultado.csv',
+                       help='Arquivo de saída (default: resultado.csv)')
+    parser.add_argument('--chunk-size', type=int, default=config.CHUNK_SIZE,
+                       help=f'Linhas por bloco (default: {config.CHUNK_SIZE})')
+    parser.add_argument('--backend', choices=['xgboost', 'compilado'], default='xgboost',
+                       help='Backend de inferência; "compilado" só acelera lotes de até 4 linhas (default: xgboost)')
+    parser.add_argument('--prediction-cache', metavar='DIR', default=None,
+                       help='Diretório do cache persistente de previsões por linha (default: desativado)')
+    parser.add_argument('--prediction-cache-max-rows', type=int, default=config.PREDICTION_CACHE_MAX_ROWS,
+                       help=f'Limite de entradas do cache de previsões (default: {config.PREDICTION_CACHE_MAX_ROWS})')
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if not Path(args.model_dir).exists():
+        print(f"Erro: Artefato {args.model_dir} não encontrado")
+        sys.exit(1)
+
+    if not Path(args.input).exists():
+        print(f"Erro: Arquivo {args.input} não encontrado")
+        sys.exit(1)
+
+    try:
+        artefato = art.carregar_artefato(args.model_dir, compilado=args.backend == 'compilado')
+        cache = None
+        if args.prediction_cache:
+            import cache_previsoes as cp
+            cache = cp.CachePrevisoes(args.prediction_cache, cp.impressao_artefato(artefato),
+                                      args.prediction_cache_max_rows)
+        prever_arquivo(artefato, args.input, args.output, args.chunk_size, cache)
+        if cache is not None:
+            cache.salvar()
+            cache.registrar_resumo()
+        print("\n✅ Previsão concluída com sucesso!")
+
+    except Exception as e:
+        print(f"\n❌ Erro durante previsão: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+Preditor compilado para o modelo ONIA
+Converte o booster XGBoost em arrays NumPy planos e percorre as árvores de
+forma vetorizada, sem DMatrix nem o wrapper do scikit-learn
+
+As árvores de todas as classes são concatenadas em um único conjunto de
+arrays (filho esquerdo, filho direito, feature, limiar, direção padrão e
+valor da folha). Todos os pares (linha, árvore) descem um nível por passo,
+de forma vetorizada; um par sai do conjunto ativo assim que chega a uma
+folha, de modo que o custo acompanha o comprimento dos caminhos e não a
+maior profundidade do modelo.
+
+O percurso em NumPy só compensa em lotes pequenos (requisições de uma
+linha no serve, por exemplo): o custo cresce com linhas x árvores, enquanto
+o XGBoost tem um custo fixo por chamada e percorre as árvores em C++. Acima
+de LINHAS_MAX_COMPILADO linhas o preditor repassa o lote ao booster
+original, quando disponível.
+
+Para reproduzir as classes do XGBoost, as features são convertidas para
+float32 como na DMatrix, as folhas são somadas em float32 na ordem das
+árvores a partir do base_score e o softmax segue a mesma sequência de
+operações do XGBoost.
+
+O preditor só depende de NumPy depois de compilado e pode ser salvo em um
+arquivo .npz (salvar/carregar); carregado sem o booster, usa sempre o
+percurso compilado.
+"""
+
+import json
+import logging
+
+import numpy as np
+
+# Elementos (linhas x árvores) percorridos por vez; limita a memória temporária
+ELEMENTOS_POR_BLOCO = 1 << 20
+
+# Acima deste número de linhas o lote vai para o booster; com o modelo padrão
+# (2.500 árvores) o XGBoost já empata por volta de 8 linhas
+# (benchmarks/benchmark_inferencia.py)
+LINHAS_MAX_COMPILADO = 4
+
+OBJETIVOS_SUPORTADOS = ('multi:softprob', 'multi:softmax', 'binary:logistic')
+
+class PreditorCompilado:
+    """Árvores do booster em arrays planos, com a interface predict/predict_proba."""
+
+    ARRAYS = ('esquerda', 'direita', 'feature', 'limiar', 'padrao_esquerda',
+              'valor_folha', 'raizes', 'grupos', 'base_margem', 'classes')
+
+    def __init__(self, esquerda, direita, feature, limiar, padrao_esquerda, valor_folha,
+                 raizes, grupos, base_margem, classes, objetivo, n_features, profundidade,
+                 booster=None):
+        self.esquerda = esquerda
+        self.direita = direita
+        self.feature = feature
+        self.limiar = limiar
+        self.padrao_esquerda = padrao_esquerda
+        self.valor_folha = valor_folha
+        self.raizes = raizes
+        self.grupos = grupos
+        self.base_margem = base_margem
+        self.classes = classes
+        self.classes_ = classes
+        self.objetivo = objetivo
+        self.n_features = n_features
+        self.profundidade = profundidade
+        self.booster = booster
+        self.max_linhas = LINHAS_MAX_COMPILADO
+        self.eh_folha = esquerda == np.arange(len(esquerda))
+        # Número de rodadas quando as árvores seguem o padrão 0, 1, ..., G-1 por rodada
+        n_grupos = len(base_margem)
+        self.rodadas = None
+        if len(grupos) % n_grupos == 0 and np.array_equal(
+                grupos, np.tile(np.arange(n_grupos, dtype=grupos.dtype), len(grupos) // n_grupos)):
+            self.rodadas = len(grupos) // n_grupos
+
+    @classmethod
+    def de_booster(cls, booster, classes=None):
+        """
+        Compila um Booster XGBoost (gbtree, sem features categóricas).
+
+        Args:
+            booster (Booster): Booster treinado (já recortado, se for o caso)
+            classes (array): Rótulos das classes (default: 0..n_classes-1)
+
+        Returns:
+            PreditorCompilado: Preditor equivalente; guarda o booster para os
+                lotes acima de max_linhas
+        """
+        modelo_json = json.loads(booster.save_raw(raw_format='json'))
+        learner = modelo_json['learner']
+        objetivo = learner['objective']['name']
+        if objetivo not in OBJETIVOS_SUPORTADOS:
+            raise ValueError(f"Objetivo não suportado pelo preditor compilado: {objetivo}")
+        if learner['gradient_booster']['name'] != 'gbtree':
+            raise ValueError(f"Booster não suportado: {learner['gradient_booster']['name']}")
+
+        parametros = learner['learner_model_param']
+        n_grupos = max(1, int(parametros['num_class']))
+        base = parametros['base_score'].strip('[]').split(',')
+        base_margem = np.broadcast_to(np.asarray(base, dtype=np.float32), (n_grupos,)).copy()
+        if objetivo == 'binary:logistic':
+            # base_score é guardado como probabilidade; a soma parte da margem (logit)
+            base_margem = np.log(base_margem / (1 - base_margem)).astype(np.float32)
+
+        modelo = learner['gradient_booster']['model']
+        esquerda, direita, feature, limiar, padrao, folha, raizes = [], [], [], [], [], [], []
+        deslocamento = 0
+        for arvore in modelo['trees']:
+            if any(arvore.get('split_type', [])):
+                raise ValueError("Divisões categóricas não são suportadas pelo preditor compilado")
+            e = np.asarray(arvore['left_children'], dtype=np.int32)
+            d = np.asarray(arvore['right_children'], dtype=np.int32)
+            condicoes = np.asarray(arvore['split_conditions'], dtype=np.float32)
+            eh_folha = e == -1
+            nos = np.arange(len(e), dtype=np.int32) + deslocamento
+
+            # Folhas apontam para si mesmas; os filhos passam a índices globais
+            esquerda.append(np.where(eh_folha, nos, e + deslocamento))
+            direita.append(np.where(eh_folha, nos, d + deslocamento))
+            feature.append(np.where(eh_folha, 0, arvore['split_indices']).astype(np.int32))
+            limiar.append(np.where(eh_folha, np.float32(0), condicoes))
+            padrao.append(np.asarray(arvore['default_left'], dtype=bool))
+            folha.append(np.where(eh_folha, condicoes, np.float32(0)))
+            raizes.append(deslocamento)
+            deslocamento += len(e)
+
+        esquerda = np.concatenate(esquerda)
+        direita = np.concatenate(direita)
+        raizes = np.asarray(raizes, dtype=np.int32)
+
+        # Maior profundidade: passos até todas as raízes chegarem às folhas
+        profundidade = 0
+        nos = raizes
+        while True:
+            internos = nos[esquerda[nos] != nos]
+            if len(internos) == 0:
+                break
+            nos = np.concatenate((esquerda[internos], direita[internos]))
+            profundidade += 1
+
+        if classes is None:
+            classes = np.arange(2 if objetivo == 'binary:logistic' else n_grupos)
+
+        return cls(esquerda=esquerda, direita=direita,
+                   feature=np.concatenate(feature), limiar=np.concatenate(limiar),
+                   padrao_esquerda=np.concatenate(padrao), valor_folha=np.concatenate(folha),
+                   raizes=raizes, grupos=np.asarray(modelo['tree_info'], dtype=np.int32),
+                   base_margem=base_margem, classes=np.asarray(classes), objetivo=objetivo,
+                   n_features=int(parametros['num_feature']), profundidade=profundidade,
+                   booster=booster)
+
+    @classmethod
+    def carregar(cls, caminho, booster=None):
+        """Carrega um preditor salvo com salvar() (booster opcional para lotes grandes)."""
+        with np.load(caminho, allow_pickle=False) as dados:
+            arrays = {nome: dados[nome] for nome in cls.ARRAYS}
+            meta = json.loads(str(dados['meta']))
+        return cls(**arrays, **meta, booster=booster)
+
+    def salvar(self, caminho):
+        """Salva os arrays do preditor em um arquivo .npz."""
+        meta = {'objetivo': self.objetivo, 'n_features': self.n_features,
+                'profundidade': self.profundidade}
+        np.savez(caminho, meta=json.dumps(meta), **{nome: getattr(self, nome) for nome in self.ARRAYS})
+
+    def _margem_bloco(self, X):
+        """Margens (linhas x grupos) de um bloco de linhas em float32."""
+        n, n_features = X.shape
+        n_arvores = len(self.raizes)
+        plano = X.ravel()
+        tem_nan = bool(np.isnan(plano).any())
+
+        # Pares (linha, árvore) achatados; só os que ainda não chegaram a uma
+        # folha seguem para o próximo nível
+        nos = np.tile(self.raizes, n)
+        ativos = np.flatnonzero(~self.eh_folha[nos])
+        no = nos[ativos]
+        while len(ativos):
+            valores = plano[(ativos // n_arvores) * n_features + self.feature[no]]
+            vai_esquerda = valores < self.limiar[no]
+            if tem_nan:
+                vai_esquerda |= np.isnan(valores) & self.padrao_esquerda[no]
+            no = np.where(vai_esquerda, self.esquerda[no], self.direita[no])
+            nos[ativos] = no
+            continua = ~self.eh_folha[no]
+            ativos, no = ativos[continua], no[continua]
+
+        folhas = self.valor_folha[nos].reshape(n, n_arvores)
+        # Soma sequencial em float32 na ordem das árvores a partir do base_score, como no XGBoost
+        margem = np.empty((n, len(self.base_margem)), dtype=np.float32)
+        margem[:] = self.base_margem
+        if self.rodadas is not None:
+            # Árvores em rodadas completas (uma por grupo, na ordem dos grupos): uma soma por rodada
+            por_rodada = folhas.reshape(n, self.rodadas, len(self.base_margem))
+            for rodada in range(self.rodadas):
+                margem += por_rodada[:, rodada]
+        else:
+            for arvore, grupo in enumerate(self.grupos):
+                margem[:, grupo] += folhas[:, arvore]
+        return margem
+
+    def _margem_booster(self, X):
+        """Margens do lote calculadas pelo booster original (lotes grandes)."""
+        margem = self.booster.inplace_predict(X, predict_type='margin')
+        return margem.reshape(len(X), len(self.base_margem)).astype(np.float32, copy=False)
+
+    def margem(self, X):
+        """
+        Calcula a margem (soma das folhas) de cada linha e grupo.
+
+        Lotes com mais de max_linhas linhas vão para o booster, se houver.
+
+        Args:
+            X (ndarray ou DataFrame): Features na ordem do treino (já normalizadas,
+                se o modelo foi treinado com normalização)
+
+        Returns:
+            ndarray: Margens float32 com shape (linhas, grupos)
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Esperadas {self.n_features} features, recebido shape {X.shape}")
+        if self.booster is not None and len(X) > self.max_linhas:
+            return self._margem_booster(X)
+
+        linhas_por_bloco = max(1, ELEMENTOS_POR_BLOCO // len(self.raizes))
+        if len(X) <= linhas_por_bloco:
+            return self._margem_bloco(X)
+        saida = np.empty((len(X), len(self.base_margem)), dtype=np.float32)
+        for inicio in range(0, len(X), linhas_por_bloco):
+            saida[inicio:inicio + linhas_por_bloco] = self._margem_bloco(X[inicio:inicio + linhas_por_bloco])
+        return saida
+
+    def predict_proba(self, X):
+        margem = self.margem(X)
+        if self.objetivo == 'binary:logistic':
+            p = np.float32(1) / (np.float32(1) + np.exp(-margem[:, 0]))
+            return np.column_stack([1 - p, p])
+        # Softmax como em xgboost/src/common/math.h: exp em float32, soma em double
+        e = np.exp(margem - margem.max(axis=1, keepdims=True))
+        soma = e.sum(axis=1, keepdims=True, dtype=np.float64).astype(np.float32)
+        return e / soma
+
+    def predict(self, X):
+        if self.objetivo == 'binary:logistic':
+            return self.classes[(self.predict_proba(X)[:, 1] > 0.5).astype(np.intp)]
+        if self.objetivo == 'multi:softmax':
+            return self.classes[np.argmax(self.margem(X), axis=1)]
+        return self.classes[np.argmax(self.predict_proba(X), axis=1)]
+
+def compilar_modelo(modelo):
+    """
+    Compila um XGBClassifier treinado, respeitando a melhor iteração do early stopping.
+
+    Args:
+        modelo (XGBClassifier): Modelo treinado
+
+    Returns:
+        PreditorCompilado: Preditor com as mesmas classes previstas por modelo.predict
+    """
+    logger = logging.getLogger(__name__)
+
+    booster = modelo.get_booster()
+    melhor_iteracao = booster.attr('best_iteration')
+    if melhor_iteracao is not None:
+        booster = booster[:int(melhor_iteracao) + 1]
+
+    preditor = PreditorCompilado.de_booster(booster, modelo.classes_)
+    logger.info(f"Preditor compilado: {len(preditor.raizes)} árvores, {len(preditor.esquerda)} nós, "
+                f"profundidade máxima {preditor.profundidade}; lotes acima de "
+                f"{preditor.max_linhas} linhas usam o booster")
+    return preditor
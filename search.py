@@ -0,0 +1,266 @@
+"""
+Busca de hiperparâmetros para modelos ONIA
+Successive halving sobre o número de árvores, com trials em paralelo
+
+Cada trial concluído é gravado em um arquivo JSONL, identificado pelo hash
+dos parâmetros, do orçamento (n_estimators) e dos dados. Ao executar a busca
+novamente, os trials já avaliados são reaproveitados, o que permite retomar
+uma busca interrompida.
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import logging
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+
+import config
+import validacao_cruzada as vc
+
+ESPACO_PADRAO = {
+    'max_depth': [4, 6, 8, 12, 20],
+    'learning_rate': [0.03, 0.1, 0.3],
+    'min_child_weight': [1, 5],
+    'subsample': [0.8, 1.0],
+    'colsample_bytree': [0.8, 1.0],
+}
+
+# Dados do processo worker, preenchidos por _inicializar_worker
+_dados_worker = {}
+
+def hash_dados(*arrays):
+    """Calcula um hash SHA-256 do conteúdo dos arrays."""
+    h = hashlib.sha256()
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        h.update(str((array.shape, array.dtype.str)).encode())
+        h.update(array.tobytes())
+    return h.hexdigest()
+
+def chave_trial(parametros, hash_de_dados):
+    """Identificador de um trial: hash dos parâmetros completos e dos dados."""
+    # n_jobs/nthread dependem do número de workers e não alteram o modelo resultante
+    parametros = {k: v for k, v in parametros.items() if k not in ('n_jobs', 'nthread')}
+    conteudo = json.dumps({'parametros': parametros, 'dados': hash_de_dados}, sort_keys=True)
+    return hashlib.sha256(conteudo.encode()).hexdigest()
+
+def carregar_resultados(arquivo):
+    """
+    Lê os trials já concluídos do arquivo JSONL.
+
+    Linhas incompletas (por exemplo, de uma execução interrompida) são ignoradas.
+    """
+    resultados = {}
+    if not Path(arquivo).exists():
+        return resultados
+    with open(arquivo, encoding='utf-8') as f:
+        for linha in f:
+            try:
+                registro = json.loads(linha)
+            except json.JSONDecodeError:
+                continue
+            resultados[registro['chave']] = registro
+    return resultados
+
+def gerar_candidatos(espaco, n_candidatos, random_state=52):
+    """
+    Gera as configurações iniciais a partir do espaço de busca.
+
+    Se o grid completo tiver até n_candidatos combinações, todas são usadas;
+    caso contrário, é feita uma amostra aleatória sem repetição.
+    """
+    nomes = sorted(espaco)
+    grid = [dict(zip(nomes, valores)) for valores in itertools.product(*(espaco[n] for n in nomes))]
+    if len(grid) <= n_candidatos:
+        return grid
+    return random.Random(random_state).sample(grid, n_candidatos)
+
+def _inicializar_worker(X_train, y_train, X_val, y_val):
+    """Recebe os dados uma única vez por processo worker."""
+    _dados_worker.update(X_train=X_train, y_train=y_train, X_val=X_val, y_val=y_val)
+
+def _avaliar_trial(parametros):
+    """Treina e avalia uma configuração. Executado no processo worker."""
+    from sklearn.metrics import f1_score
+    from xgboost import XGBClassifier
+
+    inicio = time.perf_counter()
+    modelo = XGBClassifier(**parametros)
+    modelo.fit(_dados_worker['X_train'], _dados_worker['y_train'])
+    previsoes = modelo.predict(_dados_worker['X_val'])
+    return {
+        'f1': float(f1_score(_dados_worker['y_val'], previsoes, average='weighted')),
+        'tempo_fit': time.perf_counter() - inicio,
+    }
+
+def successive_halving(X_train, y_train, X_val, y_val, candidatos, parametros_base,
+                       arquivo_resultados, min_estimators=50, max_estimators=500,
+                       eta=3, n_workers=None):
+    """
+    Executa successive halving usando n_estimators como orçamento.
+
+    Em cada rodada, todos os candidatos restantes são treinados com o orçamento
+    atual; apenas o melhor 1/eta segue para a próxima rodada, com orçamento
+    multiplicado por eta.
+
+    Args:
+        X_train, y_train: Dados de treino
+        X_val, y_val: Dados de validação
+        candidatos (list): Configurações iniciais
+        parametros_base (dict): Parâmetros fixos do XGBoost
+        arquivo_resultados (str): Arquivo JSONL com os trials concluídos
+        min_estimators (int): Orçamento da primeira rodada
+        max_estimators (int): Orçamento máximo
+        eta (int): Fator de redução
+        n_workers (int): Número de processos paralelos
+
+    Returns:
+        list: Registros da última rodada, do melhor para o pior
+    """
+    logger = logging.getLogger(__name__)
+
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+
+    base = dict(parametros_base)
+    base.pop('early_stopping_rounds', None)
+    base['n_jobs'] = vc.dividir_threads(base.get('n_jobs'), n_workers)
+
+    hash_de_dados = hash_dados(X_train, y_train, X_val, y_val)
+    concluidos = carregar_resultados(arquivo_resultados)
+    logger.info(f"{len(concluidos)} trials já registrados em {arquivo_resultados}")
+
+    restantes = list(candidatos)
+    orcamento = min_estimators
+    rodada = 0
+
+    with ProcessPoolExecutor(max_workers=n_workers,
+                             mp_context=get_context('spawn'),
+                             initializer=_inicializar_worker,
+                             initargs=(X_train, y_train, X_val, y_val)) as executor, \
+            open(arquivo_resultados, 'a', encoding='utf-8') as saida:
+        while True:
+            logger.info(f"Rodada {rodada}: {len(restantes)} candidatos com n_estimators={orcamento}")
+
+            registros = []
+            pendentes = {}
+            for candidato in restantes:
+                parametros = {**base, **candidato, 'n_estimators': orcamento}
+                chave = chave_trial(parametros, hash_de_dados)
+                if chave in concluidos:
+                    registros.append(concluidos[chave])
+                else:
+                    futuro = executor.submit(_avaliar_trial, parametros)
+                    pendentes[futuro] = (chave, candidato, parametros)
+
+            reaproveitados = len(registros)
+            for futuro in as_completed(pendentes):
+                chave, candidato, parametros = pendentes[futuro]
+                registro = {'chave': chave, 'rodada': rodada, 'candidato': candidato,
+                            'parametros': parametros, **futuro.result()}
+                saida.write(json.dumps(registro) + '\n')
+                saida.flush()
+                concluidos[chave] = registro
+                registros.append(registro)
+                logger.info(f"  F1={registro['f1']:.4f} fit={registro['tempo_fit']:.1f}s {candidato}")
+
+            logger.info(f"Rodada {rodada}: {len(pendentes)} trials executados, {reaproveitados} reaproveitados")
+
+            registros.sort(key=lambda r: r['f1'], reverse=True)
+            if orcamento >= max_estimators or len(registros) <= 1:
+                return registros
+
+            manter = max(1, math.ceil(len(registros) / eta))
+            restantes = [r['candidato'] for r in registros[:manter]]
+            orcamento = min(orcamento * eta, max_estimators)
+            rodada += 1
+
+def main():
+    parser = argparse.ArgumentParser(description='Busca de hiperparâmetros do modelo ONIA XGBoost')
+    parser.add_argument('--data-dir', default='templates',
+                       help='Diretório contendo os dados (default: templates)')
+    parser.add_argument('--space', default=None,
+                       help='Arquivo JSON com o espaço de busca {parâmetro: [valores]} '
+                            '(default: espaço embutido)')
+    parser.add_argument('--candidatos', type=int, default=27,
+                       help='Número de configurações iniciais (default: 27)')
+    parser.add_argument('--min-estimators', type=int, default=50,
+                       help='n_estimators da primeira rodada (default: 50)')
+    parser.add_argument('--max-estimators', type=int, default=500,
+                       help='n_estimators máximo (default: 500)')
+    parser.add_argument('--eta', type=int, default=3,
+                       help='Fator de redução do successive halving (default: 3)')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Processos paralelos (default: número de cores)')
+    parser.add_argument('--nthread', type=int, default=-1,
+                       help='Orçamento total de threads do XGBoost (default: todos os cores)')
+    parser.add_argument('--resultados', default='busca_resultados.jsonl',
+                       help='Arquivo JSONL dos trials concluídos (default: busca_resultados.jsonl)')
+    parser.add_argument('--validation-size', type=float, default=0.1,
+                       help='Proporção para validação (default: 0.1)')
+    parser.add_argument('--random-state', type=int, default=52,
+                       help='Semente aleatória (default: 52)')
+    parser.add_argument('--no-scaling', action='store_true',
+                       help='Desabilitar normalização dos dados')
+
+    args = parser.parse_args()
+
+    if not Path(args.data_dir).exists():
+        print(f"Erro: Diretório {args.data_dir} não encontrado")
+        sys.exit(1)
+
+    espaco = ESPACO_PADRAO
+    if args.space:
+        with open(args.space, encoding='utf-8') as f:
+            espaco = json.load(f)
+
+    import modelo_xgb_classifier_v2 as modelo
+
+    logger = modelo.configurar_logging(config.LOG_FILE)
+
+    try:
+        treino, teste = modelo.carregar_dados(args.data_dir, carregar_teste=False)
+        if treino is None or not modelo.validar_dados(treino, teste):
+            print("\n❌ Falha ao carregar os dados")
+            sys.exit(1)
+
+        X_train, X_val, y_train, y_val, _, _, _ = modelo.preparar_dados(
+            treino, None,
+            use_scaling=not args.no_scaling,
+            validation_size=args.validation_size,
+            random_state=args.random_state
+        )
+
+        parametros_base = dict(config.XGBOOST_PARAMS)
+        parametros_base['random_state'] = args.random_state
+        parametros_base['n_jobs'] = args.nthread
+
+        candidatos = gerar_candidatos(espaco, args.candidatos, args.random_state)
+        ranking = successive_halving(
+            X_train, np.asarray(y_train), X_val, np.asarray(y_val),
+            candidatos, parametros_base, args.resultados,
+            min_estimators=args.min_estimators, max_estimators=args.max_estimators,
+            eta=args.eta, n_workers=args.workers
+        )
+
+        melhor = ranking[0]
+        logger.info(f"Melhor configuração: F1={melhor['f1']:.4f} {melhor['parametros']}")
+        print(f"\n✅ Melhor Medida-F: {melhor['f1']:.4f}")
+        print(f"Parâmetros: {melhor['parametros']}")
+
+    except Exception as e:
+        print(f"\n❌ Erro durante a busca: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Seleção de features do ONIA por importância
+Ordena as features pelo ganho total nas árvores e pela queda de Medida-F na
+validação quando cada coluna é permutada, e retreina removendo as mais
+fracas a cada passo
+
+Para cada subconjunto são medidos Medida-F na validação, tempo de treino,
+tamanho do modelo e latência por linha. O subconjunto escolhido é o menor
+cuja Medida-F fica a até `tolerancia` da melhor; ele é gravado no artefato
+(metadados 'colunas'), de modo que a leitura e a previsão usam só essas
+colunas.
+"""
+
+import copy
+import logging
+import time
+
+import numpy as np
+from sklearn.metrics import f1_score
+from xgboost import XGBClassifier
+
+from compressao import latencia_por_linha_ms, tamanho_modelo_bytes
+
+def importancia_ganho(modelo, n_features):
+    """Ganho total de cada feature nas árvores (0 para features não usadas)."""
+    ganhos = modelo.get_booster().get_score(importance_type='total_gain')
+    return np.array([ganhos.get(f"f{i}", 0.0) for i in range(n_features)])
+
+def importancia_permutacao(modelo, X_val, y_val, n_repeticoes=3, random_state=52):
+    """
+    Queda média da Medida-F na validação ao permutar cada coluna.
+
+    Returns:
+        ndarray: Queda de F1 por feature (maior = mais importante)
+    """
+    rng = np.random.default_rng(random_state)
+    X_val = np.array(X_val, copy=True)
+    f1_base = f1_score(y_val, modelo.predict(X_val), average='weighted')
+    quedas = np.zeros(X_val.shape[1])
+    for coluna in range(X_val.shape[1]):
+        original = X_val[:, coluna].copy()
+        for _ in range(n_repeticoes):
+            X_val[:, coluna] = rng.permutation(original)
+            quedas[coluna] += f1_base - f1_score(y_val, modelo.predict(X_val), average='weighted')
+        X_val[:, coluna] = original
+    return quedas / n_repeticoes
+
+def ordenar_features(modelo, X_val, y_val, random_state=52):
+    """
+    Ordena as features da mais fraca para a mais forte.
+
+    A ordem combina as duas importâncias pela média das posições no ranking
+    de cada uma (empates resolvidos pelo ganho).
+
+    Returns:
+        tuple: (índices da mais fraca para a mais forte, ganho, permutação)
+    """
+    ganho = importancia_ganho(modelo, X_val.shape[1])
+    permutacao = importancia_permutacao(modelo, X_val, y_val, random_state=random_state)
+    posicao_ganho = np.argsort(np.argsort(ganho))
+    posicao_permutacao = np.argsort(np.argsort(permutacao))
+    ordem = np.lexsort((ganho, posicao_ganho + posicao_permutacao))
+    return ordem, ganho, permutacao
+
+def recortar_scaler(scaler, indices):
+    """Cópia de um StandardScaler ajustado restrita às colunas dadas."""
+    if scaler is None:
+        return None
+    indices = np.asarray(indices)
+    recortado = copy.deepcopy(scaler)
+    for atributo in ('mean_', 'scale_', 'var_', 'feature_names_in_', 'n_samples_seen_'):
+        valor = getattr(scaler, atributo, None)
+        if isinstance(valor, np.ndarray) and valor.ndim == 1 and len(valor) == scaler.n_features_in_:
+            setattr(recortado, atributo, valor[indices])
+    recortado.n_features_in_ = len(indices)
+    return recortado
+
+def selecionar_features(X_train, y_train, X_val, y_val, colunas, xgboost_params,
+                        min_features=1, passo=1, tolerancia=0.005):
+    """
+    Retreina removendo as features mais fracas e mede cada subconjunto.
+
+    Args:
+        X_train, y_train: Dados de treino (matriz já normalizada)
+        X_val, y_val: Dados de validação
+        colunas (list): Nomes das colunas de X_train, na ordem
+        xgboost_params (dict): Parâmetros do XGBClassifier
+        min_features (int): Menor subconjunto avaliado
+        passo (int): Features removidas por iteração
+        tolerancia (float): Perda de Medida-F aceita em relação ao melhor subconjunto
+
+    Returns:
+        dict: tabela (uma linha por subconjunto: n_features, colunas,
+            removidas no passo, f1, tempo_treino_s, tamanho_bytes,
+            latencia_ms_linha, ganho e permutacao), indices e colunas
+            escolhidas e o modelo treinado com elas
+    """
+    logger = logging.getLogger(__name__)
+
+    X_train = np.asarray(X_train)
+    X_val = np.asarray(X_val)
+    random_state = xgboost_params.get('random_state', 52)
+    restantes = list(range(len(colunas)))
+    removidas = []  # Removidas no passo que levou ao subconjunto atual
+    tabela, modelos = [], []
+
+    while True:
+        logger.info(f"Seleção de features: treinando com {len(restantes)} features...")
+        inicio = time.perf_counter()
+        modelo = XGBClassifier(**xgboost_params)
+        modelo.fit(X_train[:, restantes], y_train, eval_set=[(X_val[:, restantes], y_val)], verbose=False)
+        tempo = time.perf_counter() - inicio
+
+        X_val_sub = X_val[:, restantes]
+        ordem, ganho, permutacao = ordenar_features(modelo, X_val_sub, y_val, random_state)
+        tabela.append({
+            'n_features': len(restantes),
+            'colunas': [colunas[i] for i in restantes],
+            'removidas': removidas,
+            'f1': f1_score(y_val, modelo.predict(X_val_sub), average='weighted'),
+            'tempo_treino_s': tempo,
+            'tamanho_bytes': tamanho_modelo_bytes(modelo),
+            'latencia_ms_linha': latencia_por_linha_ms(modelo, X_val_sub),
+            'ganho': {colunas[i]: float(g) for i, g in zip(restantes, ganho)},
+            'permutacao': {colunas[i]: float(p) for i, p in zip(restantes, permutacao)},
+        })
+        modelos.append(modelo)
+
+        n_remover = min(passo, len(restantes) - min_features)
+        if n_remover <= 0:
+            break
+        fracas = [restantes[i] for i in ordem[:n_remover]]
+        removidas = [colunas[i] for i in fracas]
+        restantes = [i for i in restantes if i not in fracas]
+
+    melhor_f1 = max(linha['f1'] for linha in tabela)
+    escolhida = min((i for i, linha in enumerate(tabela) if linha['f1'] >= melhor_f1 - tolerancia),
+                    key=lambda i: tabela[i]['n_features'])
+    escolhidas = tabela[escolhida]['colunas']
+
+    logger.info(f"{'features':>8} {'F1 val':>8} {'treino (s)':>11} {'tamanho (KB)':>13} {'ms/linha':>10}  removidas")
+    for i, linha in enumerate(tabela):
+        marca = ' * ' if i == escolhida else '   '
+        logger.info(f"{linha['n_features']:>8} {linha['f1']:>8.4f} {linha['tempo_treino_s']:>11.2f} "
+                    f"{linha['tamanho_bytes'] / 1024:>13.1f} {linha['latencia_ms_linha']:>10.4f}{marca}"
+                    f"{', '.join(linha['removidas']) or '-'}")
+    logger.info(f"Features escolhidas ({len(escolhidas)} de {len(colunas)}, tolerância de F1 {tolerancia}): "
+                f"{', '.join(escolhidas)}")
+
+    return {
+        'tabela': tabela,
+        'indices': [colunas.index(c) for c in escolhidas],
+        'colunas': escolhidas,
+        'modelo': modelos[escolhida],
+    }
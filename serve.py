@@ -0,0 +1,250 @@
+"""
+Servidor de previsão para modelos ONIA
+Carrega o artefato do modelo uma única vez e atende previsões online via HTTP
+
+Requisições concorrentes são agrupadas em micro-lotes (até MAX_BATCH_SIZE
+registros ou MAX_WAIT_MS de espera) e previstas em uma única chamada ao
+booster, executada em uma thread dedicada para não bloquear o event loop.
+
+Endpoints:
+    POST /predict  {"features": [13 valores]} ou {"features": {"col_0": ..., ...}}
+    GET  /metrics  latência p50/p99, vazão e tamanho médio dos lotes
+    GET  /health   verificação simples de disponibilidade
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+import artefato as art
+import config
+
+STATUS_HTTP = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               500: 'Internal Server Error'}
+
+class Metricas:
+    """Contadores de latência e vazão do servidor."""
+
+    def __init__(self, janela=10_000):
+        self.inicio = time.monotonic()
+        self.latencias_ms = collections.deque(maxlen=janela)
+        self.requisicoes = 0
+        self.erros = 0
+        self.lotes = 0
+        self.registros_em_lotes = 0
+
+    def registrar_requisicao(self, latencia_ms):
+        self.requisicoes += 1
+        self.latencias_ms.append(latencia_ms)
+
+    def registrar_lote(self, tamanho):
+        self.lotes += 1
+        self.registros_em_lotes += tamanho
+
+    def resumo(self):
+        tempo = time.monotonic() - self.inicio
+        latencias = np.fromiter(self.latencias_ms, dtype=np.float64)
+        p50, p99 = np.percentile(latencias, [50, 99]) if len(latencias) else (0.0, 0.0)
+        return {
+            'requisicoes': self.requisicoes,
+            'erros': self.erros,
+            'lotes': self.lotes,
+            'tamanho_medio_lote': self.registros_em_lotes / self.lotes if self.lotes else 0.0,
+            'latencia_p50_ms': float(p50),
+            'latencia_p99_ms': float(p99),
+            'vazao_rps': self.requisicoes / tempo if tempo > 0 else 0.0,
+            'tempo_ativo_s': tempo,
+        }
+
+class MicroLote:
+    """
+    Agrupa previsões concorrentes em lotes para o booster.
+
+    Cada chamada a prever() enfileira um registro e aguarda o resultado; um
+    único coletor forma os lotes e executa a previsão na thread do modelo.
+    """
+
+    def __init__(self, artefato, max_batch_size, max_wait_ms, metricas):
+        self.artefato = artefato
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.metricas = metricas
+        self.fila = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='booster')
+
+    async def prever(self, features):
+        futuro = asyncio.get_running_loop().create_future()
+        await self.fila.put((features, futuro))
+        return await futuro
+
+    def _prever_lote(self, matriz):
+        proba = art.prever_proba(self.artefato, matriz)
+        return self.artefato['classes'][np.argmax(proba, axis=1)], proba
+
+    async def executar(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            lote = [await self.fila.get()]
+            limite = loop.time() + self.max_wait
+            while len(lote) < self.max_batch_size:
+                restante = limite - loop.time()
+                if restante <= 0:
+                    break
+                try:
+                    lote.append(await asyncio.wait_for(self.fila.get(), restante))
+                except asyncio.TimeoutError:
+                    break
+
+            matriz = np.array([features for features, _ in lote], dtype=np.float64)
+            try:
+                classes, proba = await loop.run_in_executor(self.executor, self._prever_lote, matriz)
+            except Exception as e:
+                for _, futuro in lote:
+                    if not futuro.done():
+                        futuro.set_exception(e)
+                continue
+
+            self.metricas.registrar_lote(len(lote))
+            for i, (_, futuro) in enumerate(lote):
+                if not futuro.done():
+                    futuro.set_result({'target': int(classes[i]), 'proba': proba[i].tolist()})
+
+class Servidor:
+    """Servidor HTTP/1.1 mínimo sobre asyncio."""
+
+    def __init__(self, artefato, max_batch_size, max_wait_ms):
+        self.artefato = artefato
+        self.colunas = artefato['colunas']
+        self.metricas = Metricas()
+        self.micro_lote = MicroLote(artefato, max_batch_size, max_wait_ms, self.metricas)
+
+    def _extrair_features(self, corpo):
+        dados = json.loads(corpo)
+        features = dados['features']
+        if isinstance(features, dict):
+            features = [features[c] for c in self.colunas]
+        if len(features) != len(self.colunas):
+            raise ValueError(f"Esperadas {len(self.colunas)} features, recebidas {len(features)}")
+        return [float(v) for v in features]
+
+    async def _rotear(self, metodo, caminho, corpo):
+        if caminho == '/predict':
+            if metodo != 'POST':
+                return 405, {'erro': 'use POST'}
+            inicio = time.perf_counter()
+            try:
+                features = self._extrair_features(corpo)
+            except (ValueError, KeyError, TypeError) as e:
+                self.metricas.erros += 1
+                return 400, {'erro': str(e)}
+            resultado = await self.micro_lote.prever(features)
+            self.metricas.registrar_requisicao((time.perf_counter() - inicio) * 1000)
+            return 200, resultado
+        if caminho == '/metrics':
+            return 200, self.metricas.resumo()
+        if caminho == '/health':
+            return 200, {'status': 'ok'}
+        return 404, {'erro': f'rota {caminho} não encontrada'}
+
+    async def atender(self, reader, writer):
+        logger = logging.getLogger(__name__)
+        try:
+            while True:
+                linha = await reader.readline()
+                if not linha:
+                    break
+                metodo, caminho, versao = linha.decode('latin-1').split()
+
+                cabecalhos = {}
+                while True:
+                    linha = await reader.readline()
+                    if linha in (b'\r\n', b'\n', b''):
+                        break
+                    nome, _, valor = linha.decode('latin-1').partition(':')
+                    cabecalhos[nome.strip().lower()] = valor.strip()
+
+                corpo = await reader.readexactly(int(cabecalhos.get('content-length', 0)))
+
+                try:
+                    status, resposta = await self._rotear(metodo, caminho, corpo)
+                except Exception as e:
+                    logger.error(f"Erro ao processar {metodo} {caminho}: {e}")
+                    self.metricas.erros += 1
+                    status, resposta = 500, {'erro': str(e)}
+
+                manter = cabecalhos.get('connection', '').lower() != 'close' and versao == 'HTTP/1.1'
+                dados = json.dumps(resposta).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {STATUS_HTTP[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(dados)}\r\n"
+                    f"Connection: {'keep-alive' if manter else 'close'}\r\n\r\n".encode() + dados
+                )
+                await writer.drain()
+                if not manter:
+                    break
+        except (ValueError, asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def executar(self, host, porta):
+        logger = logging.getLogger(__name__)
+        coletor = asyncio.create_task(self.micro_lote.executar())
+        servidor = await asyncio.start_server(self.atender, host, porta)
+        logger.info(f"Servidor de previsão em http://{host}:{porta} "
+                    f"(lote máximo {self.micro_lote.max_batch_size}, "
+                    f"espera máxima {self.micro_lote.max_wait * 1000:.1f}ms)")
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            coletor.cancel()
+            self.micro_lote.executor.shutdown(wait=False)
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor de previsão do modelo ONIA XGBoost')
+    parser.add_argument('--model-dir', default=config.MODEL_DIR,
+                       help=f'Diretório do artefato do modelo (default: {config.MODEL_DIR})')
+    parser.add_argument('--host', default=config.SERVER_HOST,
+                       help=f'Endereço de escuta (default: {config.SERVER_HOST})')
+    parser.add_argument('--port', type=int, default=config.SERVER_PORT,
+                       help=f'Porta de escuta (default: {config.SERVER_PORT})')
+    parser.add_argument('--max-batch-size', type=int, default=config.MAX_BATCH_SIZE,
+                       help=f'Máximo de registros por lote (default: {config.MAX_BATCH_SIZE})')
+    parser.add_argument('--max-wait-ms', type=float, default=config.MAX_WAIT_MS,
+                       help=f'Espera máxima para completar um lote em ms (default: {config.MAX_WAIT_MS})')
+    parser.add_argument('--backend', choices=['xgboost', 'compilado'], default=config.INFERENCE_BACKEND,
+                       help=f'Backend de inferência; "compilado" só acelera lotes de até 4 linhas '
+                            f'(default: {config.INFERENCE_BACKEND})')
+    parser.add_argument('--nthread', type=int, default=None,
+                       help='Threads do booster na previsão (default: padrão do XGBoost)')
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format=config.LOG_FORMAT)
+
+    if not Path(args.model_dir).exists():
+        print(f"Erro: Artefato {args.model_dir} não encontrado")
+        sys.exit(1)
+
+    artefato = art.carregar_artefato(args.model_dir, compilado=args.backend == 'compilado')
+    if args.nthread is not None:
+        artefato['booster'].set_param({'nthread': args.nthread})
+
+    servidor = Servidor(artefato, args.max_batch_size, args.max_wait_ms)
+    try:
+        asyncio.run(servidor.executar(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\nServidor encerrado")
+
+if __name__ == "__main__":
+    main()
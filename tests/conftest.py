@@ -0,0 +1,58 @@
+"""
+Fixtures compartilhadas dos testes do ONIA
+Os módulos do projeto ficam na raiz do repositório e o gerador de dados
+sintéticos em benchmarks/
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+sys.path.insert(0, str(RAIZ / 'benchmarks'))
+
+PARAMETROS_PEQUENOS = {'n_estimators': 10, 'max_depth': 3, 'learning_rate': 0.3,
+                       'random_state': 52, 'n_jobs': 1, 'tree_method': 'hist'}
+
+@pytest.fixture
+def dados_sinteticos(tmp_path):
+    """Diretório com treino.csv (600 linhas) e teste.csv (200 linhas) sintéticos."""
+    from gerar_dados import gerar_conjunto
+    return gerar_conjunto(tmp_path / 'dados', 600, 200)
+
+@pytest.fixture
+def artefato_normalizado(dados_sinteticos, tmp_path):
+    """Artefato salvo com StandardScaler (sem incorporar às árvores) e o modelo em memória."""
+    import pandas as pd
+    from sklearn.preprocessing import StandardScaler
+    from xgboost import XGBClassifier
+
+    import artefato as art
+
+    treino = pd.read_csv(dados_sinteticos / 'treino.csv')
+    X = treino.drop(columns=['id', 'target'])
+    scaler = StandardScaler()
+    modelo = XGBClassifier(**PARAMETROS_PEQUENOS).fit(scaler.fit_transform(X), treino['target'])
+    diretorio = tmp_path / 'modelo'
+    art.salvar_artefato(modelo, scaler, list(X.columns), diretorio)
+    return diretorio, modelo, scaler
+
+@pytest.fixture
+def configuracao_treino(dados_sinteticos, tmp_path, monkeypatch):
+    """Configuração de treinar_modelo com um modelo pequeno, saídas em tmp_path."""
+    monkeypatch.chdir(tmp_path)  # log e relatórios fora do repositório
+    return {
+        'data_dir': str(dados_sinteticos),
+        'output_file': str(tmp_path / 'resultado.csv'),
+        'xgboost_params': dict(PARAMETROS_PEQUENOS, eval_metric='mlogloss', early_stopping_rounds=None),
+        'validation_size': 0.2,
+        'use_scaling': True,
+        'model_dir': str(tmp_path / 'modelo'),
+        'use_cache': False,
+        'stage_cache': False,
+        'run_report': False,
+        'prediction_cache': None,
+        'features': None,
+    }
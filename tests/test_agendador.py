@@ -0,0 +1,81 @@
+import threading
+import time
+
+import pytest
+
+from agendador import Etapa, executar_grafo
+
+class Ocupacao:
+    """Conta as threads declaradas pelas etapas em execução ao mesmo tempo."""
+
+    def __init__(self):
+        self.trava = threading.Lock()
+        self.atual = 0
+        self.maximo = 0
+        self.sozinhas = []
+
+    def etapa(self, nome, threads, valor=None, espera=0.05):
+        def funcao(*_):
+            with self.trava:
+                if threads > 2 and self.atual:
+                    self.sozinhas.append(nome)
+                self.atual += threads
+                self.maximo = max(self.maximo, self.atual)
+            time.sleep(espera)
+            with self.trava:
+                self.atual -= threads
+            return valor
+        return Etapa(nome, funcao, threads=threads)
+
+def test_dependencias_em_ordem_e_resultados_repassados():
+    ordem = []
+    def registrar(nome, funcao):
+        def etapa(*args):
+            ordem.append(nome)
+            return funcao(*args)
+        return etapa
+
+    etapas = [
+        Etapa('juntar', registrar('juntar', lambda a, b: (a, b)), dependencias=('esquerda', 'direita')),
+        Etapa('direita', registrar('direita', lambda x: x * 10), dependencias=('ler',)),
+        Etapa('esquerda', registrar('esquerda', lambda x: time.sleep(0.05) or x + 1), dependencias=('ler',)),
+        Etapa('ler', registrar('ler', lambda: 1)),
+    ]
+    resultados, execucao = executar_grafo(etapas, 4)
+
+    assert resultados == {'ler': 1, 'esquerda': 2, 'direita': 10, 'juntar': (2, 10)}
+    assert ordem[0] == 'ler' and ordem[-1] == 'juntar'
+    inicio = {e['etapa']: e['inicio_s'] for e in execucao['linha_do_tempo']}
+    fim = {e['etapa']: e['fim_s'] for e in execucao['linha_do_tempo']}
+    assert inicio['juntar'] >= max(fim['esquerda'], fim['direita'])
+    assert execucao['caminho_critico'] == ['ler', 'esquerda', 'juntar']
+
+@pytest.mark.parametrize('etapas, mensagem', [
+    ([Etapa('a', lambda b: b, ('b',)), Etapa('b', lambda c: c, ('c',)), Etapa('c', lambda a: a, ('a',))], 'Ciclo'),
+    ([Etapa('a', lambda: 1), Etapa('b', lambda x: x, ('x',))], 'inexistentes'),
+    ([Etapa('a', lambda: 1), Etapa('a', lambda: 2)], 'duplicada'),
+])
+def test_grafo_invalido(etapas, mensagem):
+    with pytest.raises(ValueError, match=mensagem):
+        executar_grafo(etapas, 2)
+
+def test_orcamento_de_threads():
+    ocupacao = Ocupacao()
+    _, execucao = executar_grafo([ocupacao.etapa(f"leve_{i}", 1) for i in range(6)], 2)
+    # Etapas independentes rodam em paralelo, mas nunca acima do orçamento
+    assert len(execucao['linha_do_tempo']) == 6
+    assert ocupacao.maximo == 2
+
+    # Uma etapa que declara mais threads que o orçamento roda sozinha
+    ocupacao = Ocupacao()
+    etapas = [ocupacao.etapa('leve_0', 1), ocupacao.etapa('pesada', 3), ocupacao.etapa('leve_1', 1)]
+    _, execucao = executar_grafo(etapas, 2)
+    assert len(execucao['linha_do_tempo']) == 3
+    assert ocupacao.maximo == 3 and ocupacao.sozinhas == []
+
+def test_erro_de_etapa_propaga():
+    def falhar(_):
+        raise RuntimeError('falhou')
+    etapas = [Etapa('a', lambda: 1), Etapa('b', falhar, ('a',)), Etapa('c', lambda b: b, ('b',))]
+    with pytest.raises(RuntimeError, match='falhou'):
+        executar_grafo(etapas, 2)
@@ -0,0 +1,36 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import artefato as art
+import predict
+
+def test_salvar_carregar_e_prever_arquivo(artefato_normalizado, dados_sinteticos, tmp_path):
+    diretorio, modelo, scaler = artefato_normalizado
+    teste = pd.read_csv(dados_sinteticos / 'teste.csv')
+
+    artefato = art.carregar_artefato(diretorio)
+    assert artefato['colunas'] == [c for c in teste.columns if c != 'id']
+    assert np.array_equal(artefato['classes'], modelo.classes_)
+    assert np.array_equal(artefato['scaler_mean'], scaler.mean_)
+    assert np.array_equal(artefato['scaler_scale'], scaler.scale_)
+
+    # Blocos pequenos: a saída concatenada mantém ids e ordem do arquivo de entrada
+    saida = tmp_path / 'previsto.csv'
+    assert predict.prever_arquivo(artefato, dados_sinteticos / 'teste.csv', saida, chunk_size=37) == len(teste)
+    previsto = pd.read_csv(saida)
+    assert list(previsto.columns) == ['id', 'target']
+    assert np.array_equal(previsto['id'], teste['id'])
+    esperado = modelo.predict(scaler.transform(teste[artefato['colunas']]))
+    assert np.array_equal(previsto['target'], esperado)
+
+def test_versao_incompativel(artefato_normalizado):
+    diretorio = artefato_normalizado[0]
+    caminho = diretorio / art.ARQUIVO_METADADOS
+    metadados = json.loads(caminho.read_text(encoding='utf-8'))
+    caminho.write_text(json.dumps(dict(metadados, versao=-1)), encoding='utf-8')
+
+    with pytest.raises(ValueError, match='Versão de artefato'):
+        art.carregar_artefato(diretorio)
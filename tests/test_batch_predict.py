@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+import artefato as art
+import batch_predict as bp
+
+def _parte(diretorio, nome, ids, alvos):
+    prefixo = diretorio / nome
+    np.save(f"{prefixo}_id.npy", np.asarray(ids, dtype=np.int64))
+    np.save(f"{prefixo}_target.npy", np.asarray(alvos, dtype=np.int64))
+    return str(prefixo)
+
+def test_mesclar_ordenado_intercala_partes(tmp_path):
+    rng = np.random.default_rng(0)
+    ids = rng.choice(10**12, size=50, replace=False)
+    divisao = [np.sort(ids[:23]), np.sort(ids[23:24]), np.zeros(0), np.sort(ids[24:])]
+    partes = [_parte(tmp_path, f"p{i}", p, p % 5) for i, p in enumerate(divisao)]
+
+    # Blocos menores que as partes: várias janelas por parte
+    assert bp.mesclar_ordenado(partes, tmp_path / 'mesclado.csv', bloco=4) == 50
+    mesclado = pd.read_csv(tmp_path / 'mesclado.csv')
+    assert np.array_equal(mesclado['id'], np.sort(ids))
+    assert np.array_equal(mesclado['target'], np.sort(ids) % 5)
+
+def test_cache_dos_workers_incorporado(artefato_normalizado, dados_sinteticos, tmp_path):
+    diretorio = artefato_normalizado[0]
+    teste = pd.read_csv(dados_sinteticos / 'teste.csv').sample(frac=1, random_state=0)
+    arquivos = [tmp_path / 'a.csv', tmp_path / 'b.csv']
+    teste.iloc[::2].to_csv(arquivos[0], index=False)
+    teste.iloc[1::2].to_csv(arquivos[1], index=False)
+    esperado = teste.sort_values('id')
+    esperado = pd.DataFrame({'id': esperado['id'].to_numpy(),
+                             'target': art.prever(art.carregar_artefato(diretorio), esperado)})
+
+    argumentos = dict(n_workers=2, chunk_size=40, diretorio_cache=tmp_path / 'cache')
+    primeira = bp.prever_lote(diretorio, arquivos, arquivo_mesclado=tmp_path / 'primeira.csv', **argumentos)
+    assert primeira['linhas'] == len(teste)
+    assert primeira['cache_previsoes']['falhas'] == len(teste)
+    assert primeira['cache_previsoes']['entradas'] == len(teste)
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / 'primeira.csv'), esperado)
+
+    # As entradas dos dois workers foram gravadas no cache do processo principal
+    segunda = bp.prever_lote(diretorio, arquivos, diretorio_saida=tmp_path / 'saidas', **argumentos)
+    assert segunda['cache_previsoes']['acertos'] == len(teste)
+    assert segunda['cache_previsoes']['falhas'] == 0
+    por_arquivo = pd.concat(pd.read_csv(tmp_path / 'saidas' / f"{a.stem}.csv") for a in arquivos)
+    pd.testing.assert_frame_equal(por_arquivo.sort_values('id').reset_index(drop=True), esperado)
@@ -0,0 +1,14 @@
+import numpy as np
+import pandas as pd
+
+import cache_dados
+
+def test_primeira_leitura_tem_o_dtype_pedido(dados_sinteticos, tmp_path):
+    caminho = dados_sinteticos / 'treino.csv'
+    colunas = [c for c in pd.read_csv(caminho, nrows=1).columns if c not in ('id', 'target')]
+
+    construido = cache_dados.ler_csv(caminho, tmp_path / 'cache', dtype=np.float32)
+    reaproveitado = cache_dados.ler_csv(caminho, tmp_path / 'cache', dtype=np.float32)
+
+    assert (construido[colunas].dtypes == np.float32).all()
+    pd.testing.assert_frame_equal(construido, reaproveitado)
@@ -0,0 +1,25 @@
+import os
+
+import cache_etapas
+import modelo_xgb_classifier_v2 as m
+
+def test_chave_muda_com_versao_das_bibliotecas(monkeypatch):
+    chave = cache_etapas.calcular_chave('modelo', {'max_depth': 6})
+    versoes = dict(cache_etapas.versoes_bibliotecas(), xgboost='0.0.0')
+    monkeypatch.setattr(cache_etapas, 'versoes_bibliotecas', lambda: versoes)
+    assert cache_etapas.calcular_chave('modelo', {'max_depth': 6}) != chave
+
+def test_chave_preparo_streaming_usa_tamanho_e_mtime(dados_sinteticos, monkeypatch):
+    configuracao = {'data_dir': str(dados_sinteticos), 'use_scaling': True, 'validation_size': 0.2,
+                    'xgboost_params': {'random_state': 52}, 'streaming': True}
+    lidos = []
+    original = m.cache_dados.hash_arquivo
+    monkeypatch.setattr(m.cache_dados, 'hash_arquivo', lambda caminho: lidos.append(caminho) or original(caminho))
+
+    chave = m.calcular_chave_preparo(configuracao)
+    assert [p.name for p in lidos] == ['treino.csv']
+
+    teste = dados_sinteticos / 'teste.csv'
+    estado = teste.stat()
+    os.utime(teste, ns=(estado.st_atime_ns, estado.st_mtime_ns + 10**9))
+    assert m.calcular_chave_preparo(configuracao) != chave
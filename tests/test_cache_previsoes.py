@@ -0,0 +1,31 @@
+import time
+
+import numpy as np
+
+import cache_previsoes as cp
+
+def _prever_lento(falhas):
+    time.sleep(0.01)
+    return np.zeros(int(falhas.sum()), dtype=np.int64)
+
+def test_custo_por_linha_dos_workers_e_persistido(tmp_path):
+    impressao = 'ab' * 32
+    X = np.random.default_rng(0).normal(size=(100, 3))
+
+    # Primeira execução: o worker só tem falhas; o principal incorpora e salva
+    principal = cp.CachePrevisoes(tmp_path, impressao)
+    worker = cp.CachePrevisoes(tmp_path, impressao)
+    worker.prever(X, _prever_lento)
+    principal.incorporar(worker.extrair_novas())
+    assert principal.custo_linha_s > 0
+    principal.salvar()
+
+    # Segunda execução: só acertos no worker, que carregou o custo persistido
+    principal = cp.CachePrevisoes(tmp_path, impressao)
+    assert principal.custo_linha_s > 0
+    worker = cp.CachePrevisoes(tmp_path, impressao)
+    worker.prever(X, _prever_lento)
+    principal.incorporar(worker.extrair_novas())
+    resumo = principal.resumo()
+    assert resumo['acertos'] == 100 and resumo['falhas'] == 0
+    assert resumo['tempo_economizado_s'] == 100 * principal.custo_linha_s > 0
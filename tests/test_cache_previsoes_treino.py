@@ -0,0 +1,18 @@
+import pytest
+
+import artefato as art
+import cache_previsoes as cp
+import modelo_xgb_classifier_v2 as m
+import predict
+
+@pytest.mark.parametrize('fold_scaler', [False, True])
+def test_previsao_reaproveita_cache_do_treino(configuracao_treino, dados_sinteticos, tmp_path, fold_scaler):
+    configuracao = dict(configuracao_treino, prediction_cache=str(tmp_path / 'cache'), fold_scaler=fold_scaler)
+    assert m.treinar_modelo(configuracao)
+
+    artefato = art.carregar_artefato(configuracao['model_dir'])
+    cache = cp.CachePrevisoes(configuracao['prediction_cache'], cp.impressao_artefato(artefato))
+    predict.prever_arquivo(artefato, dados_sinteticos / 'teste.csv', tmp_path / 'previsto.csv', cache=cache)
+
+    resumo = cache.resumo()
+    assert resumo['falhas'] == 0 and resumo['taxa_acerto'] == 1.0
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+import checagem
+
+def _escrever(caminho, ids, target=None):
+    dados = {'id': ids} if target is None else {'id': ids, 'target': target}
+    pd.DataFrame(dados).to_csv(caminho, index=False)
+    return caminho
+
+def test_ids_esparsos_grandes(tmp_path):
+    ids = np.array([20_000_000_000, 7, 2**62, 123_456_789_012], dtype=np.int64)
+    teste = _escrever(tmp_path / 'teste.csv', ids)
+    resultado = _escrever(tmp_path / 'resultado.csv', ids[::-1], [0, 1, 2, 3])
+
+    assert checagem.verificar_resultado(str(resultado), str(teste), chunk_size=1)
+
+def test_ids_duplicados_faltando_e_extras(tmp_path):
+    teste = _escrever(tmp_path / 'teste.csv', [5, 20_000_000_000, 30_000_000_000])
+    resultado = _escrever(tmp_path / 'resultado.csv', [5, 5, 20_000_000_000, 40_000_000_000], [0, 1, 2, 3])
+    assert not checagem.verificar_resultado(str(resultado), str(teste), chunk_size=2)
+
+    conjunto = checagem.ConjuntoIds()
+    for bloco in ([5, 9], [5, 20_000_000_000], [1, 9, 2, 3]):
+        conjunto.adicionar(np.array(bloco, dtype=np.int64))
+    assert conjunto.total == 8 and conjunto.duplicados == 2
+    assert conjunto.exemplos_duplicados == [5, 9]
+    outro = checagem.ConjuntoIds()
+    outro.adicionar(np.array([1, 2, 5, 40_000_000_000], dtype=np.int64))
+    so_a, so_b = conjunto.comparar(outro)
+    assert so_a.tolist() == [3, 9, 20_000_000_000] and so_b.tolist() == [40_000_000_000]
+
+def test_ids_negativos(tmp_path):
+    ids = np.array([-3, 0, -2**63, 2**63 - 1], dtype=np.int64)
+    teste = _escrever(tmp_path / 'teste.csv', ids)
+    resultado = _escrever(tmp_path / 'resultado.csv', ids[::-1], [0, 1, 2, 3])
+    assert checagem.verificar_resultado(str(resultado), str(teste), chunk_size=3)
+
+    faltando = _escrever(tmp_path / 'faltando.csv', [-3, 0, -3, 2**63 - 1], [0, 1, 2, 3])
+    assert not checagem.verificar_resultado(str(faltando), str(teste), chunk_size=3)
@@ -0,0 +1,24 @@
+import numpy as np
+
+import compressao
+
+class ProfessorFixo:
+    """Professor com probabilidades dadas (a classe 2 nunca passa de 1e-9)."""
+
+    def __init__(self, proba):
+        self.proba = proba
+
+    def predict_proba(self, X):
+        return self.proba
+
+def test_destilar_mantem_classe_rara():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 3))
+    proba = rng.dirichlet(np.ones(4), size=200)
+    proba[:, 2] = 1e-9
+    proba /= proba.sum(axis=1, keepdims=True)
+
+    aluno = compressao.destilar(ProfessorFixo(proba), X, {'n_estimators': 5, 'max_depth': 2, 'n_jobs': 1})
+
+    assert aluno.n_classes_ == 4
+    assert aluno.predict_proba(X).shape == (200, 4)
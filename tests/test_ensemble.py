@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import ensemble as ens
+from conftest import PARAMETROS_PEQUENOS
+
+def test_modelos_base_seguem_os_parametros_configurados():
+    parametros = dict(PARAMETROS_PEQUENOS, max_depth=10, early_stopping_rounds=5, eval_metric='mlogloss')
+    modelos = ens.modelos_base_padrao(parametros)
+
+    xgb = [p for tipo, p in modelos.values() if tipo == 'xgboost']
+    assert [p['max_depth'] for p in xgb] == [10, 6, 4]
+    assert len({p['random_state'] for p in xgb}) == 3
+    for p in xgb:
+        assert p['n_estimators'] == 10 and p['tree_method'] == 'hist'
+        assert 'n_jobs' not in p and 'early_stopping_rounds' not in p
+    assert modelos['hist_gb'][1]['max_iter'] == 10
+    assert modelos['random_forest'][1]['n_estimators'] == 10
+
+@pytest.mark.parametrize('metodo', ['soft', 'stacking'])
+def test_probabilidades_combinadas(dados_sinteticos, metodo):
+    treino = pd.read_csv(dados_sinteticos / 'treino.csv')
+    X = treino.drop(columns=['id', 'target']).to_numpy()
+    y = treino['target'].to_numpy()
+    parametros = dict(PARAMETROS_PEQUENOS, n_estimators=3, max_depth=2)
+
+    modelo = ens.treinar_ensemble(X[:450], y[:450], X[450:], y[450:], metodo=metodo,
+                                  max_cores=2, k_folds=2, xgboost_params=parametros)
+
+    proba = modelo.predict_proba(X[450:])
+    assert proba.shape == (150, len(np.unique(y)))
+    np.testing.assert_allclose(proba.sum(axis=1), 1, rtol=1e-5)
+    if metodo == 'soft':
+        esperado = np.mean([m.predict_proba(X[450:]) for m in modelo.modelos.values()], axis=0)
+    else:
+        esperado = modelo.meta_modelo.predict_proba(
+            np.hstack([m.predict_proba(X[450:]) for m in modelo.modelos.values()]))
+    np.testing.assert_allclose(proba, esperado)
+    assert np.array_equal(modelo.predict(X[450:]), modelo.classes_[np.argmax(proba, axis=1)])
@@ -0,0 +1,24 @@
+import json
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+import artefato as art
+import explain
+
+def test_explicar_arquivo_em_blocos(artefato_normalizado, dados_sinteticos, tmp_path):
+    diretorio, _, _ = artefato_normalizado
+    artefato = art.carregar_artefato(diretorio)
+    entrada = dados_sinteticos / 'teste.csv'
+
+    explain.explicar_arquivo(artefato, entrada, tmp_path / 'saida', chunk_size=37, n_workers=2)
+
+    teste = pd.read_csv(entrada)
+    contribuicoes = np.load(tmp_path / 'saida' / 'contribuicoes.npy')
+    esperado = artefato['booster'].predict(xgb.DMatrix(art.transformar(artefato, teste)), pred_contribs=True)
+    np.testing.assert_allclose(contribuicoes, esperado, rtol=1e-5, atol=1e-5)
+    assert np.array_equal(np.load(tmp_path / 'saida' / 'ids.npy'), teste['id'].to_numpy())
+    assert json.loads((tmp_path / 'saida' / 'metadados.json').read_text())['linhas'] == len(teste)
+    # Nenhum cache gravado junto da entrada
+    assert not (entrada.parent / '.cache').exists()
@@ -0,0 +1,30 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from benchmark_importacao import COMANDOS, RAIZ
+
+PESADAS = ('xgboost', 'sklearn', 'pandas', 'numpy', 'scipy')
+
+# Executa o script como __main__ e imprime, na última linha, os módulos carregados
+EXECUTAR = """
+import json, runpy, sys
+sys.argv = sys.argv[1:]
+try:
+    runpy.run_path(sys.argv[0], run_name='__main__')
+except SystemExit:
+    pass
+print()
+print(json.dumps(sorted(sys.modules)))
+"""
+
+@pytest.mark.parametrize('nome', COMANDOS)
+def test_sem_importacoes_pesadas(nome):
+    processo = subprocess.run([sys.executable, '-c', EXECUTAR, *COMANDOS[nome]],
+                              cwd=RAIZ, capture_output=True, text=True, timeout=60)
+    modulos = json.loads(processo.stdout.splitlines()[-1])
+
+    assert 'argparse' in modulos  # o comando de fato rodou
+    assert [m for m in modulos if m.split('.')[0] in PESADAS] == []
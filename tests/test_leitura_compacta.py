@@ -0,0 +1,16 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import modelo_xgb_classifier_v2 as m
+
+@pytest.mark.parametrize('usar_cache', [True, False])
+def test_ids_grandes_nao_sao_truncados(tmp_path, usar_cache):
+    ids = np.array([5, 2**31, 20_000_000_000], dtype=np.int64)
+    caminho = tmp_path / 'treino.csv'
+    pd.DataFrame({'id': ids, 'f0': [0.5, 1.5, 2.5], 'target': [0, 1, 2]}).to_csv(caminho, index=False)
+
+    for _ in range(2):  # construção e reaproveitamento do cache binário
+        df = m.ler_arquivo(caminho, usar_cache=usar_cache, compacto=True)
+        assert df['id'].to_numpy().tolist() == ids.tolist()
+        assert df['f0'].dtype == np.float32 and df['target'].dtype == np.int32
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import StandardScaler
+from xgboost import XGBClassifier
+
+import artefato as art
+import modelo_xgb_classifier_v2 as m
+from conftest import PARAMETROS_PEQUENOS
+
+@pytest.mark.parametrize('incorporar', [False, True])
+def test_artefato_recarregado_preve_o_mesmo(dados_sinteticos, tmp_path, incorporar):
+    treino = pd.read_csv(dados_sinteticos / 'treino.csv')
+    teste = pd.read_csv(dados_sinteticos / 'teste.csv')
+    colunas = [c for c in treino.columns if c not in ('id', 'target')]
+    scaler = StandardScaler()
+    modelo = XGBClassifier(**PARAMETROS_PEQUENOS).fit(scaler.fit_transform(treino[colunas]), treino['target'])
+    X_teste = scaler.transform(teste[colunas])
+
+    art.salvar_artefato(modelo, scaler, colunas, tmp_path / 'modelo', incorporar_normalizacao=incorporar)
+    artefato = art.carregar_artefato(tmp_path / 'modelo')
+    assert np.array_equal(art.prever(artefato, teste), modelo.predict(X_teste))
+    assert m.verificar_paridade(modelo, X_teste, tmp_path / 'modelo', teste) == 0
+
+def test_paridade_divergente_falha(dados_sinteticos, tmp_path):
+    treino = pd.read_csv(dados_sinteticos / 'treino.csv')
+    teste = pd.read_csv(dados_sinteticos / 'teste.csv')
+    colunas = [c for c in treino.columns if c not in ('id', 'target')]
+    scaler = StandardScaler()
+    modelo = XGBClassifier(**PARAMETROS_PEQUENOS).fit(scaler.fit_transform(treino[colunas]), treino['target'])
+    # Artefato salvo sem normalização: as árvores recebem features brutas e divergem
+    art.salvar_artefato(modelo, None, colunas, tmp_path / 'modelo')
+
+    with pytest.raises(ValueError, match='divergentes'):
+        m.verificar_paridade(modelo, scaler.transform(teste[colunas]), tmp_path / 'modelo', teste)
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+from xgboost import XGBClassifier
+
+import preditor_compilado as pc
+from conftest import PARAMETROS_PEQUENOS
+
+def test_classes_iguais_nos_dois_caminhos(dados_sinteticos):
+    treino = pd.read_csv(dados_sinteticos / 'treino.csv')
+    teste = pd.read_csv(dados_sinteticos / 'teste.csv')
+    X = treino.drop(columns=['id', 'target']).to_numpy()
+    X_teste = teste[treino.columns.drop(['id', 'target'])].to_numpy()
+    modelo = XGBClassifier(**PARAMETROS_PEQUENOS).fit(X, treino['target'])
+
+    preditor = pc.compilar_modelo(modelo)
+    assert preditor.booster is not None
+    # Lote grande vai para o booster; sem o booster, o mesmo lote é percorrido em NumPy
+    somente_numpy = pc.PreditorCompilado.de_booster(preditor.booster, modelo.classes_)
+    somente_numpy.booster = None
+
+    esperado = modelo.predict(X_teste)
+    assert len(X_teste) > preditor.max_linhas
+    assert np.array_equal(preditor.predict(X_teste), esperado)
+    assert np.array_equal(somente_numpy.predict(X_teste), esperado)
+    assert np.array_equal(preditor.predict(X_teste[:1]), esperado[:1])
@@ -0,0 +1,8 @@
+import search
+
+def test_chave_trial_ignora_threads():
+    parametros = {'max_depth': 6, 'learning_rate': 0.1, 'n_estimators': 50}
+    chave = search.chave_trial(dict(parametros, n_jobs=2), 'dados')
+    assert chave == search.chave_trial(dict(parametros, n_jobs=8), 'dados')
+    assert chave == search.chave_trial(dict(parametros, nthread=4), 'dados')
+    assert chave != search.chave_trial(dict(parametros, max_depth=8, n_jobs=2), 'dados')
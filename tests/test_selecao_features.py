@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+import artefato as art
+import modelo_xgb_classifier_v2 as m
+import predict
+import selecao_features as sf
+from conftest import PARAMETROS_PEQUENOS
+
+def test_recortar_scaler():
+    X = np.random.default_rng(0).normal(3.0, [1.0, 2.0, 5.0, 0.5], size=(100, 4))
+    scaler = StandardScaler().fit(X)
+    recortado = sf.recortar_scaler(scaler, [2, 0])
+
+    assert recortado.n_features_in_ == 2 and scaler.n_features_in_ == 4
+    assert np.array_equal(recortado.var_, scaler.var_[[2, 0]])
+    np.testing.assert_array_equal(recortado.transform(X[:, [2, 0]]), scaler.transform(X)[:, [2, 0]])
+    assert sf.recortar_scaler(None, [0]) is None
+
+def test_subconjunto_escolhido(dados_sinteticos):
+    treino = pd.read_csv(dados_sinteticos / 'treino.csv')
+    colunas = [c for c in treino.columns if c not in ('id', 'target')]
+    X = StandardScaler().fit_transform(treino[colunas])
+    y = treino['target'].to_numpy()
+
+    selecao = sf.selecionar_features(X[:450], y[:450], X[450:], y[450:], colunas, PARAMETROS_PEQUENOS,
+                                     min_features=2, passo=4, tolerancia=0.02)
+
+    tabela = selecao['tabela']
+    assert [linha['n_features'] for linha in tabela] == [13, 9, 5, 2]
+    for anterior, linha in zip(tabela, tabela[1:]):
+        assert set(linha['colunas']) | set(linha['removidas']) == set(anterior['colunas'])
+    # O menor subconjunto dentro da tolerância da melhor Medida-F
+    melhor = max(linha['f1'] for linha in tabela)
+    aceitos = [linha['n_features'] for linha in tabela if linha['f1'] >= melhor - 0.02]
+    assert len(selecao['colunas']) == min(aceitos)
+    assert [colunas[i] for i in selecao['indices']] == selecao['colunas']
+    assert selecao['modelo'].n_features_in_ == len(selecao['colunas'])
+
+def test_artefato_grava_so_as_colunas_escolhidas(configuracao_treino, dados_sinteticos, tmp_path):
+    configuracao = dict(configuracao_treino, feature_selection=True)
+    assert m.treinar_modelo(configuracao)
+
+    tabela = pd.read_csv(tmp_path / 'resultado.features.csv')
+    melhor = tabela['f1'].max()
+    aceitos = tabela[tabela['f1'] >= melhor - m.config.FEATURE_SELECTION_TOLERANCE]
+    escolhidas = aceitos.loc[aceitos['n_features'].idxmin(), 'colunas'].split('|')
+
+    artefato = art.carregar_artefato(configuracao['model_dir'])
+    assert len(escolhidas) < tabela['n_features'].max()
+    assert artefato['colunas'] == escolhidas
+    assert len(artefato['scaler_mean']) == len(escolhidas) == artefato['booster'].num_features()
+    # A previsão a partir do artefato reproduz a saída do treino
+    predict.prever_arquivo(artefato, dados_sinteticos / 'teste.csv', tmp_path / 'previsto.csv')
+    pd.testing.assert_frame_equal(pd.read_csv(tmp_path / 'previsto.csv'), pd.read_csv(tmp_path / 'resultado.csv'))
@@ -0,0 +1,69 @@
+import asyncio
+import json
+
+import numpy as np
+import pandas as pd
+
+import artefato as art
+import serve
+
+async def _requisitar(porta, metodo, caminho, corpo=b''):
+    reader, writer = await asyncio.open_connection('127.0.0.1', porta)
+    writer.write(f"{metodo} {caminho} HTTP/1.1\r\nContent-Length: {len(corpo)}\r\n"
+                 f"Connection: close\r\n\r\n".encode() + corpo)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    resposta = (await reader.read()).split(b'\r\n\r\n', 1)[1]
+    writer.close()
+    return status, json.loads(resposta)
+
+async def _com_servidor(artefato, max_batch_size, max_wait_ms, cenario):
+    servidor = serve.Servidor(artefato, max_batch_size, max_wait_ms)
+    coletor = asyncio.create_task(servidor.micro_lote.executar())
+    tcp = await asyncio.start_server(servidor.atender, '127.0.0.1', 0)
+    try:
+        return servidor, await cenario(tcp.sockets[0].getsockname()[1])
+    finally:
+        tcp.close()
+        coletor.cancel()
+        servidor.micro_lote.executor.shutdown(wait=False)
+
+def test_requisicoes_concorrentes_em_micro_lotes(artefato_normalizado, dados_sinteticos):
+    artefato = art.carregar_artefato(artefato_normalizado[0])
+    teste = pd.read_csv(dados_sinteticos / 'teste.csv').head(8)
+    registros = teste[artefato['colunas']]
+
+    async def cenario(porta):
+        corpos = [json.dumps({'features': linha.tolist()}).encode() for linha in registros.to_numpy()]
+        # Um registro em formato de dicionário, com as colunas fora de ordem
+        corpos[0] = json.dumps({'features': dict(reversed(list(registros.iloc[0].items())))}).encode()
+        return await asyncio.gather(*(_requisitar(porta, 'POST', '/predict', c) for c in corpos))
+
+    servidor, respostas = asyncio.run(_com_servidor(artefato, 4, 500, cenario))
+
+    assert all(status == 200 for status, _ in respostas)
+    esperado = art.prever(artefato, registros)
+    assert np.array_equal([r['target'] for _, r in respostas], esperado)
+    np.testing.assert_allclose([r['proba'] for _, r in respostas], art.prever_proba(artefato, registros),
+                               rtol=1e-6)
+    # 8 requisições simultâneas com lote máximo de 4: duas chamadas ao booster
+    resumo = servidor.metricas.resumo()
+    assert resumo['lotes'] == 2 and resumo['tamanho_medio_lote'] == 4
+    assert resumo['requisicoes'] == 8 and resumo['erros'] == 0
+
+def test_requisicao_invalida_retorna_400(artefato_normalizado):
+    artefato = art.carregar_artefato(artefato_normalizado[0])
+
+    nao_numericos = json.dumps({'features': ['a'] * len(artefato['colunas'])}).encode()
+
+    async def cenario(porta):
+        return [await _requisitar(porta, 'POST', '/predict', corpo)
+                for corpo in (b'{"features": [1, 2]}', b'nao e json', b'{"outra": []}',
+                              b'{"features": {"col_0": 1}}', nao_numericos)]
+
+    servidor, respostas = asyncio.run(_com_servidor(artefato, 4, 1, cenario))
+
+    assert [status for status, _ in respostas] == [400] * 5
+    assert f"Esperadas {len(artefato['colunas'])} features, recebidas 2" in respostas[0][1]['erro']
+    resumo = servidor.metricas.resumo()
+    assert resumo['erros'] == 5 and resumo['lotes'] == 0 and resumo['requisicoes'] == 0
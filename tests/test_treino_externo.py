@@ -0,0 +1,16 @@
+import pandas as pd
+
+import artefato as art
+import modelo_xgb_classifier_v2 as m
+
+def test_out_of_core_respeita_features(configuracao_treino, tmp_path):
+    features = ['col_3', 'col_0', 'col_7']
+    configuracao = dict(configuracao_treino, features=features, chunk_size=250)
+    assert m.treinar_modelo_externo(configuracao)
+
+    artefato = art.carregar_artefato(configuracao['model_dir'])
+    # Mesma ordem do arquivo, como na leitura em memória
+    assert artefato['colunas'] == ['col_0', 'col_3', 'col_7']
+    assert len(artefato['scaler_mean']) == 3
+    assert artefato['booster'].num_features() == 3
+    assert len(pd.read_csv(configuracao['output_file'])) == 200
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from sklearn.preprocessing import StandardScaler
+from xgboost import XGBClassifier
+
+import artefato as art
+import treino_incremental
+from conftest import PARAMETROS_PEQUENOS
+from gerar_dados import gerar_csv
+
+def test_atualizar_normalizacao_preserva_previsoes(artefato_normalizado, tmp_path):
+    diretorio, _, _ = artefato_normalizado
+    artefato = art.carregar_artefato(diretorio)
+    novos = pd.read_csv(gerar_csv(tmp_path / 'novos.csv', 300, random_state=7))
+    X_novo = novos[artefato['colunas']].to_numpy(dtype=np.float64) * 1.1 + 0.5
+
+    booster, media, escala, n_amostras, _ = treino_incremental.atualizar_normalizacao(
+        artefato['booster'].copy(), artefato['scaler_mean'], artefato['scaler_scale'],
+        artefato['scaler_n'], X_novo, artefato['scaler_var'])
+
+    assert n_amostras == artefato['scaler_n'] + len(X_novo)
+    antes = artefato['booster'].predict(xgb.DMatrix(art.transformar(artefato, X_novo)))
+    depois = booster.predict(xgb.DMatrix((X_novo - media) / escala))
+    assert (np.argmax(antes, axis=1) != np.argmax(depois, axis=1)).sum() == 0
+
+def test_continuar_treino_artefato_normalizado(artefato_normalizado, tmp_path):
+    diretorio, _, _ = artefato_normalizado
+    rodadas_antes = art.carregar_artefato(diretorio)['booster'].num_boosted_rounds()
+    novos = gerar_csv(tmp_path / 'novos.csv', 300, random_state=7, id_inicial=10_000)
+
+    resultado = treino_incremental.continuar_treino(diretorio, [novos], PARAMETROS_PEQUENOS, n_rodadas=5)
+
+    artefato = art.carregar_artefato(diretorio)
+    assert artefato['booster'].num_boosted_rounds() == rodadas_antes + 5
+    assert artefato['scaler_n'] == 600 + 300
+    assert resultado['linhagem'][-1]['rodadas'] == [rodadas_antes, rodadas_antes + 5]
+    previsoes = art.prever(artefato, pd.read_csv(novos))
+    assert set(previsoes) <= set(artefato['classes'])
+
+def test_coluna_constante_restaura_variancia_exata(dados_sinteticos, tmp_path):
+    treino = pd.read_csv(dados_sinteticos / 'treino.csv')
+    treino['constante'] = 3.0
+    colunas = [c for c in treino.columns if c not in ('id', 'target')]
+    scaler = StandardScaler().fit(treino[colunas])
+    modelo = XGBClassifier(**PARAMETROS_PEQUENOS).fit(scaler.transform(treino[colunas]), treino['target'])
+    art.salvar_artefato(modelo, scaler, colunas, tmp_path / 'modelo')
+    artefato = art.carregar_artefato(tmp_path / 'modelo')
+    assert artefato['scaler_var'][colunas.index('constante')] == 0
+
+    novos = pd.read_csv(gerar_csv(tmp_path / 'novos.csv', 300, random_state=7))
+    novos['constante'] = 3.0
+    X_novo = novos[colunas].to_numpy(dtype=np.float64)
+    _, media, escala, n_amostras, variancia = treino_incremental.atualizar_normalizacao(
+        artefato['booster'].copy(), artefato['scaler_mean'], artefato['scaler_scale'],
+        artefato['scaler_n'], X_novo, artefato['scaler_var'])
+
+    referencia = StandardScaler().fit(np.vstack([treino[colunas].to_numpy(), X_novo]))
+    np.testing.assert_allclose(media, referencia.mean_)
+    np.testing.assert_allclose(variancia, referencia.var_, atol=1e-12)
+    np.testing.assert_allclose(escala, referencia.scale_)
+    assert escala[colunas.index('constante')] == 1 and n_amostras == 900
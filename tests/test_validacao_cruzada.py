@@ -0,0 +1,26 @@
+import subprocess
+import sys
+import textwrap
+
+from conftest import RAIZ
+
+def test_workers_nao_removem_memoria_compartilhada():
+    # Em subprocesso: os erros do resource_tracker só aparecem no stderr do interpretador
+    script = textwrap.dedent(f"""
+        import sys
+        sys.path.insert(0, {str(RAIZ)!r})
+        import numpy as np
+        import validacao_cruzada as vc
+
+        if __name__ == '__main__':
+            rng = np.random.default_rng(0)
+            X = rng.normal(size=(300, 4)) * 50 + 10
+            y = (X[:, 0] > 10).astype(int)
+            resultado = vc.validacao_cruzada(X, y, {{'n_estimators': 5, 'max_depth': 2, 'n_jobs': 2}},
+                                             k=3, n_workers=2, normalizar=True)
+            assert len(resultado['folds']) == 3 and resultado['f1_medio'] > 0.9
+    """)
+    processo = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, timeout=300)
+    assert processo.returncode == 0, processo.stderr
+    assert 'KeyError' not in processo.stderr
+    assert 'leaked shared_memory' not in processo.stderr
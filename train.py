@@ -7,8 +7,7 @@ import argparse
 import sys
 from pathlib import Path
 
-# Importar o modelo principal
-import modelo_xgb_classifier_v2 as modelo
+import config as cfg
 
 def main():
     parser = argparse.ArgumentParser(description='Treinamento de modelo ONIA XGBoost')
@@ -22,20 +21,104 @@ def main():
                        help='Profundidade máxima das árvores (default: 20)')
     parser.add_argument('--learning-rate', type=float, default=0.1,
                        help='Taxa de aprendizado (default: 0.1)')
+    parser.add_argument('--tree-method', choices=['hist', 'approx', 'exact'], default='hist',
+                       help='Algoritmo de construção das árvores (default: hist)')
+    parser.add_argument('--max-bin', type=int, default=256,
+                       help='Número de bins do histograma para hist/approx (default: 256)')
+    parser.add_argument('--nthread', type=int, default=-1,
+                       help='Número de threads do XGBoost; -1 usa todos os cores (default: -1)')
+    parser.add_argument('--grow-policy', choices=['depthwise', 'lossguide'], default='depthwise',
+                       help='Política de crescimento das árvores (default: depthwise)')
+    parser.add_argument('--max-leaves', type=int, default=0,
+                       help='Máximo de folhas por árvore, 0 = sem limite (default: 0)')
+    parser.add_argument('--early-stopping-rounds', type=int, default=None,
+                       help='Paciência do early stopping na validação (default: desabilitado)')
     parser.add_argument('--validation-size', type=float, default=0.1,
                        help='Proporção para validação (default: 0.1)')
     parser.add_argument('--random-state', type=int, default=52,
                        help='Semente aleatória (default: 52)')
+    parser.add_argument('--compact', action='store_true',
+                       help='Usar float32/int32 de ponta a ponta e QuantileDMatrix no treino')
     parser.add_argument('--no-scaling', action='store_true',
                        help='Desabilitar normalização dos dados')
+    parser.add_argument('--ensemble', choices=['soft', 'stacking'], default=None,
+                       help='Treinar um ensemble de modelos base em paralelo (votação suave ou stacking)')
+    parser.add_argument('--max-cores', type=int, default=None,
+                       help='Limite total de cores do ensemble (default: --nthread, ou todos)')
+    parser.add_argument('--compress', action='store_true',
+                       help='Gerar modelos comprimidos (poda, profundidade, destilação) e relatório')
+    parser.add_argument('--compress-ship', choices=['poda', 'profundidade', 'destilado'], default=None,
+                       help='Usar o candidato comprimido no artefato e nas previsões')
+    parser.add_argument('--backend', choices=['xgboost', 'compilado'], default='xgboost',
+                       help='Backend de inferência; "compilado" só acelera lotes de até 4 linhas (default: xgboost)')
+    parser.add_argument('--prediction-cache', metavar='DIR', default=None,
+                       help='Reaproveitar previsões de linhas já vistas com o mesmo modelo (cache persistente em DIR)')
+    parser.add_argument('--select-features', action='store_true',
+                       help='Selecionar features por importância (ganho e permutação) e salvar só as escolhidas no artefato')
+    grupo_features = parser.add_mutually_exclusive_group()
+    grupo_features.add_argument('--features', nargs='+', default=None, metavar='COL',
+                               help='Ler e usar só estas colunas de features')
+    grupo_features.add_argument('--features-from', metavar='DIR',
+                               help='Ler e usar só as colunas de features do artefato em DIR')
+    parser.add_argument('--cv', type=int, default=None, metavar='K',
+                       help='Executar validação cruzada estratificada com K folds em vez do treino completo')
+    parser.add_argument('--cv-workers', type=int, default=None,
+                       help='Processos paralelos na validação cruzada (default: min(K, cores))')
+    parser.add_argument('--fold-scaler', action='store_true',
+                       help='Incorporar a normalização às árvores do artefato salvo '
+                            '(a previsão dispensa o StandardScaler)')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Ler os CSVs diretamente, sem o cache binário')
+    parser.add_argument('--stage-cache', action='store_true',
+                       help='Reaproveitar dados preparados e modelo de execuções anteriores (cache de etapas)')
+    parser.add_argument('--out-of-core', action='store_true',
+                       help='Treinar lendo o treino em blocos (memória externa do XGBoost)')
+    parser.add_argument('--incremental', nargs='+', default=None, metavar='CSV',
+                       help='Continuar o artefato de --model-dir com novas rodadas treinadas só nestes CSVs')
+    parser.add_argument('--rounds', type=int, default=50,
+                       help='Rodadas de boosting adicionadas no modo --incremental (default: 50)')
+    parser.add_argument('--concurrent', action='store_true',
+                       help='Executar as etapas independentes em paralelo (ex.: preparar o teste durante o treino)')
+    parser.add_argument('--thread-budget', type=int, default=None,
+                       help='Threads totais no modo --concurrent, compartilhadas com o XGBoost (default: todos os cores)')
+    parser.add_argument('--streaming', action='store_true',
+                       help='Gerar previsões lendo o teste em blocos (memória constante)')
+    parser.add_argument('--chunk-size', type=int, default=cfg.CHUNK_SIZE,
+                       help=f'Linhas por bloco nos modos streaming e out-of-core (default: {cfg.CHUNK_SIZE})')
+    parser.add_argument('--profile', action='store_true',
+                       help='Executar o treino sob cProfile e medir alocações com tracemalloc')
+    parser.add_argument('--no-report', action='store_true',
+                       help='Não gerar o relatório JSON de tempo/memória por etapa')
+    parser.add_argument('--model-dir', default='modelo_onia',
+                       help='Diretório para salvar o artefato do modelo (default: modelo_onia)')
+    parser.add_argument('--no-save-model', action='store_true',
+                       help='Não salvar o artefato do modelo')
     
     args = parser.parse_args()
     
+    if args.tree_method == 'exact' and args.grow_policy == 'lossguide':
+        print("Erro: --grow-policy lossguide requer --tree-method hist ou approx")
+        sys.exit(1)
+    
     # Verificar se diretório de dados existe
     if not Path(args.data_dir).exists():
         print(f"Erro: Diretório {args.data_dir} não encontrado")
         sys.exit(1)
     
+    features = args.features
+    if args.features_from:
+        caminho_metadados = Path(args.features_from) / 'metadados.json'
+        if not caminho_metadados.exists():
+            print(f"Erro: Artefato {args.features_from} não encontrado")
+            sys.exit(1)
+        import json
+        with open(caminho_metadados, encoding='utf-8') as f:
+            features = json.load(f)['colunas']
+    
+    # Importar o modelo principal (xgboost, sklearn, pandas) só depois de validar
+    # os argumentos, para que --help e erros de uso respondam rápido
+    import modelo_xgb_classifier_v2 as modelo
+    
     # Configurar parâmetros
     config = {
         'data_dir': args.data_dir,
@@ -45,11 +128,34 @@ def main():
             'max_depth': args.max_depth,
             'learning_rate': args.learning_rate,
             'random_state': args.random_state,
-            'n_jobs': -1,
-            'eval_metric': 'mlogloss'
+            'n_jobs': args.nthread,
+            'tree_method': args.tree_method,
+            'max_bin': args.max_bin,
+            'grow_policy': args.grow_policy,
+            'max_leaves': args.max_leaves,
+            'eval_metric': 'mlogloss',
+            'early_stopping_rounds': args.early_stopping_rounds
         },
         'validation_size': args.validation_size,
-        'use_scaling': not args.no_scaling
+        'use_scaling': not args.no_scaling,
+        'use_cache': not args.no_cache,
+        'compact': args.compact,
+        'ensemble': args.ensemble,
+        'max_cores': args.max_cores,
+        'compress': args.compress or args.compress_ship is not None,
+        'compress_ship': args.compress_ship,
+        'backend': args.backend,
+        'prediction_cache': args.prediction_cache,
+        'feature_selection': args.select_features,
+        'features': features,
+        'thread_budget': args.thread_budget,
+        'stage_cache': args.stage_cache,
+        'fold_scaler': args.fold_scaler,
+        'profile': args.profile,
+        'run_report': not args.no_report,
+        'streaming': args.streaming,
+        'chunk_size': args.chunk_size,
+        'model_dir': None if args.no_save_model else args.model_dir
     }
     
     print("=== Configuração do Treinamento ===")
@@ -58,11 +164,35 @@ def main():
     print(f"Parâmetros XGBoost: {config['xgboost_params']}")
     print(f"Tamanho validação: {config['validation_size']}")
     print(f"Usar normalização: {config['use_scaling']}")
+    print(f"Artefato do modelo: {config['model_dir']}")
+    if config['features']:
+        print(f"Features: {', '.join(config['features'])}")
+    if config['streaming']:
+        print(f"Previsão em blocos de: {config['chunk_size']} linhas")
     print("=" * 35)
     
+    # Validação cruzada
+    if args.cv:
+        resultado = modelo.executar_validacao_cruzada(config, k=args.cv, n_workers=args.cv_workers)
+        if resultado is None:
+            print("\n❌ Erro durante validação cruzada")
+            sys.exit(1)
+        print(f"\n✅ Medida-F ({args.cv} folds): {resultado['f1_medio']:.4f} ± {resultado['f1_desvio']:.4f}")
+        return
+    
     # Executar treinamento
     try:
-        modelo.treinar_modelo(config)
+        if args.incremental:
+            if not modelo.treinar_modelo_incremental(config, args.incremental, args.rounds):
+                raise RuntimeError("treino incremental falhou (ver log)")
+        elif args.out_of_core:
+            if not modelo.treinar_modelo_externo(config):
+                raise RuntimeError("treino out-of-core falhou (ver log)")
+        elif args.concurrent:
+            if not modelo.treinar_modelo_concorrente(config):
+                raise RuntimeError("pipeline concorrente falhou (ver log)")
+        else:
+            modelo.treinar_modelo(config)
         print("\n✅ Treinamento concluído com sucesso!")
         
     except Exception as e:
@@ -0,0 +1,205 @@
+"""
+Treinamento out-of-core para o modelo ONIA
+Treina o XGBoost a partir do CSV lido em blocos, sem manter o conjunto de
+treino inteiro em memória
+
+1. Primeira passada: estatísticas da normalização com StandardScaler.partial_fit
+   e levantamento das classes.
+2. O XGBoost consome os blocos por um DataIter com cache em disco (memória
+   externa); cada bloco é normalizado ao ser lido.
+3. A divisão treino/validação é feita por um hash do id de cada linha, de forma
+   determinística e independente do tamanho dos blocos.
+"""
+
+import gc
+import logging
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.metrics import f1_score
+from sklearn.preprocessing import StandardScaler
+
+def mascara_validacao(ids, validation_size, random_state=52):
+    """
+    Seleciona as linhas de validação por hash do id.
+
+    Args:
+        ids (array): Ids das linhas
+        validation_size (float): Proporção esperada de validação
+        random_state (int): Semente do hash
+
+    Returns:
+        ndarray: True para linhas de validação
+    """
+    h = np.asarray(ids, dtype=np.uint64) ^ np.uint64(random_state)
+    # Mistura de bits do splitmix64 (aritmética com overflow intencional)
+    with np.errstate(over='ignore'):
+        h = (h ^ (h >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        h = (h ^ (h >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        h = h ^ (h >> np.uint64(31))
+    return (h >> np.uint64(11)).astype(np.float64) / float(1 << 53) < validation_size
+
+def ajustar_scaler(caminho_treino, chunk_size, use_scaling=True, features=None):
+    """
+    Primeira passada sobre o CSV: normalização incremental e classes.
+
+    Com ``features``, só essas colunas (na ordem do arquivo) são lidas e usadas.
+
+    Returns:
+        tuple: (scaler ou None, colunas de features, classes ordenadas, total de linhas)
+    """
+    logger = logging.getLogger(__name__)
+
+    scaler = StandardScaler() if use_scaling else None
+    classes = set()
+    colunas = None
+    total = 0
+    usecols = None
+    if features is not None:
+        manter = set(features) | {'id', 'target'}
+        usecols = lambda coluna: coluna in manter
+    for bloco in pd.read_csv(caminho_treino, chunksize=chunk_size, usecols=usecols):
+        if colunas is None:
+            colunas = [c for c in bloco.columns if c not in ('id', 'target')]
+        if scaler is not None:
+            scaler.partial_fit(bloco[colunas].to_numpy())
+        classes.update(np.unique(bloco['target']).tolist())
+        total += len(bloco)
+
+    logger.info(f"Primeira passada: {total} linhas, {len(colunas)} features, classes {sorted(classes)}")
+    return scaler, colunas, np.array(sorted(classes)), total
+
+class IteradorCSV(xgb.DataIter):
+    """Entrega ao XGBoost os blocos normalizados de um CSV de treino."""
+
+    def __init__(self, caminho, colunas, classes, scaler, chunk_size,
+                 validacao, validation_size, random_state, cache_prefix):
+        self.caminho = caminho
+        self.colunas = colunas
+        self.classes = classes
+        self.scaler = scaler
+        self.chunk_size = chunk_size
+        self.validacao = validacao
+        self.validation_size = validation_size
+        self.random_state = random_state
+        self.leitor = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def blocos(self):
+        """Gera (X, y) normalizados do subconjunto (treino ou validação) deste iterador."""
+        manter = set(self.colunas) | {'id', 'target'}
+        for bloco in pd.read_csv(self.caminho, chunksize=self.chunk_size,
+                                 usecols=lambda coluna: coluna in manter):
+            mascara = mascara_validacao(bloco['id'].to_numpy(), self.validation_size, self.random_state)
+            if not self.validacao:
+                mascara = ~mascara
+            if not mascara.any():
+                continue
+            X = bloco[self.colunas].to_numpy()[mascara]
+            if self.scaler is not None:
+                X = self.scaler.transform(X)
+            y = np.searchsorted(self.classes, bloco['target'].to_numpy()[mascara])
+            yield X.astype(np.float32), y
+
+    def next(self, input_data):
+        if self.leitor is None:
+            self.leitor = self.blocos()
+        try:
+            X, y = next(self.leitor)
+        except StopIteration:
+            return False
+        input_data(data=X, label=y)
+        return True
+
+    def reset(self):
+        self.leitor = None
+
+def parametros_booster(xgboost_params, n_classes):
+    """Converte os parâmetros do XGBClassifier para xgb.train."""
+    params = dict(xgboost_params)
+    num_boost_round = params.pop('n_estimators', 100)
+    early_stopping_rounds = params.pop('early_stopping_rounds', None)
+    if 'random_state' in params:
+        params['seed'] = params.pop('random_state')
+    if 'n_jobs' in params:
+        n_jobs = params.pop('n_jobs')
+        if n_jobs is not None and n_jobs > 0:
+            params['nthread'] = n_jobs
+    if params.get('tree_method', 'hist') == 'exact':
+        # Memória externa só é suportada pelos métodos baseados em histograma
+        params['tree_method'] = 'hist'
+    params.update(objective='multi:softprob', num_class=n_classes)
+    return params, num_boost_round, early_stopping_rounds
+
+def _matriz(iterador, max_bin, referencia=None):
+    """Cria a DMatrix de memória externa para o iterador."""
+    if hasattr(xgb, 'ExtMemQuantileDMatrix'):
+        return xgb.ExtMemQuantileDMatrix(iterador, max_bin=max_bin, ref=referencia)
+    return xgb.DMatrix(iterador)
+
+def treinar_externo(caminho_treino, xgboost_params, use_scaling=True, validation_size=0.1,
+                    random_state=52, chunk_size=100_000, diretorio_cache=None, features=None):
+    """
+    Treina o XGBoost em modo out-of-core a partir de um CSV.
+
+    Args:
+        caminho_treino (str): CSV de treino com 'id', features e 'target'
+        xgboost_params (dict): Parâmetros no formato do XGBClassifier
+        use_scaling (bool): Se deve normalizar as features
+        validation_size (float): Proporção de validação (por hash do id)
+        random_state (int): Semente
+        chunk_size (int): Linhas por bloco
+        diretorio_cache (str): Diretório para o cache de memória externa
+            (default: diretório temporário)
+        features (list): Features a usar (None = todas)
+
+    Returns:
+        dict: booster, scaler, colunas, classes, total de linhas e f1 na validação
+    """
+    logger = logging.getLogger(__name__)
+
+    scaler, colunas, classes, total = ajustar_scaler(caminho_treino, chunk_size, use_scaling, features)
+    params, num_boost_round, early_stopping_rounds = parametros_booster(xgboost_params, len(classes))
+    max_bin = params.get('max_bin', 256)
+
+    with tempfile.TemporaryDirectory(dir=diretorio_cache, prefix='onia_extmem_') as temporario:
+        argumentos = dict(caminho=caminho_treino, colunas=colunas, classes=classes, scaler=scaler,
+                          chunk_size=chunk_size, validation_size=validation_size,
+                          random_state=random_state)
+        it_treino = IteradorCSV(validacao=False, cache_prefix=str(Path(temporario) / 'treino'), **argumentos)
+        it_validacao = IteradorCSV(validacao=True, cache_prefix=str(Path(temporario) / 'validacao'), **argumentos)
+
+        logger.info("Construindo DMatrix de memória externa...")
+        dtreino = _matriz(it_treino, max_bin)
+        dvalidacao = _matriz(it_validacao, max_bin, referencia=dtreino)
+
+        logger.info(f"Treinando out-of-core: {num_boost_round} iterações, parâmetros {params}")
+        resultado_avaliacao = {}
+        booster = xgb.train(params, dtreino, num_boost_round=num_boost_round,
+                            evals=[(dvalidacao, 'validation_0')],
+                            early_stopping_rounds=early_stopping_rounds,
+                            evals_result=resultado_avaliacao, verbose_eval=False)
+
+        if early_stopping_rounds:
+            logger.info(f"Early stopping: melhor iteração {booster.best_iteration}")
+            booster = booster[:booster.best_iteration + 1]
+
+        # Liberar as DMatrix (e os arquivos de cache abertos por elas) antes de o
+        # diretório temporário ser removido
+        del dtreino, dvalidacao
+        gc.collect()
+
+        # F1 na validação, bloco a bloco
+        y_real, y_previsto = [], []
+        for X, y in it_validacao.blocos():
+            y_real.append(y)
+            y_previsto.append(np.argmax(booster.predict(xgb.DMatrix(X)), axis=1))
+
+    f1 = f1_score(np.concatenate(y_real), np.concatenate(y_previsto), average='weighted')
+    logger.info(f"Medida-F no conjunto de validação (out-of-core): {f1:.4f}")
+
+    return {'booster': booster, 'scaler': scaler, 'colunas': colunas,
+            'classes': classes, 'linhas': total, 'f1': f1, 'curva': resultado_avaliacao}
@@ -0,0 +1,146 @@
+"""
+Treinamento incremental do modelo ONIA
+Continua um artefato salvo com novas rodadas de boosting treinadas apenas
+nos dados novos, em vez de retreinar do zero
+
+1. As estatísticas do StandardScaler salvas no artefato (média, escala e
+   número de amostras) são atualizadas com os dados novos (partial_fit).
+2. Como as árvores existentes foram treinadas na normalização antiga, seus
+   limiares são convertidos para a nova normalização (mesma reescrita de
+   artefato.incorporar_scaler), de modo que as previsões delas não mudam.
+3. As novas rodadas são adicionadas com xgb.train(..., xgb_model=booster).
+4. A linhagem do artefato ganha uma entrada com a faixa de rodadas
+   adicionada e os arquivos (com SHA-256) que essas rodadas viram.
+"""
+
+import logging
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.metrics import f1_score
+from sklearn.preprocessing import StandardScaler
+
+import artefato as art
+import treino_externo
+
+def atualizar_normalizacao(booster, media, escala, n_amostras, X_novo, variancia=None):
+    """
+    Atualiza a normalização com os dados novos e ajusta as árvores existentes.
+
+    Uma divisão "x_antigo < t" com x_antigo = (x - m_antiga) / s_antiga equivale a
+    "x_novo < (t * s_antiga + m_antiga - m_nova) / s_nova".
+
+    Args:
+        booster (Booster): Booster treinado na normalização antiga
+        media, escala (array): Normalização salva no artefato
+        n_amostras (int ou array): Amostras já vistas pelo scaler (por feature, se houver NaN)
+        X_novo (ndarray): Features brutas dos dados novos
+        variancia (array): var_ salva no artefato; artefatos antigos sem ela usam
+            escala ** 2, que é errado para features constantes (escala 1, variância 0)
+
+    Returns:
+        tuple: (booster ajustado, média, escala, n_amostras, variância atualizados)
+    """
+    scaler = StandardScaler()
+    scaler.mean_ = np.asarray(media, dtype=np.float64)
+    scaler.scale_ = np.asarray(escala, dtype=np.float64)
+    scaler.var_ = (np.asarray(variancia, dtype=np.float64).copy() if variancia is not None
+                   else scaler.scale_ ** 2)
+    # partial_fit espera um array NumPy (int escalar Python falha em versões recentes do scikit-learn)
+    scaler.n_samples_seen_ = np.broadcast_to(np.asarray(n_amostras, dtype=np.int64),
+                                             scaler.mean_.shape).copy()
+    scaler.n_features_in_ = len(scaler.mean_)
+    scaler.partial_fit(X_novo)
+
+    booster = art.incorporar_scaler(booster, (media - scaler.mean_) / scaler.scale_,
+                                    escala / scaler.scale_)
+    return (booster, scaler.mean_, scaler.scale_, art.amostras_scaler(scaler.n_samples_seen_),
+            scaler.var_)
+
+def _f1(booster, matriz, y):
+    return f1_score(y, np.argmax(booster.predict(matriz), axis=1), average='weighted')
+
+def continuar_treino(diretorio_artefato, arquivos, xgboost_params, n_rodadas,
+                     diretorio_saida=None, validation_size=0.1, random_state=52):
+    """
+    Adiciona rodadas de boosting a um artefato salvo usando apenas os dados novos.
+
+    Args:
+        diretorio_artefato (str): Artefato salvo por salvar_artefato/salvar_booster
+        arquivos (list): CSVs novos com 'id', as features do artefato e 'target'
+        xgboost_params (dict): Parâmetros no formato do XGBClassifier (as novas
+            árvores usam estes parâmetros; n_estimators é ignorado)
+        n_rodadas (int): Rodadas de boosting a adicionar
+        diretorio_saida (str): Destino do artefato atualizado (default: o próprio artefato)
+        validation_size (float): Proporção dos dados novos reservada para medir a
+            Medida-F antes/depois (por hash do id)
+        random_state (int): Semente do hash de validação
+
+    Returns:
+        dict: booster, f1_antes, f1_depois e linhagem
+    """
+    logger = logging.getLogger(__name__)
+
+    artefato = art.carregar_artefato(diretorio_artefato)
+    booster = artefato['booster']
+    colunas = artefato['colunas']
+    classes = artefato['classes']
+    rodadas_antes = booster.num_boosted_rounds()
+
+    necessarias = set(colunas + ['id', 'target'])
+    blocos, shards = [], []
+    for arquivo in arquivos:
+        bloco = pd.read_csv(arquivo, usecols=lambda coluna: coluna in necessarias)
+        faltando = necessarias - set(bloco.columns)
+        if faltando:
+            raise ValueError(f"{arquivo}: colunas ausentes {sorted(faltando)}")
+        blocos.append(bloco)
+        shards.append(art.descrever_shard(arquivo, len(bloco)))
+    novos = pd.concat(blocos, ignore_index=True)
+    logger.info(f"Dados novos: {len(novos)} linhas em {len(arquivos)} arquivo(s)")
+
+    desconhecidas = np.setdiff1d(novos['target'].unique(), classes)
+    if len(desconhecidas):
+        raise ValueError(f"Classes que o modelo não conhece: {desconhecidas.tolist()}")
+    y = np.searchsorted(classes, novos['target'].to_numpy())
+    X = novos[colunas].to_numpy(dtype=np.float64)
+
+    media, escala, n_amostras = artefato['scaler_mean'], artefato['scaler_scale'], artefato['scaler_n']
+    variancia = artefato['scaler_var']
+    if media is not None:
+        if n_amostras is not None and np.all(np.asarray(n_amostras) > 0):
+            if variancia is None:
+                logger.warning("Artefato sem a variância do scaler; usando escala² (features constantes mudam)")
+            booster, media, escala, n_amostras, variancia = atualizar_normalizacao(
+                booster, media, escala, n_amostras, X, variancia)
+            logger.info(f"Normalização atualizada com {len(X)} amostras (total {n_amostras})")
+        else:
+            logger.warning("Artefato sem número de amostras do scaler; mantendo a normalização salva")
+        X = (X - media) / escala
+
+    validacao = treino_externo.mascara_validacao(novos['id'].to_numpy(), validation_size, random_state)
+    dtreino = xgb.DMatrix(X[~validacao], label=y[~validacao])
+    dvalidacao = xgb.DMatrix(X[validacao], label=y[validacao]) if validacao.any() else None
+
+    params, _, _ = treino_externo.parametros_booster(xgboost_params, len(classes))
+    f1_antes = _f1(booster, dvalidacao, y[validacao]) if dvalidacao is not None else None
+
+    logger.info(f"Continuando o treino: {rodadas_antes} + {n_rodadas} rodadas em {int((~validacao).sum())} linhas")
+    booster = xgb.train(params, dtreino, num_boost_round=n_rodadas, xgb_model=booster,
+                        evals=[(dvalidacao, 'validation_0')] if dvalidacao is not None else (),
+                        verbose_eval=False)
+
+    f1_depois = _f1(booster, dvalidacao, y[validacao]) if dvalidacao is not None else None
+    if f1_antes is not None:
+        logger.info(f"Medida-F nos dados novos (validação): {f1_antes:.4f} -> {f1_depois:.4f}")
+
+    linhagem = list(artefato['linhagem'] or [{'rodadas': [0, rodadas_antes], 'shards': None}])
+    linhagem.append({'rodadas': [rodadas_antes, booster.num_boosted_rounds()], 'shards': shards,
+                     'data': datetime.now().isoformat(timespec='seconds')})
+
+    art.salvar_booster(booster, classes, colunas, diretorio_saida or diretorio_artefato,
+                       media, escala, n_amostras, linhagem, variancia)
+
+    return {'booster': booster, 'f1_antes': f1_antes, 'f1_depois': f1_depois, 'linhagem': linhagem}
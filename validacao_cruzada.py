@@ -0,0 +1,157 @@
+"""
+Validação cruzada estratificada em paralelo para o modelo ONIA
+
+Cada fold treina seu próprio XGBClassifier em um processo separado. A matriz
+de features e o target são colocados em memória compartilhada uma única vez;
+os workers recebem apenas os índices do fold, sem cópia dos dados via pickle.
+A normalização, quando usada, é ajustada em cada fold só com as linhas de
+treino, para que as linhas de teste não influenciem a média e a escala.
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+
+import numpy as np
+from sklearn.metrics import f1_score
+from sklearn.model_selection import StratifiedKFold
+
+# Dados do processo worker, preenchidos por _inicializar_worker
+_dados_worker = {}
+
+def _anexar_memoria(nome):
+    """Anexa um bloco de memória compartilhada sem registrá-lo para remoção no worker."""
+    try:
+        return shared_memory.SharedMemory(name=nome, track=False)
+    except TypeError:
+        # Python < 3.13 não tem track=False. Os workers usam o resource_tracker
+        # do processo principal, que já registrou o bloco e o remove com unlink();
+        # um unregister aqui faria o unlink do principal falhar com KeyError
+        return shared_memory.SharedMemory(name=nome)
+
+def _compartilhar(array):
+    """Copia um array para um novo bloco de memória compartilhada."""
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    destino = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    destino[...] = array
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+def _inicializar_worker(descritor_X, descritor_y):
+    """Anexa X e y compartilhados no processo worker."""
+    for chave, (nome, shape, dtype) in (('X', descritor_X), ('y', descritor_y)):
+        shm = _anexar_memoria(nome)
+        _dados_worker[chave + '_shm'] = shm
+        _dados_worker[chave] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+def _executar_fold(fold, indices_treino, indices_teste, xgboost_params, normalizar=False):
+    """Treina e avalia um fold. Executado no processo worker."""
+    from xgboost import XGBClassifier
+
+    X = _dados_worker['X']
+    y = _dados_worker['y']
+    X_treino, X_teste = X[indices_treino], X[indices_teste]
+    if normalizar:
+        from sklearn.preprocessing import StandardScaler
+
+        scaler = StandardScaler()
+        X_treino = scaler.fit_transform(X_treino)
+        X_teste = scaler.transform(X_teste)
+
+    modelo = XGBClassifier(**xgboost_params)
+
+    inicio = time.perf_counter()
+    modelo.fit(X_treino, y[indices_treino])
+    tempo_fit = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    previsoes = modelo.predict(X_teste)
+    tempo_predict = time.perf_counter() - inicio
+
+    return {
+        'fold': fold,
+        'f1': f1_score(y[indices_teste], previsoes, average='weighted'),
+        'tempo_fit': tempo_fit,
+        'tempo_predict': tempo_predict,
+        'amostras_treino': len(indices_treino),
+        'amostras_teste': len(indices_teste),
+    }
+
+def dividir_threads(n_jobs, n_workers):
+    """
+    Divide o orçamento de threads entre os workers.
+
+    Args:
+        n_jobs (int): Threads totais (-1 ou None usa todos os cores)
+        n_workers (int): Número de processos
+
+    Returns:
+        int: Threads do XGBoost por worker
+    """
+    if n_jobs is None or n_jobs < 1:
+        total = os.cpu_count() or 1
+    else:
+        total = n_jobs
+    return max(1, total // n_workers)
+
+def validacao_cruzada(X, y, xgboost_params, k=5, n_workers=None, random_state=52, normalizar=False):
+    """
+    Executa validação cruzada estratificada K-fold em paralelo.
+
+    Args:
+        X (array): Features
+        y (array): Target
+        xgboost_params (dict): Parâmetros do XGBoost
+        k (int): Número de folds
+        n_workers (int): Número de processos (default: min(k, cores))
+        random_state (int): Semente da divisão dos folds
+        normalizar (bool): Ajustar um StandardScaler nas linhas de treino de cada fold
+
+    Returns:
+        dict: f1_medio, f1_desvio e lista de resultados por fold
+    """
+    logger = logging.getLogger(__name__)
+
+    X = np.ascontiguousarray(X)
+    y = np.ascontiguousarray(y)
+
+    if n_workers is None:
+        n_workers = min(k, os.cpu_count() or 1)
+    n_workers = max(1, min(n_workers, k))
+
+    params = dict(xgboost_params)
+    if params.get('early_stopping_rounds'):
+        logger.warning("Early stopping desabilitado na validação cruzada (cada fold não tem eval_set)")
+        params['early_stopping_rounds'] = None
+    params['n_jobs'] = dividir_threads(params.get('n_jobs'), n_workers)
+
+    logger.info(f"Validação cruzada: {k} folds, {n_workers} processos, "
+                f"{params['n_jobs']} threads por processo")
+
+    folds = StratifiedKFold(n_splits=k, shuffle=True, random_state=random_state).split(X, y)
+
+    shm_X, descritor_X = _compartilhar(X)
+    shm_y, descritor_y = _compartilhar(y)
+    try:
+        with ProcessPoolExecutor(max_workers=n_workers,
+                                 mp_context=get_context('spawn'),
+                                 initializer=_inicializar_worker,
+                                 initargs=(descritor_X, descritor_y)) as executor:
+            futuros = [executor.submit(_executar_fold, i, treino, teste, params, normalizar)
+                       for i, (treino, teste) in enumerate(folds)]
+            resultados = sorted((f.result() for f in futuros), key=lambda r: r['fold'])
+    finally:
+        for shm in (shm_X, shm_y):
+            shm.close()
+            shm.unlink()
+
+    for r in resultados:
+        logger.info(f"  Fold {r['fold']}: F1={r['f1']:.4f} "
+                    f"fit={r['tempo_fit']:.2f}s predict={r['tempo_predict'] * 1000:.1f}ms "
+                    f"({r['amostras_treino']} treino, {r['amostras_teste']} teste)")
+
+    f1s = np.array([r['f1'] for r in resultados])
+    logger.info(f"Medida-F (weighted) na validação cruzada: {f1s.mean():.4f} ± {f1s.std():.4f}")
+
+    return {'f1_medio': float(f1s.mean()), 'f1_desvio': float(f1s.std()), 'folds': resultados}